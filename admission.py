@@ -0,0 +1,194 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import get_metrics
+from resilience import LatencyHistogram
+
+# Admission control configuration (override with environment variables)
+# Upstream requests in flight per process (0 = unlimited)
+ADMISSION_LIMIT = int(os.getenv("TRAVEL_ADMISSION_LIMIT", "16"))
+# Requests that may wait for a slot; beyond this, new requests are shed at once
+ADMISSION_QUEUE_SIZE = int(os.getenv("TRAVEL_ADMISSION_QUEUE", "32"))
+# Longest a request may wait for a slot, by purpose
+ADMISSION_MAX_WAIT = {
+    'interactive': float(os.getenv("TRAVEL_ADMISSION_WAIT", "5")),
+    'batch': float(os.getenv("TRAVEL_ADMISSION_BATCH_WAIT", "60")),
+}
+
+# Lower is served first
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+# Weight of the newest hold time in the running estimate used to predict waits
+SERVICE_SMOOTHING = 0.2
+
+BUSY_MESSAGE = "❌ The assistant is busy right now. Please try again in a minute."
+BUSY_NOTICE = ("⚠️ The assistant is very busy right now, so these are saved picks for your trip. "
+               "Ask again in a minute for fresh recommendations.\n\n")
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, reason, purpose):
+        super().__init__(f"Shed {purpose} request: {reason}")
+        self.reason = reason
+        self.purpose = purpose
+
+
+class _Waiter:
+    def __init__(self, purpose):
+        self.purpose = purpose
+        self.evicted = False
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded priority queue that sheds by queue time
+
+    At most limit requests run upstream at once. The rest wait in priority
+    order (interactive before batch, then first come first served). A request
+    is shed instead of queued when its predicted wait already exceeds its
+    budget or the queue is full; a full queue makes room for an interactive
+    request by shedding its newest batch request. A queued request that
+    waits past its budget is shed as well, so callers get an answer in
+    bounded time instead of piling up behind the upstream API.
+    """
+
+    def __init__(self, limit=ADMISSION_LIMIT, queue_size=ADMISSION_QUEUE_SIZE, max_wait=None):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = dict(ADMISSION_MAX_WAIT, **(max_wait or {}))
+        self.metrics = get_metrics()
+        self.active = 0
+        self._cond = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        # Running estimate of how long a request holds its slot
+        self._service_time = None
+        self._waits = LatencyHistogram(window=1000)
+        self._stats = {'admitted': 0, 'queued': 0, 'shed_predicted': 0, 'shed_full': 0, 'shed_timeout': 0,
+                       'shed_evicted': 0}
+
+    @contextmanager
+    def slot(self, purpose="interactive"):
+        """Hold one upstream slot for the enclosed block; raises Overloaded when the request is shed"""
+        if not self.limit:
+            yield
+            return
+        self._acquire(purpose)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def _acquire(self, purpose):
+        started = time.monotonic()
+        priority = PRIORITIES.get(purpose, len(PRIORITIES))
+        with self._cond:
+            if self.active < self.limit and not self._queue:
+                self._admit(purpose, 0.0)
+                return
+
+            max_wait = self.max_wait.get(purpose, self.max_wait['interactive'])
+            ahead = sum(1 for entry in self._queue if entry[0] <= priority)
+            if self._expected_wait(ahead) > max_wait:
+                # Waiting would only end in a timeout: answer now instead
+                self._shed(purpose, 'predicted')
+            if len(self._queue) >= self.queue_size:
+                self._make_room(priority, purpose)
+
+            waiter = _Waiter(purpose)
+            entry = (priority, next(self._sequence), waiter)
+            heapq.heappush(self._queue, entry)
+            self._stats['queued'] += 1
+            give_up_at = started + max_wait
+            while True:
+                if waiter.evicted:
+                    self._shed(purpose, 'evicted')
+                if self._queue[0] is entry and self.active < self.limit:
+                    heapq.heappop(self._queue)
+                    # The next waiter may also fit
+                    self._cond.notify_all()
+                    break
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    self._shed(purpose, 'timeout')
+                self._cond.wait(remaining)
+            self._admit(purpose, time.monotonic() - started)
+
+    def _make_room(self, priority, purpose):
+        """Evict the newest lower-priority waiter for this request, or shed it"""
+        if not self._queue:
+            # No queue at all (TRAVEL_ADMISSION_QUEUE=0): nothing to evict
+            self._shed(purpose, 'full')
+        worst = max(self._queue)
+        if worst[0] <= priority:
+            self._shed(purpose, 'full')
+        self._queue.remove(worst)
+        heapq.heapify(self._queue)
+        worst[2].evicted = True
+        self._cond.notify_all()
+
+    def _expected_wait(self, ahead):
+        if self._service_time is None:
+            return 0.0
+        # Slots free up at about limit / service_time per second
+        return (ahead + 1) * self._service_time / self.limit
+
+    def _admit(self, purpose, waited):
+        self.active += 1
+        self._stats['admitted'] += 1
+        self._waits.record(waited)
+        self.metrics.increment("travel_admission_total", purpose=purpose, outcome="admitted")
+        self.metrics.observe("travel_admission_wait_seconds", waited, purpose=purpose)
+
+    def _shed(self, purpose, reason):
+        self._stats[f"shed_{reason}"] += 1
+        self.metrics.increment("travel_admission_total", purpose=purpose, outcome=f"shed_{reason}")
+        raise Overloaded(reason, purpose)
+
+    def _release(self, held):
+        with self._cond:
+            self.active -= 1
+            self._service_time = held if self._service_time is None else (
+                (1 - SERVICE_SMOOTHING) * self._service_time + SERVICE_SMOOTHING * held)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Saturation gauges: slots in use, queue depth, wait percentiles and shed counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'limit': self.limit,
+                'active': self.active,
+                'queue_depth': len(self._queue),
+                'saturation': (self.active + len(self._queue)) / self.limit if self.limit else 0.0,
+                'service_seconds': self._service_time or 0.0,
+            })
+        waits = self._waits.snapshot()
+        stats.update({f"wait_{name}": value for name, value in waits.items() if name != 'count'})
+        return stats
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """Return the process-wide admission controller shared by both assistants"""
+    global _admission
+    if _admission is None:
+        with _admission_lock:
+            if _admission is None:
+                _admission = AdmissionController()
+                get_metrics().add_collector(
+                    lambda: {f"travel_admission_{name}": value for name, value in _admission.stats().items()}
+                )
+    return _admission
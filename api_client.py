@@ -0,0 +1,192 @@
+import json
+import os
+
+import requests
+
+from deadline import Deadline, DeadlineResult
+from itinerary import normalize_legs, render_itinerary_text, validate_legs
+from metrics import get_metrics
+from resilience import CONNECT_TIMEOUT
+from transport import get_transport
+
+# Travel API client configuration (override with environment variables)
+# Base URL of a running api_server.py; when set, the Streamlit app is a thin client to it
+API_URL = os.getenv("TRAVEL_API_URL", "").rstrip("/")
+# Seconds to wait for a full (non-streamed) answer, or between streamed events
+API_READ_TIMEOUT = float(os.getenv("TRAVEL_API_READ_TIMEOUT", "120"))
+
+LOST_MESSAGE = "\n\n❌ Connection to the travel API was lost before the answer finished."
+
+
+def _failure(error):
+    """Error text for a failed API call; errors reported by the server already read as one"""
+    message = str(error)
+    return message if message.startswith("❌") else f"❌ Travel API unavailable: {message}"
+
+
+def iter_events(response):
+    """Parse a server-sent event stream into (event, data) pairs with JSON data"""
+    event, data = "message", []
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].lstrip())
+
+
+class RemoteTravelAssistant:
+    """SimpleTravelAssistant's interface, served by the HTTP API (api_server.py)
+
+    The model calls, caches and API key live on the server, so this client
+    holds no state beyond the pooled HTTP session.
+    """
+
+    def __init__(self, base_url=API_URL, tenant=None, read_timeout=API_READ_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.tenant = tenant
+        self.timeout = (CONNECT_TIMEOUT, read_timeout)
+        self.session = get_transport().session
+        self.metrics = get_metrics()
+        self._ready = False
+
+    @property
+    def api_key(self):
+        """Whether the server is ready to generate (the key itself stays on the server)"""
+        # Asked again until the server is up, then remembered
+        if not self._ready:
+            self._ready = self.readiness().get('ready', False)
+        return self._ready
+
+    def readiness(self):
+        """The server's /readyz report, or {'ready': False, 'error': ...} when it cannot be reached"""
+        try:
+            response = self.session.get(f"{self.base_url}/readyz", timeout=self.timeout)
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            return {'ready': False, 'error': str(e)}
+
+    def _post(self, path, body, stream=False):
+        headers = {"X-Tenant": self.tenant} if self.tenant else {}
+        self.metrics.increment("travel_api_client_requests_total", route=path)
+        response = self.session.post(f"{self.base_url}{path}", json=body, headers=headers, stream=stream,
+                                     timeout=self.timeout)
+        # 502 carries the assistant's own error answer, and so does a shed request's 503; anything
+        # else is the API's error
+        if response.status_code >= 400 and response.status_code != 502:
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = {}
+            if response.status_code == 503 and 'content' in payload:
+                return response
+            response.close()
+            raise requests.HTTPError(payload.get('error') or f"HTTP {response.status_code}", response=response)
+        return response
+
+    def _events(self, path, body):
+        """(event, data) pairs from a streaming endpoint; yields ('lost', None) if the stream breaks off"""
+        with self._post(path, body, stream=True) as response:
+            try:
+                for event, data in iter_events(response):
+                    if event == "done":
+                        return
+                    yield event, data
+            except requests.RequestException:
+                pass
+        yield "lost", None
+
+    @staticmethod
+    def _trip_body(destination, start_date, end_date, bypass_cache, deadline):
+        body = {'destination': destination, 'start_date': str(start_date), 'end_date': str(end_date),
+                'bypass_cache': bypass_cache}
+        if deadline is not None:
+            # Time already spent on this side counts against the budget
+            body['deadline'] = deadline.remaining() if isinstance(deadline, Deadline) else deadline
+        return body
+
+    def generate_recommendations(self, destination, start_date, end_date, bypass_cache=False, deadline=None):
+        body = self._trip_body(destination, start_date, end_date, bypass_cache, deadline)
+        try:
+            with self._post("/v1/recommendations", body) as response:
+                result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            return _failure(e)
+        return DeadlineResult(result['content'], partial=result['partial'], source=result['source'])
+
+    def stream_recommendations(self, destination, start_date, end_date, bypass_cache=False, deadline=None):
+        body = self._trip_body(destination, start_date, end_date, bypass_cache, deadline)
+        received = False
+        try:
+            for event, data in self._events("/v1/recommendations/stream", body):
+                if event == "chunk":
+                    received = True
+                    yield data['text']
+                elif event == "error":
+                    yield ("\n\n" if received else "") + data['error']
+                elif event == "lost":
+                    yield LOST_MESSAGE if received else LOST_MESSAGE.strip()
+        except requests.RequestException as e:
+            yield _failure(e)
+
+    def iter_sections(self, destination, start_date, end_date, bypass_cache=False, deadline=None):
+        body = self._trip_body(destination, start_date, end_date, bypass_cache, deadline)
+        try:
+            for event, data in self._events("/v1/sections/stream", body):
+                if event == "section":
+                    yield data['key'], data['value']
+                elif event == "error":
+                    yield 'error', data['error']
+                elif event == "lost":
+                    yield 'error', LOST_MESSAGE.strip()
+        except requests.RequestException as e:
+            yield 'error', _failure(e)
+
+    def cached_sections(self, destination, start_date, end_date):
+        """Keys of the sections this trip could reuse from the server's cache"""
+        try:
+            with self._post("/v1/sections/cached", self._trip_body(destination, start_date, end_date,
+                                                                   False, None)) as response:
+                return set(response.json()['sections'])
+        except (requests.RequestException, ValueError):
+            return set()
+
+    def generate_sectioned_recommendations(self, destination, start_date, end_date, bypass_cache=False,
+                                           deadline=None):
+        body = self._trip_body(destination, start_date, end_date, bypass_cache, deadline)
+        try:
+            with self._post("/v1/sections", body) as response:
+                return response.json()['sections']
+        except (requests.RequestException, ValueError) as e:
+            return {'error': _failure(e)}
+
+    def iter_itinerary(self, legs, bypass_cache=False, deadline=None):
+        """Yield (leg index, text) as each leg finishes on the server"""
+        legs = normalize_legs(legs)
+        body = {'legs': legs, 'bypass_cache': bypass_cache}
+        if deadline is not None:
+            body['deadline'] = deadline.remaining() if isinstance(deadline, Deadline) else deadline
+        pending = set(range(len(legs)))
+        error = LOST_MESSAGE.strip()
+        try:
+            for event, data in self._events("/v1/itinerary/stream", body):
+                if event == "leg":
+                    pending.discard(data['index'])
+                    yield data['index'], data['content']
+                elif event == "error":
+                    error = data['error']
+        except requests.RequestException as e:
+            error = _failure(e)
+        for index in sorted(pending):
+            yield index, error
+
+    def generate_itinerary(self, legs, bypass_cache=False, deadline=None):
+        """Generate every (destination, start_date, end_date) leg and merge them in leg order"""
+        legs = normalize_legs(legs)
+        error = validate_legs(legs)
+        if error:
+            return f"❌ {error}"
+        return render_itinerary_text(legs, dict(self.iter_itinerary(legs, bypass_cache, deadline)))
@@ -0,0 +1,485 @@
+"""Headless HTTP API around the travel assistant, for load-balanced deployments.
+
+Usage:
+    python api_server.py --port 8080 --workers 4
+
+Endpoints (POST bodies are JSON with destination, start_date and end_date,
+optionally bypass_cache and deadline in seconds; itinerary bodies carry
+legs, a list of [destination, start_date, end_date]):
+
+    POST /v1/recommendations          full text answer as JSON
+    POST /v1/recommendations/stream   text chunks as server-sent events
+    POST /v1/sections                 sectioned answer as JSON
+    POST /v1/sections/stream          one server-sent event per section
+    POST /v1/sections/cached          sections already cached, without generating
+    POST /v1/itinerary                every leg as JSON
+    POST /v1/itinerary/stream         one server-sent event per finished leg
+    GET  /healthz                     liveness
+    GET  /readyz                      readiness (503 without an API key or while draining)
+    GET  /metrics                     this worker's metrics, Prometheus format
+
+The parent process binds the port and forks the workers, which share the
+listening socket; a crashed worker is replaced. SIGTERM or SIGINT drains
+gracefully: readiness fails, the listener closes, and requests in flight
+(streams included) finish before the worker exits. The X-Tenant header
+identifies the caller for per-tenant rate limiting.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import tornado.httpserver
+import tornado.iostream
+import tornado.netutil
+import tornado.process
+import tornado.web
+
+from admission import BUSY_MESSAGE, BUSY_NOTICE
+from credentials import get_credential
+from deadline import DEADLINE_SECONDS
+from itinerary import normalize_legs, validate_legs
+from metrics import get_metrics
+from simple_assistant import SimpleTravelAssistant
+from trip_history import is_error_response
+
+# API server configuration (override with environment variables)
+API_HOST = os.getenv("TRAVEL_API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("TRAVEL_API_PORT", "8080"))
+# Worker processes; 0 = one per CPU
+API_WORKERS = int(os.getenv("TRAVEL_API_WORKERS", "0"))
+# Blocking assistant calls in flight per worker
+API_THREADS = int(os.getenv("TRAVEL_API_THREADS", "32"))
+# Seconds readiness fails before the listener closes, so the load balancer stops routing first
+API_DRAIN_DELAY = float(os.getenv("TRAVEL_API_DRAIN_DELAY", "0"))
+# Seconds requests in flight get to finish on shutdown
+API_SHUTDOWN_TIMEOUT = float(os.getenv("TRAVEL_API_SHUTDOWN_TIMEOUT", "30"))
+
+MAX_BODY_BYTES = 64 * 1024
+# Retry-After seconds sent with answers shed under overload
+BUSY_RETRY_AFTER = 30
+
+
+class RequestError(Exception):
+    """A request the API rejects with 400"""
+
+
+class ServiceState:
+    """Per-worker state shared by the handlers"""
+
+    def __init__(self, threads=API_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="travel-api")
+        self.in_flight = 0
+        self.draining = False
+        self.started_at = time.time()
+        self.metrics = get_metrics()
+        self.metrics.add_collector(lambda: {'travel_api_in_flight': self.in_flight})
+
+
+def _parse_date(value, field):
+    try:
+        return datetime.strptime(str(value).strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise RequestError(f"{field} must be a YYYY-MM-DD date")
+
+
+def _deadline(body):
+    """The body's deadline in seconds, else the server default (None = no budget)"""
+    deadline = body.get('deadline', DEADLINE_SECONDS or None)
+    if deadline is None:
+        return None
+    try:
+        deadline = float(deadline)
+    except (TypeError, ValueError):
+        raise RequestError("deadline must be a number of seconds")
+    return deadline if deadline > 0 else None
+
+
+def sse_event(event, data):
+    """One server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def iterate_in_thread(executor, iterable):
+    """Iterate a blocking iterable on the executor, yielding its items on the event loop
+
+    Stopping early (e.g. the client went away) closes the iterable between
+    items, so abandoned work does not run to completion on a pool thread.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def put(item, error=None):
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, (item, error))
+        except RuntimeError:
+            # The loop is gone (worker shutting down); nobody is listening
+            stop.set()
+
+    def pump():
+        error = None
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    break
+                put(item)
+        except Exception as e:
+            error = e
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            put(done, error)
+
+    loop.run_in_executor(executor, pump)
+    try:
+        while True:
+            item, error = await items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    """JSON in, JSON out; counts requests in flight for graceful shutdown"""
+
+    route = "other"
+
+    def initialize(self, state):
+        self.state = state
+        self.started = time.perf_counter()
+        self.client_gone = False
+
+    def prepare(self):
+        if self.state.draining:
+            # A keep-alive connection can still deliver requests after the listener closed
+            self.set_status(503)
+            self.set_header("Connection", "close")
+            self.finish({'error': "❌ Server is shutting down"})
+            return
+        self.state.in_flight += 1
+        self._counted = True
+
+    def on_finish(self):
+        if getattr(self, '_counted', False):
+            self._counted = False
+            self.state.in_flight -= 1
+        metrics = self.state.metrics
+        metrics.increment("travel_api_requests_total", route=self.route, status=self.get_status())
+        metrics.observe("travel_api_request_seconds", time.perf_counter() - self.started, route=self.route)
+
+    def on_connection_close(self):
+        self.client_gone = True
+
+    def write_error(self, status_code, **kwargs):
+        error = kwargs.get('exc_info', (None, None))[1]
+        message = str(error) if isinstance(error, RequestError) else self._reason
+        self.finish({'error': f"❌ {message}"})
+
+    def send_json(self, data, status=200):
+        self.set_status(status)
+        self.finish(data)
+
+    def body(self):
+        if len(self.request.body) > MAX_BODY_BYTES:
+            raise RequestError("request body too large")
+        try:
+            body = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise RequestError("request body must be JSON")
+        if not isinstance(body, dict):
+            raise RequestError("request body must be a JSON object")
+        return body
+
+    def trip(self, body):
+        """(destination, start_date, end_date) from a request body"""
+        destination = str(body.get('destination') or "").strip()
+        if not destination:
+            raise RequestError("destination is required")
+        start_date = _parse_date(body.get('start_date', ""), "start_date")
+        end_date = _parse_date(body.get('end_date', ""), "end_date")
+        if start_date >= end_date:
+            raise RequestError("end_date must be after start_date")
+        return destination, start_date, end_date
+
+    def legs(self, body):
+        try:
+            legs = normalize_legs(body.get('legs') or [])
+        except (TypeError, ValueError):
+            raise RequestError("legs must be a list of [destination, start_date, end_date]")
+        error = validate_legs(legs)
+        if error:
+            raise RequestError(error)
+        return legs
+
+    def assistant(self):
+        """A request-scoped assistant; the caches, router and pools behind it are process-wide"""
+        tenant = self.request.headers.get("X-Tenant") or self.request.remote_ip
+        return SimpleTravelAssistant(tenant=tenant)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking assistant call on the worker's thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.state.executor, lambda: fn(*args, **kwargs))
+
+    async def post(self):
+        try:
+            body = self.body()
+            await self.handle(body)
+        except RequestError as e:
+            self.send_error(400, exc_info=(RequestError, e, None))
+
+    async def stream(self, events):
+        """Send (event, data) pairs as server-sent events, then a done event
+
+        Clients can tell a finished stream from a dropped connection by the
+        done event. If the client leaves, the rest of the work is abandoned.
+        """
+        self.set_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.set_header("Cache-Control", "no-cache")
+        # Tell buffering proxies (e.g. nginx) to pass events through immediately
+        self.set_header("X-Accel-Buffering", "no")
+        iterator = iterate_in_thread(self.state.executor, events)
+        try:
+            async for event, data in iterator:
+                self.write(sse_event(event, data))
+                await self.flush()
+                if self.client_gone:
+                    break
+            else:
+                self.write(sse_event("done", {}))
+        except tornado.iostream.StreamClosedError:
+            self.client_gone = True
+        except Exception as e:
+            # Headers are already sent, so the failure travels as an event; done still ends the stream
+            self.write(sse_event("error", {'error': f"❌ Error generating recommendations: {str(e)}"}))
+            self.write(sse_event("done", {}))
+        finally:
+            await iterator.aclose()
+        if self.client_gone:
+            self.state.metrics.increment("travel_api_disconnects_total", route=self.route)
+            return
+        self.finish()
+
+
+class RecommendationsHandler(BaseHandler):
+    route = "recommendations"
+
+    async def handle(self, body):
+        result = await self.run(self.assistant().generate_recommendations, *self.trip(body),
+                                bypass_cache=bool(body.get('bypass_cache')), deadline=_deadline(body))
+        partial = getattr(result, 'partial', False)
+        error = is_error_response(result) and not partial
+        status = 502 if error else 200
+        if str(result).startswith((BUSY_MESSAGE, BUSY_NOTICE)):
+            # Shed by admission control: overloaded, not failing, so clients and load balancers back off
+            status = 503
+            self.set_header("Retry-After", str(BUSY_RETRY_AFTER))
+        self.send_json({'content': str(result), 'partial': partial,
+                        'source': getattr(result, 'source', "complete"), 'error': error},
+                       status=status)
+
+
+class RecommendationsStreamHandler(BaseHandler):
+    route = "recommendations_stream"
+
+    async def handle(self, body):
+        chunks = self.assistant().stream_recommendations(*self.trip(body), bypass_cache=bool(body.get('bypass_cache')),
+                                                         deadline=_deadline(body))
+        await self.stream(("chunk", {'text': chunk}) for chunk in chunks)
+
+
+class SectionsHandler(BaseHandler):
+    route = "sections"
+
+    async def handle(self, body):
+        sections = await self.run(self.assistant().generate_sectioned_recommendations, *self.trip(body),
+                                  bypass_cache=bool(body.get('bypass_cache')), deadline=_deadline(body))
+        self.send_json({'sections': sections, 'error': 'error' in sections})
+
+
+class SectionsStreamHandler(BaseHandler):
+    route = "sections_stream"
+
+    async def handle(self, body):
+        sections = self.assistant().iter_sections(*self.trip(body), bypass_cache=bool(body.get('bypass_cache')),
+                                                  deadline=_deadline(body))
+        await self.stream(("section", {'key': key, 'value': value}) for key, value in sections)
+
+
+class CachedSectionsHandler(BaseHandler):
+    route = "sections_cached"
+
+    async def handle(self, body):
+        sections = await self.run(self.assistant().cached_sections, *self.trip(body))
+        self.send_json({'sections': sorted(sections)})
+
+
+class ItineraryHandler(BaseHandler):
+    route = "itinerary"
+
+    async def handle(self, body):
+        legs = self.legs(body)
+        results = await self.run(lambda: dict(self.assistant().iter_itinerary(
+            legs, bypass_cache=bool(body.get('bypass_cache')), deadline=_deadline(body))))
+        self.send_json({'legs': [{'index': index, 'content': results.get(index, "")} for index in range(len(legs))],
+                        'error': any(is_error_response(content) for content in results.values())})
+
+
+class ItineraryStreamHandler(BaseHandler):
+    route = "itinerary_stream"
+
+    async def handle(self, body):
+        legs = self.legs(body)
+        results = self.assistant().iter_itinerary(legs, bypass_cache=bool(body.get('bypass_cache')),
+                                                  deadline=_deadline(body))
+        await self.stream(("leg", {'index': index, 'content': content}) for index, content in results)
+
+
+class HealthHandler(BaseHandler):
+    route = "healthz"
+
+    def prepare(self):
+        pass
+
+    def get(self):
+        self.send_json({'status': "ok", 'pid': os.getpid(), 'uptime': round(time.time() - self.state.started_at, 1)})
+
+
+class ReadyHandler(HealthHandler):
+    route = "readyz"
+
+    def get(self):
+        api_key = bool(get_credential("OPENAI_API_KEY"))
+        ready = api_key and not self.state.draining
+        self.send_json({'ready': ready, 'api_key': api_key, 'draining': self.state.draining,
+                        'in_flight': self.state.in_flight}, status=200 if ready else 503)
+
+
+class MetricsHandler(HealthHandler):
+    route = "metrics"
+
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(self.state.metrics.render_prometheus())
+
+
+def make_app(state):
+    return tornado.web.Application([
+        (r"/v1/recommendations", RecommendationsHandler, {'state': state}),
+        (r"/v1/recommendations/stream", RecommendationsStreamHandler, {'state': state}),
+        (r"/v1/sections", SectionsHandler, {'state': state}),
+        (r"/v1/sections/stream", SectionsStreamHandler, {'state': state}),
+        (r"/v1/sections/cached", CachedSectionsHandler, {'state': state}),
+        (r"/v1/itinerary", ItineraryHandler, {'state': state}),
+        (r"/v1/itinerary/stream", ItineraryStreamHandler, {'state': state}),
+        (r"/healthz", HealthHandler, {'state': state}),
+        (r"/readyz", ReadyHandler, {'state': state}),
+        (r"/metrics", MetricsHandler, {'state': state}),
+    ])
+
+
+async def serve(sockets, drain_delay=API_DRAIN_DELAY, shutdown_timeout=API_SHUTDOWN_TIMEOUT):
+    """Serve on already-bound sockets until SIGTERM/SIGINT, then drain"""
+    loop = asyncio.get_running_loop()
+    state = ServiceState()
+    server = tornado.httpserver.HTTPServer(make_app(state), max_body_size=MAX_BODY_BYTES)
+    server.add_sockets(sockets)
+    stop = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+
+    state.draining = True
+    await asyncio.sleep(drain_delay)
+    server.stop()
+    # Let requests in flight, streams included, run to completion
+    give_up_at = loop.time() + shutdown_timeout
+    while state.in_flight and loop.time() < give_up_at:
+        await asyncio.sleep(0.05)
+    if state.in_flight:
+        print(f"⚠️  Worker {os.getpid()} stopping with {state.in_flight} requests still in flight", file=sys.stderr)
+    await server.close_all_connections()
+    state.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_worker(sockets):
+    asyncio.run(serve(sockets))
+
+
+def supervise(sockets, workers):
+    """Fork workers sharing the sockets, replace crashed ones, and forward shutdown signals"""
+    children = {}
+    stopping = False
+
+    def spawn(worker_id):
+        pid = os.fork()
+        if pid == 0:
+            # Signals are handled by the worker's event loop
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                run_worker(sockets)
+            except BaseException as e:
+                print(f"❌ Worker {worker_id} failed: {e}", file=sys.stderr)
+                os._exit(1)
+            os._exit(0)
+        children[pid] = worker_id
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for worker_id in range(workers):
+        spawn(worker_id)
+    print(f"✈️  Travel API listening with {workers} workers (pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker_id = children.pop(pid, None)
+        if worker_id is None or stopping:
+            continue
+        print(f"⚠️  Worker {worker_id} (pid {pid}) exited with status {status}; restarting", file=sys.stderr)
+        time.sleep(1)
+        spawn(worker_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the travel assistant over HTTP")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    sockets = tornado.netutil.bind_sockets(args.port, args.host)
+    workers = args.workers or tornado.process.cpu_count()
+    if workers == 1:
+        print(f"✈️  Travel API listening on {args.host}:{args.port}")
+        run_worker(sockets)
+    else:
+        supervise(sockets, workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
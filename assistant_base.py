@@ -0,0 +1,280 @@
+from response_cache import get_response_cache, make_cache_key
+from single_flight import get_single_flight
+from warm_store import get_warm_store
+from resilience import get_resilience
+from router import get_router, single_backend_router
+from sections import (SECTIONS, SECTIONS_BY_KEY, assemble_sections, build_section_messages, cached_section_keys,
+                      cached_section_values, generate_cached_sections)
+from itinerary import generate_legs, normalize_legs, render_itinerary_text, validate_legs
+from deadline import as_deadline, generate_within, sections_within, stream_within
+from knowledge_base import (FALLBACK_NOTICE, KNOWLEDGE_MODE, KNOWLEDGE_NOTICE, knowledge_sections,
+                            preferred_knowledge)
+from trip_history import is_error_response
+from admission import BUSY_MESSAGE, BUSY_NOTICE, Overloaded, get_admission_controller
+from trace_recorder import NULL_TRACE, get_trace_recorder
+from destinations import destination_label
+from credentials import get_credential
+from metrics import get_metrics
+
+
+class AssistantBase:
+    """Request flow shared by both assistants, independent of how the model is called
+
+    A subclass names its cache namespace and metrics label and supplies
+    the transport: _ready, _build_messages, _render_sections and the
+    _fetch_recommendations, _stream_fetch and _fetch_section upstream calls.
+    """
+
+    # Response cache namespace; sections are cached under "<namespace>_sections"
+    cache_namespace = None
+    # Assistant label on metrics and trace records
+    assistant_label = None
+    not_ready_message = "❌ OpenAI API key not configured. Please check your Streamlit secrets."
+    sections_failed_message = "❌ Some sections could not be generated: {}"
+
+    def __init__(self, api_key=None, base_url=None, purpose="interactive", tenant=None,
+                 knowledge_mode=KNOWLEDGE_MODE):
+        self.api_key = api_key or get_credential("OPENAI_API_KEY")
+        self.base_url = base_url
+        # An explicit endpoint pins every call to it; otherwise the shared router picks a backend
+        self.router = single_backend_router(base_url, self.api_key) if base_url else get_router()
+        self.purpose = purpose
+        # Rate-limit fairness is per tenant (e.g. a Streamlit session); defaults to the purpose
+        self.tenant = tenant
+        self.cache = get_response_cache()
+        self.flights = get_single_flight()
+        self.warm = get_warm_store()
+        self.resilience = get_resilience()
+        self.metrics = get_metrics()
+        # Bounds upstream concurrency and sheds load instead of queueing without limit
+        self.admission = get_admission_controller()
+        # How the offline knowledge base is used: off, fallback, blend or instant
+        self.knowledge_mode = knowledge_mode
+        # Appends each request to a replayable trace when TRAVEL_TRACE_PATH is set
+        self.recorder = get_trace_recorder()
+
+    @property
+    def sections_namespace(self):
+        return f"{self.cache_namespace}_sections"
+
+    def _ready(self):
+        """Whether upstream calls can be made at all (e.g. an API key is configured)"""
+        return bool(self.api_key)
+
+    def generate_recommendations(self, destination, start_date, end_date, bypass_cache=False, deadline=None):
+        if not self._ready():
+            return self.not_ready_message
+
+        if deadline is not None:
+            # Whatever is ready when the budget runs out, flagged with .partial
+            return generate_within(self.stream_recommendations(destination, start_date, end_date, bypass_cache),
+                                   deadline, lambda: self._deadline_fallback(destination, start_date, end_date))
+
+        trace = self._trace("full", destination, start_date, end_date, bypass_cache)
+
+        # Curated content answers at once in instant mode
+        instant = self._knowledge_text(destination, start_date, end_date, KNOWLEDGE_NOTICE, "instant")
+        if instant is not None:
+            return trace.finish(instant)
+
+        # Serve precomputed and repeat queries without an upstream call
+        cache_key = make_cache_key(self.cache_namespace, destination, start_date, end_date)
+        self.metrics.increment("travel_destination_requests_total", assistant=self.assistant_label,
+                               destination=destination_label(destination))
+        if not bypass_cache:
+            cached = self._cached_response(destination, start_date, end_date, cache_key)
+            if cached is not None:
+                return trace.finish(cached)
+
+        # Concurrent duplicates share one upstream call, which waits its turn for a slot under load
+        trace.miss()
+        try:
+            result = self.flights.do(cache_key, lambda: self._admitted(
+                self._fetch_recommendations, destination, start_date, end_date, cache_key, trace))
+        except Overloaded:
+            return trace.finish(self._shed_response(destination, start_date, end_date))
+        if is_error_response(result):
+            # Curated content beats an error when the model is unavailable
+            result = self._knowledge_text(destination, start_date, end_date, FALLBACK_NOTICE) or result
+        return trace.finish(result)
+
+    def stream_recommendations(self, destination, start_date, end_date, bypass_cache=False, deadline=None):
+        """Yield recommendation text chunks as they arrive from the API"""
+        if deadline is not None:
+            # Stop at the deadline with a partial notice; the upstream stream finishes and is cached
+            yield from stream_within(self.stream_recommendations(destination, start_date, end_date, bypass_cache),
+                                     deadline, lambda: self._deadline_fallback(destination, start_date, end_date))
+            return
+
+        if not self._ready():
+            yield self.not_ready_message
+            return
+
+        trace = self._trace("stream", destination, start_date, end_date, bypass_cache)
+        yield from trace.stream(self._stream_recommendations(destination, start_date, end_date, bypass_cache, trace))
+
+    def _stream_recommendations(self, destination, start_date, end_date, bypass_cache, trace):
+        """Chunks for stream_recommendations: instant or cached content, else the shared upstream stream"""
+        # Curated content answers at once in instant mode
+        instant = self._knowledge_text(destination, start_date, end_date, KNOWLEDGE_NOTICE, "instant")
+        if instant is not None:
+            yield instant
+            return
+
+        cache_key = make_cache_key(self.cache_namespace, destination, start_date, end_date)
+        self.metrics.increment("travel_destination_requests_total", assistant=self.assistant_label,
+                               destination=destination_label(destination))
+        if not bypass_cache:
+            cached = self._cached_response(destination, start_date, end_date, cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        # Concurrent duplicates share the same chunk stream, which holds one slot until it ends
+        trace.miss()
+        received = False
+        try:
+            for chunk in self.flights.stream(cache_key, lambda: self._admitted_stream(
+                    self._stream_fetch, destination, start_date, end_date, cache_key, trace)):
+                if not received and is_error_response(chunk):
+                    # Failed before any text arrived: curated content beats an error
+                    fallback = self._knowledge_text(destination, start_date, end_date, FALLBACK_NOTICE)
+                    if fallback is not None:
+                        yield fallback
+                        return
+                received = True
+                yield chunk
+        except Overloaded:
+            # Shedding happens before the stream opens, so nothing has been yielded yet
+            yield self._shed_response(destination, start_date, end_date)
+
+    def iter_sections(self, destination, start_date, end_date, bypass_cache=False, deadline=None):
+        """Yield (key, value) pairs as each recommendation section lands"""
+        if deadline is not None:
+            # Sections still running at the deadline are named in 'error' and cached once they land
+            yield from sections_within(self.iter_sections(destination, start_date, end_date, bypass_cache), deadline)
+            return
+
+        if not self._ready():
+            yield 'error', self.not_ready_message
+            return
+
+        trace = self._trace("sections", destination, start_date, end_date, bypass_cache)
+        yield from trace.stream(self._iter_sections(destination, start_date, end_date, bypass_cache, trace))
+
+    def _iter_sections(self, destination, start_date, end_date, bypass_cache, trace):
+        """(key, value) pairs for iter_sections, requesting only the sections cache cannot serve"""
+        self.metrics.increment("travel_destination_requests_total", assistant=self.assistant_label,
+                               destination=destination_label(destination))
+
+        def fetch(messages, max_tokens):
+            return self._fetch_section(messages, max_tokens, trace)
+
+        # Sections whose inputs are unchanged come from cache; only the rest are requested, all at once
+        failed = []
+        sections = generate_cached_sections(fetch, self.cache, self.sections_namespace,
+                                            destination, start_date, end_date, bypass_cache,
+                                            knowledge=self._knowledge(destination),
+                                            prefer_knowledge=preferred_knowledge(self.knowledge_mode))
+        for key, value, error in sections:
+            if error:
+                failed.append(SECTIONS_BY_KEY[key]['title'])
+                continue
+            yield key, value
+
+        if failed:
+            yield 'error', self.sections_failed_message.format(", ".join(failed))
+
+    def cached_sections(self, destination, start_date, end_date):
+        """Keys of the sections this trip could reuse from cache"""
+        return cached_section_keys(self.cache, self.sections_namespace, destination, start_date, end_date)
+
+    def generate_sectioned_recommendations(self, destination, start_date, end_date, bypass_cache=False,
+                                           deadline=None):
+        """Generate all sections concurrently and return them in canonical order"""
+        return assemble_sections(dict(self.iter_sections(destination, start_date, end_date, bypass_cache, deadline)))
+
+    def iter_itinerary(self, legs, bypass_cache=False, deadline=None):
+        """Yield (leg index, text) for a multi-destination trip as each leg finishes; legs run concurrently"""
+        # Legs share one deadline, so the whole itinerary is due at once
+        deadline = as_deadline(deadline) if deadline is not None else None
+        yield from generate_legs(
+            lambda destination, start_date, end_date: self.generate_recommendations(
+                destination, start_date, end_date, bypass_cache, deadline),
+            normalize_legs(legs)
+        )
+
+    def generate_itinerary(self, legs, bypass_cache=False, deadline=None):
+        """Generate every (destination, start_date, end_date) leg and merge them in leg order"""
+        legs = normalize_legs(legs)
+        error = validate_legs(legs)
+        if error:
+            return f"❌ {error}"
+        return render_itinerary_text(legs, dict(self.iter_itinerary(legs, bypass_cache, deadline)))
+
+    def _trace(self, operation, destination, start_date, end_date, bypass_cache):
+        """Start recording this request when traffic capture is on; a no-op trace otherwise"""
+        if self.recorder is None:
+            return NULL_TRACE
+        if operation == "sections":
+            messages = [build_section_messages(section, destination, start_date, end_date) for section in SECTIONS]
+        else:
+            messages = self._build_messages(destination, start_date, end_date)
+        return self.recorder.start(self.assistant_label, operation, destination, start_date, end_date, messages,
+                                   self.purpose, self.tenant, bypass_cache)
+
+    def _admitted(self, fetch, *args, purpose=None):
+        """Run an upstream call once the admission controller grants a slot; raises Overloaded when shed"""
+        with self.admission.slot(purpose or self.purpose):
+            return fetch(*args)
+
+    def _admitted_stream(self, fetch, *args):
+        """Like _admitted for a chunk stream, holding the slot until the stream ends or is closed
+
+        Single flight closes the stream once its last reader leaves, which
+        releases the slot of an abandoned stream.
+        """
+        with self.admission.slot(self.purpose):
+            yield from fetch(*args)
+
+    def _shed_response(self, destination, start_date, end_date):
+        """Immediate answer for a shed request: saved sections for this trip, else a busy message"""
+        saved = self._deadline_fallback(destination, start_date, end_date)
+        return BUSY_NOTICE + saved if saved else BUSY_MESSAGE
+
+    def _deadline_fallback(self, destination, start_date, end_date):
+        """Cached sections for this trip (e.g. hotels from another date), shown when nothing else is ready in time"""
+        cached = cached_section_values(self.cache, self.sections_namespace, destination, start_date, end_date)
+        values = {**self._knowledge(destination), **cached}
+        if not values:
+            return None
+        return self._render_sections(values, destination, start_date, end_date)
+
+    def _knowledge(self, destination):
+        """Curated sections from the offline knowledge base, unless it is switched off"""
+        return knowledge_sections(destination) if self.knowledge_mode != "off" else {}
+
+    def _knowledge_text(self, destination, start_date, end_date, notice, mode=None):
+        """Knowledge base sections rendered under a notice; None when there are none or mode is not active"""
+        if mode is not None and self.knowledge_mode != mode:
+            return None
+        values = self._knowledge(destination)
+        if not values:
+            return None
+        return notice + self._render_sections(values, destination, start_date, end_date)
+
+    def _cached_response(self, destination, start_date, end_date, cache_key):
+        """Precomputed warm store first, then the response cache; stale warm entries refresh in the background"""
+        warm, fresh = self.warm.lookup(self.cache_namespace, destination, start_date)
+        if warm is not None and fresh:
+            return warm
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if warm is not None:
+            # Background refreshes queue behind interactive requests
+            self.warm.refresh(cache_key, lambda: self.flights.do(cache_key, lambda: self._admitted(
+                self._fetch_recommendations, destination, start_date, end_date, cache_key, purpose="batch")))
+        return warm
@@ -0,0 +1,274 @@
+"""Bulk itinerary generation from a JSONL file of trips.
+
+Usage:
+    python batch.py trips.jsonl results.jsonl --concurrency 16 --rpm 300
+
+Each input line is a JSON object with destination, start_date and end_date
+(and optionally a request_id). Results are appended to the output file as
+they complete; re-running with the same output file skips trips that have
+already succeeded, so an interrupted run resumes where it stopped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from credentials import get_credential
+from prompts import build_luxury_messages
+from response_cache import get_response_cache, make_cache_key
+from resilience import CONNECT_TIMEOUT, READ_TIMEOUT, RETRY_STATUS_CODES, retry_after_seconds, retry_delay
+from router import get_router
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1/chat/completions"
+TRIP_FIELDS = ('destination', 'start_date', 'end_date')
+
+
+class AsyncRateLimiter:
+    """Spaces request starts evenly to stay under a requests-per-minute budget"""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for the next free request slot"""
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class InvalidLine:
+    """An input line that is not valid JSON, kept so it gets an error result like any other bad record"""
+
+    def __init__(self, line_number, error):
+        self.line_number = line_number
+        self.error = error
+
+
+def load_records(path):
+    """Read trip records from a JSONL file; lines that are not JSON become InvalidLine records"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                print(f"⚠️  Line {line_number} is not valid JSON: {e}", file=sys.stderr)
+                records.append(InvalidLine(line_number, str(e)))
+    return records
+
+
+def validate_record(record):
+    """Return why a trip record cannot be run, or None when it is well formed"""
+    if isinstance(record, InvalidLine):
+        return f"Line {record.line_number} is not valid JSON: {record.error}"
+    if not isinstance(record, dict):
+        return f"Expected a JSON object, got {type(record).__name__}"
+    missing = [field for field in TRIP_FIELDS if record.get(field) in (None, "")]
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
+    wrong = [field for field in TRIP_FIELDS if not isinstance(record[field], str) or not record[field].strip()]
+    if wrong:
+        return f"Fields must be non-empty strings: {', '.join(wrong)}"
+    return None
+
+
+def record_id(record):
+    """Return a stable identifier for a trip record"""
+    if isinstance(record, InvalidLine):
+        return f"line:{record.line_number}"
+    if not isinstance(record, dict):
+        return make_cache_key("batch", json.dumps(record, sort_keys=True), "", "")
+    if record.get('request_id'):
+        return str(record['request_id'])
+    return make_cache_key("batch", record.get('destination', ""),
+                          record.get('start_date', ""), record.get('end_date', ""))
+
+
+def load_checkpoint(path):
+    """Return the ids already completed successfully in an output file"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # Partially written last line from an interrupted run
+                continue
+            # Only result objects count; anything else in the file is not ours
+            if isinstance(result, dict) and result.get('status') == "ok" and 'id' in result:
+                done.add(result['id'])
+    return done
+
+
+async def generate_one(client, limiter, record, api_key, base_url, model, max_retries, cache):
+    """Generate recommendations for one trip, retrying rate limits and server errors"""
+    destination = record['destination'].strip()
+    start_date, end_date = record['start_date'], record['end_date']
+
+    cache_key = make_cache_key("simple_travel_assistant", destination, start_date, end_date)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return {'status': "ok", 'content': cached, 'cached': True}
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    data = {
+        "model": model,
+        "messages": build_luxury_messages(destination, start_date, end_date),
+        "max_tokens": 3000,
+        "temperature": 0.7
+    }
+
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        try:
+            response = await client.post(base_url, headers=headers, json=data)
+        except httpx.HTTPError as e:
+            if attempt == max_retries:
+                return {'status': "error", 'error': f"Error connecting to OpenAI API: {e}"}
+            await asyncio.sleep(retry_delay(attempt))
+            continue
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+            await asyncio.sleep(retry_delay(attempt, retry_after_seconds(response.headers)))
+            continue
+
+        if response.status_code != 200:
+            return {'status': "error", 'error': f"HTTP {response.status_code}: {response.text[:200]}"}
+
+        try:
+            result = response.json()
+            content = result['choices'][0]['message']['content']
+        except (ValueError, KeyError, IndexError):
+            return {'status': "error", 'error': "Unexpected response format from OpenAI API."}
+
+        cache.set(cache_key, content)
+        return {'status': "ok", 'content': content, 'cached': False, 'usage': result.get('usage')}
+
+
+async def run_batch(records, output_path, api_key, base_url=DEFAULT_BASE_URL, model="gpt-3.5-turbo",
+                    concurrency=8, requests_per_minute=60, max_retries=3):
+    """Run every pending record through the API and append results to output_path"""
+    done = load_checkpoint(output_path)
+    pending = [record for record in records if record_id(record) not in done]
+    print(f"📋 {len(records)} trips, {len(records) - len(pending)} already done, {len(pending)} to run",
+          file=sys.stderr)
+    if not pending:
+        return {'ok': 0, 'error': 0, 'skipped': len(records)}
+
+    cache = get_response_cache()
+    limiter = AsyncRateLimiter(requests_per_minute)
+    queue = asyncio.Queue()
+    invalid = 0
+    for record in pending:
+        # Checked up front so workers only ever see well-formed trips or a known error
+        error = validate_record(record)
+        invalid += error is not None
+        queue.put_nowait((record, error))
+    if invalid:
+        print(f"⚠️  {invalid} malformed trips will be written as errors", file=sys.stderr)
+
+    counts = {'ok': 0, 'error': 0, 'skipped': len(records) - len(pending)}
+    started = time.monotonic()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        with open(output_path, "a", encoding="utf-8") as out:
+
+            async def worker():
+                while True:
+                    try:
+                        record, error = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    request_started = time.monotonic()
+                    # A malformed line gets an error line of its own instead of stopping the batch
+                    if error:
+                        result = {'status': "error", 'error': error}
+                    else:
+                        try:
+                            result = await generate_one(client, limiter, record, api_key, base_url,
+                                                        model, max_retries, cache)
+                        except Exception as e:
+                            result = {'status': "error", 'error': f"Error generating recommendations: {e}"}
+
+                    fields = record if isinstance(record, dict) else {}
+                    result.update({
+                        'id': record_id(record),
+                        'destination': fields.get('destination'),
+                        'start_date': fields.get('start_date'),
+                        'end_date': fields.get('end_date'),
+                        'elapsed': round(time.monotonic() - request_started, 3),
+                    })
+                    # Each line is flushed as it lands so it doubles as the checkpoint
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+
+                    counts[result['status']] += 1
+                    finished = counts['ok'] + counts['error']
+                    if finished % 25 == 0 or finished == len(pending):
+                        rate = finished / (time.monotonic() - started)
+                        print(f"  {finished}/{len(pending)} done ({rate:.1f} trips/s)", file=sys.stderr)
+
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate luxury travel recommendations in bulk")
+    parser.add_argument("input", help="JSONL file of {destination, start_date, end_date} records")
+    parser.add_argument("output", help="JSONL file to append results to (also used to resume)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum in-flight requests")
+    parser.add_argument("--rpm", type=float, default=60, help="Requests per minute budget (0 disables)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries for 429 and 5xx responses")
+    parser.add_argument("--model", help="Model name (default: the cheapest configured batch backend's)")
+    parser.add_argument("--base-url", help="Chat completions URL (default: the cheapest configured batch backend's)")
+    args = parser.parse_args(argv)
+
+    # Bulk jobs go to the cheapest backend unless pinned on the command line
+    backend = get_router().choose("batch")
+    base_url = args.base_url or backend.chat_url
+    model = args.model or backend.model
+    api_key = (backend.api_key if not args.base_url else None) or get_credential("OPENAI_API_KEY")
+    if not api_key:
+        print("❌ OPENAI_API_KEY is not set", file=sys.stderr)
+        return 1
+
+    records = load_records(args.input)
+    try:
+        counts = asyncio.run(run_batch(
+            records, args.output, api_key,
+            base_url=base_url, model=model,
+            concurrency=args.concurrency, requests_per_minute=args.rpm, max_retries=args.retries
+        ))
+    except KeyboardInterrupt:
+        print("⏹️  Interrupted; re-run the same command to resume", file=sys.stderr)
+        return 130
+
+    print(f"✅ {counts['ok']} succeeded, {counts['error']} failed, {counts['skipped']} skipped", file=sys.stderr)
+    return 0 if counts['error'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
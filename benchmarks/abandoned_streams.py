@@ -0,0 +1,162 @@
+"""Check that streams dropped mid-answer give back their admission slots.
+
+Usage:
+    python benchmarks/abandoned_streams.py --clients 4 --limit 2
+
+Streams are abandoned after their first chunk in two ways. In-process, the
+generators are closed or dropped. Against a single-worker api_server.py, SSE
+clients disconnect. After each run the admission controller must have no
+active slots and single flight must have no open streams, and a normal
+request must still get a full answer. All upstream calls go to a local mock
+of the chat completions API. The script exits non-zero if anything leaked.
+"""
+import argparse
+import gc
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep runs away from the real cache, history and offline guide
+_scratch = tempfile.mkdtemp(prefix="travel-abandon-")
+os.environ.setdefault("TRAVEL_CACHE_PATH", os.path.join(_scratch, "cache.sqlite3"))
+os.environ.setdefault("TRAVEL_HISTORY_PATH", os.path.join(_scratch, "history.sqlite3"))
+os.environ.setdefault("TRAVEL_WARM_STORE_DIR", os.path.join(_scratch, "warm"))
+os.environ.setdefault("TRAVEL_KNOWLEDGE_BASE", os.path.join(_scratch, "knowledge.kb"))
+
+from mock_openai import MockConfig, MockOpenAIServer  # noqa: E402
+
+TRIP = {'start_date': "2026-05-01", 'end_date': "2026-05-08"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def check_in_process(clients):
+    """Abandon streams in this process; returns a list of failures"""
+    from simple_assistant import SimpleTravelAssistant
+
+    assistant = SimpleTravelAssistant()
+    for i in range(clients):
+        # Two readers per trip, so shared streams are abandoned by every subscriber
+        streams = [assistant.stream_recommendations(f"Closed City {i}", **TRIP) for _ in range(2)]
+        for stream in streams:
+            next(stream)
+        for stream in streams:
+            stream.close()
+    for i in range(clients):
+        stream = assistant.stream_recommendations(f"Dropped City {i}", **TRIP)
+        next(stream)
+        del stream
+    gc.collect()
+
+    failures = []
+    active = assistant.admission.active
+    open_streams = assistant.flights.stats()['in_flight']
+    print(f"🧵 In-process: {active} admission slots active, {open_streams} single-flight streams open")
+    if active:
+        failures.append(f"in-process: {active} admission slots still held")
+    if open_streams:
+        failures.append(f"in-process: {open_streams} single-flight streams still open")
+    if str(assistant.generate_recommendations("After City", **TRIP)).startswith("❌"):
+        failures.append("in-process: a request after the abandoned streams failed")
+    return failures
+
+
+def gauges(session, base_url):
+    values = {}
+    for line in session.get(f"{base_url}/metrics", timeout=10).text.splitlines():
+        name, _, value = line.partition(" ")
+        if not line.startswith("#") and "{" not in name and value:
+            values[name] = float(value)
+    return values
+
+
+def check_api_server(clients, timeout):
+    """Disconnect SSE clients from a single-worker api_server.py; returns a list of failures"""
+    import requests
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, TRAVEL_API_HOST="127.0.0.1", TRAVEL_API_PORT=str(port), TRAVEL_API_WORKERS="1")
+    server = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "api_server.py")], env=env,
+                              cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    session = requests.Session()
+    try:
+        started = time.monotonic()
+        while True:
+            try:
+                if session.get(f"{base_url}/healthz", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() - started > timeout:
+                return ["api_server.py did not start"]
+            time.sleep(0.1)
+
+        for i in range(clients):
+            with session.post(f"{base_url}/v1/recommendations/stream", json={'destination': f"SSE City {i}", **TRIP},
+                              stream=True, timeout=timeout) as response:
+                for line in response.iter_lines():
+                    if line.startswith(b"event: chunk"):
+                        break
+        # Wait for the server to notice the disconnects
+        deadline = time.monotonic() + timeout
+        while True:
+            values = gauges(session, base_url)
+            leaked = values.get("travel_admission_active", 0) or values.get("travel_single_flight_in_flight", 0)
+            if not leaked or time.monotonic() > deadline:
+                break
+            time.sleep(0.2)
+
+        failures = []
+        print(f"🌐 api_server: {values.get('travel_admission_active', 0):.0f} admission slots active, "
+              f"{values.get('travel_single_flight_in_flight', 0):.0f} single-flight streams open, "
+              f"{values.get('travel_api_in_flight', 0):.0f} requests in flight")
+        if values.get("travel_admission_active", 0):
+            failures.append(f"api_server: {values['travel_admission_active']:.0f} admission slots still held")
+        if values.get("travel_single_flight_in_flight", 0):
+            failures.append(f"api_server: {values['travel_single_flight_in_flight']:.0f} streams still open")
+        response = session.post(f"{base_url}/v1/recommendations", json={'destination': "After City", **TRIP},
+                                 timeout=timeout)
+        if response.status_code != 200:
+            failures.append(f"api_server: a request after the disconnects got HTTP {response.status_code}")
+        return failures
+    finally:
+        server.terminate()
+        server.wait(timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that abandoned streams release admission slots")
+    parser.add_argument("--clients", type=int, default=4, help="Streams abandoned per check")
+    parser.add_argument("--limit", type=int, default=2, help="TRAVEL_ADMISSION_LIMIT for the checks")
+    parser.add_argument("--timeout", type=float, default=15.0, help="Seconds allowed per step")
+    args = parser.parse_args(argv)
+
+    mock_config = MockConfig(latency="fixed:0.05", chunk_rate=10, chunks=40)
+    with MockOpenAIServer(mock_config) as server:
+        os.environ["TRAVEL_ADMISSION_LIMIT"] = str(args.limit)
+        os.environ["OPENAI_API_KEY"] = "mock-key"
+        os.environ["TRAVEL_BACKENDS"] = json.dumps([{'name': "mock", 'base_url': server.base_url,
+                                                     'model': "gpt-3.5-turbo", 'api_key': "mock-key"}])
+        failures = check_in_process(args.clients) + check_api_server(args.clients, args.timeout)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Abandoned streams released every slot")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
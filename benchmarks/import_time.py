@@ -0,0 +1,122 @@
+"""Cold-start import benchmark for the apps and the assistant core.
+
+Usage:
+    python benchmarks/import_time.py --repeats 7
+    python benchmarks/import_time.py --modules main travel_assistant --top 15 --output import_times.json
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+When a display is available the Tk scenario also times how long it takes
+until the main window has been drawn.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["main", "travel_assistant", "simple_assistant", "streamlit_app"]
+
+TIMED_IMPORT = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+TK_WINDOW = """
+import time
+started = time.perf_counter()
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.TravelAssistantGUI(root)
+root.update()
+print(time.perf_counter() - started)
+root.destroy()
+"""
+
+
+def run_python(code, extra_args=()):
+    """Run code in a fresh interpreter from the repo root and return the completed process"""
+    return subprocess.run([sys.executable, *extra_args, "-c", code], cwd=REPO_ROOT,
+                          capture_output=True, text=True)
+
+
+def measure(code, repeats):
+    """Median in-process time reported by code, and whole-process wall time, over fresh interpreters"""
+    samples = []
+    walls = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = run_python(code)
+        walls.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'process_ms': round(statistics.median(walls) * 1000, 1),
+        'repeats': repeats,
+    }
+
+
+def slowest_imports(module, top):
+    """The top cumulative import times (ms) reported by -X importtime for module"""
+    result = run_python(f"import {module}", ["-X", "importtime"])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative) / 1000.0, name))
+    rows.sort(reverse=True)
+    return [{'module': name, 'cumulative_ms': round(ms, 1)} for ms, name in rows[:top]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import times")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports of each module")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    # Warm the filesystem cache and bytecode so runs measure imports, not compilation
+    for module in args.modules:
+        run_python(f"import {module}")
+
+    report = {'python': sys.version.split()[0], 'results': {}}
+    # Bare interpreter startup, for reference against process_ms
+    report['results']['python -c pass'] = measure("print(0.0)", args.repeats)
+    for module in args.modules:
+        report['results'][f"import {module}"] = measure(TIMED_IMPORT.format(module=module), args.repeats)
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        report['results']['tk window drawn'] = measure(TK_WINDOW, args.repeats)
+
+    for name, result in report['results'].items():
+        if 'error' in result:
+            print(f"  {name:30} ❌ {result['error']}")
+        else:
+            print(f"  {name:30} median {result['median_ms']:>8.1f} ms   min {result['min_ms']:>8.1f} ms   "
+                  f"process {result['process_ms']:>8.1f} ms")
+
+    if args.top:
+        report['slowest'] = {module: slowest_imports(module, args.top) for module in args.modules}
+        for module, rows in report['slowest'].items():
+            print(f"\n{module}:")
+            for row in rows:
+                print(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
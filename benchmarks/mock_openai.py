@@ -0,0 +1,237 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Usage:
+    python benchmarks/mock_openai.py --port 8765 --latency lognormal:0.0,0.5 --error-rate 0.05
+
+Latency specs: fixed:SECONDS, uniform:LOW,HIGH, exp:MEAN, lognormal:MU,SIGMA.
+Streaming responses emit --chunks content chunks at --chunk-rate chunks/s.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER_WORDS = (
+    "exclusive private suite michelin terrace spa chauffeur villa rooftop "
+    "tasting sommelier boutique atelier helicopter concierge harbour gallery"
+).split()
+
+
+def parse_latency(spec):
+    """Return a zero-argument sampler for a latency spec string"""
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",") if value]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1.0 / values[0])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockConfig:
+    """Behaviour knobs shared by every request handler"""
+
+    def __init__(self, latency="fixed:0.05", chunk_rate=200.0, chunks=120, error_rate=0.0,
+                 error_status=503, retry_after=None, seed=None):
+        self.latency_spec = latency
+        self.sample_latency = parse_latency(latency)
+        self.chunk_rate = chunk_rate
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        if seed is not None:
+            random.seed(seed)
+
+    def count(self, error=False):
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+
+
+def _content(chunks):
+    """Generate filler recommendation text split into chunks"""
+    return [" ".join(random.choice(FILLER_WORDS) for _ in range(4)) + " " for _ in range(chunks)]
+
+
+def _section_json(prompt):
+    """Build a JSON body shaped like the one a section prompt asks for"""
+    if '{"text"' in prompt:
+        return json.dumps({'text': " ".join(_content(8))})
+    if '"name"' in prompt:
+        items = [{'name': f"Venue {i}", 'price_range': "$$$$", 'cuisine_type': "French",
+                  'type': "Boutique", 'description': " ".join(_content(3))} for i in range(1, 6)]
+    elif '"type"' in prompt:
+        items = [{'type': f"Service {i}", 'description': " ".join(_content(3))} for i in range(1, 4)]
+    else:
+        items = [" ".join(_content(2)) for _ in range(5)]
+    return json.dumps({'items': items})
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {'object': "list", 'data': [{'id': "gpt-3.5-turbo", 'object': "model"}]})
+        else:
+            self._send_json(404, {'error': {'message': "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        config = self.config
+
+        time.sleep(max(0.0, config.sample_latency()))
+
+        if config.error_rate and random.random() < config.error_rate:
+            config.count(error=True)
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else {}
+            self._send_json(config.error_status, {'error': {'message': "Injected error"}}, headers)
+            return
+        config.count()
+
+        prompt = body.get('messages', [{}])[-1].get('content', "")
+        if body.get('response_format', {}).get('type') == "json_object":
+            pieces = [_section_json(prompt)]
+        else:
+            pieces = _content(config.chunks)
+        completion_tokens = sum(len(piece.split()) for piece in pieces)
+        usage = {'prompt_tokens': len(prompt.split()), 'completion_tokens': completion_tokens,
+                 'total_tokens': len(prompt.split()) + completion_tokens}
+
+        if body.get('stream'):
+            self._send_stream(pieces, body.get('model'))
+        else:
+            self._send_json(200, {
+                'id': "chatcmpl-mock",
+                'object': "chat.completion",
+                'created': int(time.time()),
+                'model': body.get('model', "gpt-3.5-turbo"),
+                'choices': [{'index': 0, 'finish_reason': "stop",
+                             'message': {'role': "assistant", 'content': "".join(pieces)}}],
+                'usage': usage,
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, pieces, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        interval = 1.0 / self.config.chunk_rate if self.config.chunk_rate else 0.0
+        for piece in pieces:
+            payload = {'id': "chatcmpl-mock", 'object': "chat.completion.chunk", 'created': int(time.time()),
+                       'model': model or "gpt-3.5-turbo",
+                       'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+            self._write_chunk(f"data: {json.dumps(payload)}\n\n")
+            if interval:
+                time.sleep(interval)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is expected
+        error = sys.exc_info()[1]
+        if isinstance(error, (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockOpenAIServer:
+    """Runs the mock endpoint on a background thread"""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        handler = type("ConfiguredMockHandler", (MockHandler,), {'config': config or MockConfig()})
+        self.config = handler.config
+        self.httpd = QuietHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Base URL in OpenAI SDK form (ending in /v1)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def completions_url(self):
+        """Full chat completions URL"""
+        return self.base_url + "/chat/completions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0.05", help="Time-to-first-byte distribution")
+    parser.add_argument("--chunk-rate", type=float, default=200.0, help="Streamed chunks per second (0 = no delay)")
+    parser.add_argument("--chunks", type=int, default=120, help="Content chunks per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on injected errors")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(args.latency, args.chunk_rate, args.chunks, args.error_rate,
+                        args.error_status, args.retry_after, args.seed)
+    server = MockOpenAIServer(config, args.host, args.port)
+    print(f"🧪 Mock OpenAI API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
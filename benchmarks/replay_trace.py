@@ -0,0 +1,260 @@
+"""Re-drive a recorded traffic trace and compare latency and cache hits with the original.
+
+Usage:
+    python benchmarks/replay_trace.py trace.jsonl --speedup 10 --output replay.json
+    python benchmarks/replay_trace.py trace.jsonl --target live --limit 200
+
+Traces are written by the assistants when TRAVEL_TRACE_PATH is set. Each
+request is sent again at its original offset from the first one, divided by
+--speedup, so bursts and idle gaps keep their shape. Replayed requests are
+recorded with the same recorder, which makes both sides of the report the
+same measurement. By default they go to a local mock of the chat
+completions API against a cold cache; --target live uses the backends
+configured in the environment (TRAVEL_BACKENDS / OPENAI_API_KEY) and spends
+real tokens.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Replays start from a cold cache, away from the real cache, history and offline guide
+_scratch = tempfile.mkdtemp(prefix="travel-replay-")
+os.environ.setdefault("TRAVEL_CACHE_PATH", os.path.join(_scratch, "cache.sqlite3"))
+os.environ.setdefault("TRAVEL_HISTORY_PATH", os.path.join(_scratch, "history.sqlite3"))
+os.environ.setdefault("TRAVEL_WARM_STORE_DIR", os.path.join(_scratch, "warm"))
+os.environ.setdefault("TRAVEL_KNOWLEDGE_BASE", os.path.join(_scratch, "knowledge.kb"))
+
+from mock_openai import MockConfig, MockOpenAIServer  # noqa: E402
+from run_benchmarks import percentile, summarize  # noqa: E402
+
+OPERATIONS = ("full", "stream", "sections")
+
+
+def load_trace(path, limit=None):
+    """Trace records in arrival order; plain trip files (no ts) replay as one burst"""
+    # Not batch.load_records: importing batch reads the router configuration before the mock is up
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️  Skipping line {line_number}: {e}", file=sys.stderr)
+                continue
+            if record.get('destination'):
+                records.append(record)
+    records.sort(key=lambda record: record.get('ts', 0))
+    return records[:limit] if limit else records
+
+
+def schedule(records, speedup):
+    """Seconds after the replay starts at which each record is sent"""
+    if not records:
+        return []
+    first = records[0].get('ts', 0)
+    return [(record.get('ts', first) - first) / speedup for record in records]
+
+
+def replay_one(record):
+    """Send one recorded request through the assistant and operation it used"""
+    from simple_assistant import SimpleTravelAssistant
+    from travel_assistant import TravelAssistant
+
+    cls = TravelAssistant if record.get('assistant') == "openai_sdk" else SimpleTravelAssistant
+    assistant = cls(purpose=record.get('purpose') or "interactive", tenant=record.get('tenant'))
+    trip = (record['destination'], date.fromisoformat(record['start_date']), date.fromisoformat(record['end_date']))
+    bypass_cache = bool(record.get('bypass_cache'))
+    operation = record.get('operation', "full")
+    if operation == "stream":
+        for _ in assistant.stream_recommendations(*trip, bypass_cache):
+            pass
+    elif operation == "sections":
+        for _ in assistant.iter_sections(*trip, bypass_cache):
+            pass
+    else:
+        assistant.generate_recommendations(*trip, bypass_cache)
+
+
+def run_replay(records, speedup, concurrency):
+    """Send every record on schedule; returns (wall seconds, dispatch lag samples, failures)"""
+    offsets = schedule(records, speedup)
+    lags = []
+    failures = []
+    lock = threading.Lock()
+
+    def task(record, due):
+        with lock:
+            lags.append(max(0.0, time.perf_counter() - due))
+        try:
+            replay_one(record)
+        except Exception as e:
+            with lock:
+                failures.append(f"{record.get('request_id')}: {e}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record, offset in zip(records, offsets):
+            due = started + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, record, due)
+    return time.perf_counter() - started, lags, failures
+
+
+def summarize_records(records):
+    """Latency, cache and status summary for a list of trace records"""
+    cache = Counter(record.get('cache') for record in records)
+    summary = summarize([record['latency_ms'] / 1000 for record in records])
+    first_items = [record['first_item_ms'] / 1000 for record in records if record.get('first_item_ms') is not None]
+    summary.update({
+        'first_item_p50_ms': round(percentile(first_items, 50) * 1000, 3) if first_items else None,
+        'first_item_p95_ms': round(percentile(first_items, 95) * 1000, 3) if first_items else None,
+        'cache_hit_rate': round(cache['hit'] / len(records), 4) if records else None,
+        'coalesced_rate': round(cache['coalesced'] / len(records), 4) if records else None,
+        'upstream_calls': sum(record.get('upstream_calls', 0) for record in records),
+        'prompt_tokens': sum(record.get('prompt_tokens', 0) for record in records),
+        'completion_tokens': sum(record.get('completion_tokens', 0) for record in records),
+        'status': dict(Counter(record.get('status') for record in records)),
+    })
+    return summary
+
+
+def compare(recorded, replayed):
+    """Per-operation summaries of both runs, plus prompts that changed since capture"""
+    report = {}
+    # Plain trip files have nothing measured on the recorded side
+    recorded = [record for record in recorded if record.get('latency_ms') is not None]
+    for operation in OPERATIONS + ("all",):
+        before = [record for record in recorded if operation in ("all", record.get('operation', "full"))]
+        after = [record for record in replayed if operation in ("all", record.get('operation', "full"))]
+        if before or after:
+            report[operation] = {'recorded': summarize_records(before), 'replayed': summarize_records(after)}
+
+    def trip_key(record):
+        return (record.get('assistant'), record.get('operation'), record['destination'], record['start_date'],
+                record['end_date'])
+
+    replayed_hashes = {trip_key(record): record.get('prompt_hash') for record in replayed}
+    changed = sum(1 for record in recorded if record.get('prompt_hash') and trip_key(record) in replayed_hashes
+                  and replayed_hashes[trip_key(record)] != record['prompt_hash'])
+    return report, changed
+
+
+def _cell(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(report, changed):
+    print(f"\n{'operation':10} {'run':9} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'first p50':>10} {'hit %':>6} {'shared %':>9} {'upstream':>9}  status")
+    for operation, runs in report.items():
+        for name in ('recorded', 'replayed'):
+            result = runs[name]
+            hit = result['cache_hit_rate']
+            shared = result['coalesced_rate']
+            status = ", ".join(f"{key} {value}" for key, value in sorted(result['status'].items(), key=str))
+            print(f"{operation:10} {name:9} {result['count']:>6} {_cell(result['p50_ms']):>9} "
+                  f"{_cell(result['p95_ms']):>9} {_cell(result['p99_ms']):>9} {_cell(result['first_item_p50_ms']):>10} "
+                  f"{_cell(hit * 100 if hit is not None else None):>6} "
+                  f"{_cell(shared * 100 if shared is not None else None):>9} {result['upstream_calls']:>9}  {status}")
+    if changed:
+        print(f"\n⚠️  {changed} recorded requests now send a different prompt, so their cache keys may not match")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded traffic trace and compare latency and cache hits")
+    parser.add_argument("trace", help="JSONL trace written with TRAVEL_TRACE_PATH")
+    parser.add_argument("--speedup", type=float, default=1.0,
+                        help="Divide the original inter-arrival times by this (1 = original pace)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--concurrency", type=int, default=256, help="Most requests in flight from the replayer")
+    parser.add_argument("--target", choices=("mock", "live"), default="mock",
+                        help="Local mock API, or the backends configured in the environment")
+    parser.add_argument("--latency", default="lognormal:-0.5,0.5", help="Mock latency distribution")
+    parser.add_argument("--chunk-rate", type=float, default=200.0, help="Mock streamed chunks per second")
+    parser.add_argument("--chunks", type=int, default=120, help="Mock chunks per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock error injection rate")
+    parser.add_argument("--record", help="Keep the replayed trace here (default: a temporary file)")
+    parser.add_argument("--output", help="Write the comparison report as JSON")
+    args = parser.parse_args(argv)
+    if args.speedup <= 0:
+        parser.error("--speedup must be positive")
+
+    records = load_trace(args.trace, args.limit)
+    if not records:
+        print(f"❌ No requests found in {args.trace}")
+        return 1
+    replay_path = args.record or os.path.join(_scratch, "replay.jsonl")
+    if os.path.exists(replay_path):
+        os.remove(replay_path)
+    # The replayed requests are recorded by the same recorder, read back below
+    os.environ["TRAVEL_TRACE_PATH"] = replay_path
+    os.environ["TRAVEL_TRACE_SAMPLE"] = "1"
+
+    span = records[-1].get('ts', 0) - records[0].get('ts', 0)
+    print(f"📼 Replaying {len(records)} requests recorded over {span:.1f} s at {args.speedup:g}× "
+          f"against the {args.target} backend")
+
+    mock_config = None
+    server = None
+    if args.target == "mock":
+        mock_config = MockConfig(latency=args.latency, chunk_rate=args.chunk_rate, chunks=args.chunks,
+                                 error_rate=args.error_rate)
+        server = MockOpenAIServer(mock_config).__enter__()
+        # Keep the recorded model names so the report compares like with like
+        model = Counter(record.get('model') for record in records if record.get('model')).most_common(1)
+        os.environ["OPENAI_API_KEY"] = "replay-key"
+        os.environ["TRAVEL_BACKENDS"] = json.dumps([{
+            'name': "mock", 'base_url': server.base_url, 'model': model[0][0] if model else "gpt-3.5-turbo",
+            'api_key': "replay-key",
+        }])
+
+    try:
+        wall, lags, failures = run_replay(records, args.speedup, args.concurrency)
+    finally:
+        if server is not None:
+            server.__exit__(None, None, None)
+
+    replayed = load_trace(replay_path)
+    report, changed = compare(records, replayed)
+    print(f"⏱️  Replayed in {wall:.1f} s; dispatch lag p95 {percentile(lags, 95) * 1000:.1f} ms, "
+          f"max {max(lags) * 1000:.1f} ms")
+    if mock_config is not None:
+        print(f"🔁 The mock served {mock_config.requests} upstream requests")
+    print_report(report, changed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                'trace': args.trace,
+                'replayed_trace': replay_path,
+                'config': {key: value for key, value in vars(args).items() if key not in ('trace', 'output')},
+                'wall_seconds': round(wall, 3),
+                'dispatch_lag_p95_ms': round(percentile(lags, 95) * 1000, 3),
+                'prompt_changes': changed,
+                'failures': failures,
+                'operations': report,
+            }, f, indent=2)
+        print(f"📊 Report written to {args.output}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""Offline benchmarks for the assistants and the rendering path.
+
+Usage:
+    python benchmarks/run_benchmarks.py --concurrency 1 8 32 --requests 64 --output bench_results.json
+    python benchmarks/run_benchmarks.py --compare bench_results.json
+
+Every scenario runs against a local mock of the chat completions API, so no
+API key or network access is needed. Results are written as JSON so runs can
+be compared against each other with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep benchmark runs away from the real response cache
+os.environ.setdefault("TRAVEL_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="travel-bench-"), "cache.sqlite3"))
+
+from mock_openai import MockConfig, MockOpenAIServer  # noqa: E402
+
+
+def percentile(samples, p):
+    """Return the p-th percentile (0-100) of samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3) if samples else None,
+        'p95_ms': round(percentile(samples, 95) * 1000, 3) if samples else None,
+        'p99_ms': round(percentile(samples, 99) * 1000, 3) if samples else None,
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3) if samples else None,
+    }
+
+
+def run_concurrent(request, concurrency, total):
+    """Run request(i) total times across concurrency callers"""
+    results = [None] * total
+
+    def task(i):
+        results[i] = request(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(task, range(total)))
+    wall = time.perf_counter() - started
+    return results, wall
+
+
+def bench_blocking(call, concurrency, total):
+    """Benchmark a call that returns a complete response"""
+    def request(i):
+        started = time.perf_counter()
+        call(i)
+        return time.perf_counter() - started
+
+    latencies, wall = run_concurrent(request, concurrency, total)
+    result = summarize(latencies)
+    result['throughput_rps'] = round(total / wall, 2)
+    return result
+
+
+def bench_streaming(stream, concurrency, total):
+    """Benchmark a call that yields chunks, recording time to first token"""
+    def request(i):
+        started = time.perf_counter()
+        first = None
+        for _ in stream(i):
+            if first is None:
+                first = time.perf_counter() - started
+        return first or 0.0, time.perf_counter() - started
+
+    timings, wall = run_concurrent(request, concurrency, total)
+    result = summarize([total_time for _, total_time in timings])
+    result['ttft'] = summarize([first for first, _ in timings])
+    result['throughput_rps'] = round(total / wall, 2)
+    return result
+
+
+def bench_memory(call, requests=10):
+    """Mean traced peak allocation per sequential request, in KiB"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(requests):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            call(i)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+    return round(sum(peaks) / len(peaks) / 1024, 1)
+
+
+def sample_recommendations(items):
+    """Structured recommendations with items entries per section"""
+    def entries(**fields):
+        return [{key: f"{value} {i}" for key, value in fields.items()} for i in range(1, items + 1)]
+
+    return {
+        'weather': "Mild and sunny with cool evenings.",
+        'luxury_hotels': entries(name="Hotel", price_range="$1,200/night", description="Palace suite with terrace"),
+        'fine_dining': entries(name="Restaurant", cuisine_type="French", price_range="$400",
+                               description="Three-star tasting menu"),
+        'exclusive_experiences': entries(name="Experience", price_range="$2,000", description="Private after-hours tour"),
+        'luxury_shopping': entries(name="Boutique", type="Couture", description="Private fitting salon"),
+        'transportation': entries(type="Chauffeur", description="Mercedes S-Class with driver"),
+        'insider_tips': [f"Tip {i}" for i in range(1, items + 1)],
+    }
+
+
+def bench_render(sizes, repeats=20):
+    """Time the shared text renderer for growing responses
+
+    us_per_entry staying flat as entries grow shows the renderer is linear;
+    max_chunk_ms is the longest a UI would block inserting a single chunk.
+    """
+    from renderer import iter_text_chunks
+
+    results = {}
+    for items in sizes:
+        recommendations = sample_recommendations(items)
+        entries = sum(len(value) for value in recommendations.values() if isinstance(value, list))
+        samples = []
+        chunk_samples = []
+        chunk_count = 0
+        for _ in range(repeats):
+            started = time.perf_counter()
+            chunks = iter_text_chunks(recommendations, "Paris", "2026-05-01", "2026-05-08")
+            chunk_count = 0
+            while True:
+                chunk_started = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                chunk_samples.append(time.perf_counter() - chunk_started)
+                chunk_count += 1
+            samples.append(time.perf_counter() - started)
+        summary = summarize(samples)
+        summary['entries'] = entries
+        summary['chunks'] = chunk_count
+        summary['us_per_entry'] = round(percentile(samples, 50) / entries * 1e6, 3)
+        summary['max_chunk_ms'] = round(max(chunk_samples) * 1000, 3)
+        results[str(items)] = summary
+    return results
+
+
+def run(args):
+    if args.render_only:
+        return {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {'render_sizes': args.render_sizes},
+            'results': {'render.text': bench_render(args.render_sizes)},
+        }
+
+    from simple_assistant import SimpleTravelAssistant
+    from travel_assistant import TravelAssistant
+
+    config = MockConfig(latency=args.latency, chunk_rate=args.chunk_rate, chunks=args.chunks,
+                        error_rate=args.error_rate, retry_after=0 if args.error_rate else None, seed=args.seed)
+    report = {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': {},
+    }
+    results = report['results']
+
+    with MockOpenAIServer(config) as server:
+        simple = SimpleTravelAssistant(api_key="bench-key", base_url=server.completions_url)
+        assistant = TravelAssistant(api_key="bench-key", base_url=server.base_url)
+
+        # Distinct destinations so single-flight coalescing does not hide upstream cost
+        def trip(prefix, i):
+            return f"{prefix} City {i}", "2026-05-01", "2026-05-08"
+
+        for concurrency in args.concurrency:
+            run_id = f"c{concurrency}"
+            results[f"simple.generate.{run_id}"] = bench_blocking(
+                lambda i: simple.generate_recommendations(*trip(f"sg{run_id}", i), bypass_cache=True),
+                concurrency, args.requests)
+            results[f"simple.stream.{run_id}"] = bench_streaming(
+                lambda i: simple.stream_recommendations(*trip(f"ss{run_id}", i), bypass_cache=True),
+                concurrency, args.requests)
+            results[f"simple.sections.{run_id}"] = bench_blocking(
+                lambda i: simple.generate_sectioned_recommendations(*trip(f"sp{run_id}", i), bypass_cache=True),
+                concurrency, args.requests)
+            results[f"assistant.generate.{run_id}"] = bench_blocking(
+                lambda i: assistant.generate_recommendations(*trip(f"ag{run_id}", i), bypass_cache=True),
+                concurrency, args.requests)
+            results[f"assistant.stream.{run_id}"] = bench_streaming(
+                lambda i: assistant.stream_recommendations(*trip(f"as{run_id}", i), bypass_cache=True),
+                concurrency, args.requests)
+
+        # Changing only the end date splices cached sections and regenerates just the date-dependent ones
+        for i in range(args.requests):
+            simple.generate_sectioned_recommendations(f"sdc City {i}", "2026-05-01", "2026-05-08")
+        upstream_before = config.requests
+        results["simple.sections.date_change"] = bench_blocking(
+            lambda i: simple.generate_sectioned_recommendations(f"sdc City {i}", "2026-05-01", "2026-05-12"),
+            1, args.requests)
+        results["simple.sections.date_change"]['upstream_per_request'] = round(
+            (config.requests - upstream_before) / args.requests, 2)
+
+        # A five-leg itinerary generates its legs concurrently, so it should track the slowest leg
+        def legs(i):
+            return [(f"itin City {i}-{leg}", f"2026-06-{1 + 3 * leg:02d}", f"2026-06-{4 + 3 * leg:02d}")
+                    for leg in range(5)]
+        results["simple.itinerary.5legs"] = bench_blocking(
+            lambda i: simple.generate_itinerary(legs(i), bypass_cache=True), 1, args.requests)
+
+        # Repeat queries served from the response cache
+        for i in range(4):
+            simple.generate_recommendations(*trip("sgc1", i))
+        results["simple.generate.cached"] = bench_blocking(
+            lambda i: simple.generate_recommendations(*trip("sgc1", i % 4)), 1, args.requests)
+
+        report['memory_kib_per_request'] = {
+            'simple.generate': bench_memory(
+                lambda i: simple.generate_recommendations(*trip("mem-sg", i), bypass_cache=True)),
+            'simple.stream': bench_memory(
+                lambda i: list(simple.stream_recommendations(*trip("mem-ss", i), bypass_cache=True))),
+            'assistant.generate': bench_memory(
+                lambda i: assistant.generate_recommendations(*trip("mem-ag", i), bypass_cache=True)),
+        }
+        report['mock'] = {'requests': config.requests, 'errors_injected': config.errors}
+
+    results['render.text'] = bench_render(args.render_sizes)
+    return report
+
+
+def compare(current, previous):
+    """Print p50/p95 changes between two result files"""
+    print(f"{'scenario':45} {'p50 ms':>18} {'p95 ms':>18}")
+    for name, result in sorted(current['results'].items()):
+        before = previous.get('results', {}).get(name)
+        if not before or 'p50_ms' not in result:
+            continue
+        cells = []
+        for key in ('p50_ms', 'p95_ms'):
+            old, new = before.get(key), result.get(key)
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            cells.append(f"{new:>9.1f} ({change:>6})")
+        print(f"{name:45} {cells[0]:>18} {cells[1]:>18}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the travel assistants against a local mock API")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent callers per run")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per scenario and concurrency level")
+    parser.add_argument("--latency", default="lognormal:-2.5,0.5", help="Mock latency distribution")
+    parser.add_argument("--chunk-rate", type=float, default=400.0, help="Mock streamed chunks per second")
+    parser.add_argument("--chunks", type=int, default=120, help="Mock chunks per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock error injection rate")
+    parser.add_argument("--render-sizes", type=int, nargs="+", default=[10, 100, 500],
+                        help="Entries per section for the render benchmark")
+    parser.add_argument("--render-only", action="store_true", help="Only run the render benchmark")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    report = run(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results written to {args.output}")
+
+    if previous is not None:
+        compare(report, previous)
+    else:
+        for name, result in sorted(report['results'].items()):
+            if 'p50_ms' in result:
+                print(f"  {name:45} p50 {result['p50_ms']:>9.1f} ms  p99 {result['p99_ms']:>9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Count what each rerun of the Streamlit app costs, per simulated user session.
+
+Usage:
+    python benchmarks/streamlit_sessions.py --sessions 3
+
+Each session opens the app, fills in the sidebar, generates a trip and then
+clicks around (search, fast-mode toggle, trip-type switch, "Plan Another",
+reopening the saved trip), all through Streamlit's AppTest against a local
+mock of the chat completions API. For every step it reports the upstream
+calls, assistant constructions and secrets reads it caused. Only generating
+a trip may call upstream, and the assistant is built once per server
+process; the script exits non-zero otherwise.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep runs away from the real cache, history and offline guide
+_scratch = tempfile.mkdtemp(prefix="travel-sessions-")
+os.environ.setdefault("TRAVEL_CACHE_PATH", os.path.join(_scratch, "cache.sqlite3"))
+os.environ.setdefault("TRAVEL_HISTORY_PATH", os.path.join(_scratch, "history.sqlite3"))
+os.environ.setdefault("TRAVEL_WARM_STORE_DIR", os.path.join(_scratch, "warm"))
+os.environ.setdefault("TRAVEL_KNOWLEDGE_BASE", os.path.join(_scratch, "knowledge.kb"))
+os.environ.pop("TRAVEL_API_URL", None)
+
+from mock_openai import MockConfig, MockOpenAIServer  # noqa: E402
+
+DESTINATIONS = ["Vienna", "Kyoto"]
+
+# Steps after which upstream calls are expected
+GENERATING_STEPS = {"generate trip"}
+
+
+class Counters:
+    """Upstream requests, assistant constructions and secrets reads since the last step"""
+
+    def __init__(self, mock_config):
+        self.mock_config = mock_config
+        self.constructed = 0
+        self.secrets_reads = 0
+        self._last = self.totals()
+
+    def install(self):
+        import credentials
+        import simple_assistant
+
+        counters = self
+        original_init = simple_assistant.SimpleTravelAssistant.__init__
+        original_get = credentials.StreamlitSecretsProvider.get
+
+        def counting_init(self, *args, **kwargs):
+            counters.constructed += 1
+            original_init(self, *args, **kwargs)
+
+        def counting_get(self, key):
+            counters.secrets_reads += 1
+            return original_get(self, key)
+
+        simple_assistant.SimpleTravelAssistant.__init__ = counting_init
+        credentials.StreamlitSecretsProvider.get = counting_get
+
+    def totals(self):
+        return {'upstream': self.mock_config.requests, 'constructed': self.constructed,
+                'secrets': self.secrets_reads}
+
+    def step(self):
+        current = self.totals()
+        delta = {name: current[name] - self._last[name] for name in current}
+        self._last = current
+        return delta
+
+
+def button(at, label_prefix=None, key=None):
+    for candidate in at.button:
+        if (key is not None and candidate.key == key) or (label_prefix and candidate.label.startswith(label_prefix)):
+            return candidate
+    raise LookupError(f"No button {key or label_prefix!r}")
+
+
+def shows(at, text):
+    return any(text in element.value for element in at.markdown)
+
+
+def run_session(number, counters, timeout):
+    """Drive one browser session through the app; returns [(step, delta, result shown)]"""
+    from streamlit.testing.v1 import AppTest
+    from streamlit_app import MULTI_CITY, SINGLE_TRIP
+
+    destination = DESTINATIONS[number % len(DESTINATIONS)]
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "streamlit_app.py"), default_timeout=timeout)
+    steps = []
+
+    def record(name):
+        steps.append((name, counters.step(), shows(at, f"## 🏖️ {destination}")))
+
+    at.run()
+    record("open app")
+    at.text_input(key="history_user").input(f"guest-{number}").run()
+    record("enter concierge name")
+    at.text_input[0].input(destination)
+    button(at, "🎯").click().run()
+    record("generate trip")
+    at.text_input(key="history_query").input("spa").run()
+    record("search history")
+    at.text_input(key="history_query").input("").run()
+    record("clear search")
+    at.checkbox[0].check().run()
+    record("toggle fast mode")
+    at.radio(key="trip_type").set_value(MULTI_CITY).run()
+    record("switch to multi-city")
+    at.radio(key="trip_type").set_value(SINGLE_TRIP).run()
+    record("switch back")
+    button(at, "🌟").click().run()
+    record("plan another")
+    saved = [candidate for candidate in at.button if (candidate.key or "").startswith("trip_")]
+    if saved:
+        saved[0].click().run()
+        record("reopen saved trip")
+    return destination, steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count upstream calls and constructions per Streamlit rerun")
+    parser.add_argument("--sessions", type=int, default=3, help="Simulated browser sessions")
+    parser.add_argument("--latency", default="fixed:0.05", help="Mock latency distribution")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds allowed per rerun")
+    args = parser.parse_args(argv)
+
+    mock_config = MockConfig(latency=args.latency, chunk_rate=0, chunks=40)
+    with MockOpenAIServer(mock_config) as server:
+        os.environ["OPENAI_API_KEY"] = "mock-key"
+        os.environ["TRAVEL_BACKENDS"] = (f'[{{"name": "mock", "base_url": "{server.base_url}", '
+                                         f'"model": "gpt-3.5-turbo", "api_key": "mock-key"}}]')
+        counters = Counters(mock_config)
+        counters.install()
+
+        failures = []
+        for number in range(args.sessions):
+            destination, steps = run_session(number, counters, args.timeout)
+            print(f"\n👤 Session {number + 1}: {destination}")
+            print(f"  {'step':24} {'upstream':>8} {'built':>6} {'secrets':>8}  result shown")
+            for name, delta, shown in steps:
+                print(f"  {name:24} {delta['upstream']:>8} {delta['constructed']:>6} {delta['secrets']:>8}  "
+                      f"{'yes' if shown else '-'}")
+                if delta['upstream'] and name not in GENERATING_STEPS:
+                    failures.append(f"session {number + 1}: '{name}' made {delta['upstream']} upstream calls")
+
+        totals = counters.totals()
+        print(f"\n📊 {args.sessions} sessions: {totals['upstream']} upstream calls, "
+              f"{totals['constructed']} assistant constructions, {totals['secrets']} secrets reads")
+        if totals['constructed'] > 1:
+            failures.append(f"the assistant was built {totals['constructed']} times")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
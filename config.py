@@ -1,16 +1,19 @@
-import os
-from dotenv import load_dotenv
+from credentials import get_credential
 
-# Load environment variables
-load_dotenv()
 
-# OpenAI Configuration with validation
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+def get_openai_api_key():
+    """OpenAI API key from Streamlit secrets, the environment or a .env file"""
+    return get_credential("OPENAI_API_KEY")
 
-if not OPENAI_API_KEY:
+
+def check_api_key():
+    """Print setup instructions when no OpenAI API key can be found"""
+    if get_openai_api_key():
+        return True
     print("⚠️  Warning: OPENAI_API_KEY not found in environment variables.")
     print("Please create a .env file with your OpenAI API key:")
     print("OPENAI_API_KEY=sk-your-api-key-here")
+    return False
 
 # UI Configuration
 COLORS = {
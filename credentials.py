@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+
+# Credential lookup configuration (override with environment variables)
+CREDENTIAL_PROVIDERS = os.getenv("TRAVEL_CREDENTIAL_PROVIDERS", "streamlit,env,dotenv")
+DOTENV_PATH = os.getenv(
+    "TRAVEL_DOTENV_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+)
+
+
+class EnvProvider:
+    """Reads credentials from process environment variables"""
+
+    name = "env"
+
+    def get(self, key):
+        return os.environ.get(key)
+
+
+class DotenvProvider:
+    """Reads credentials from a .env file, importing python-dotenv on first use"""
+
+    name = "dotenv"
+
+    def __init__(self, path=DOTENV_PATH):
+        self.path = path
+        self._values = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if self._values is None:
+            with self._lock:
+                if self._values is None:
+                    self._values = self._load()
+        return self._values.get(key)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            from dotenv import dotenv_values
+        except ImportError:
+            print("python-dotenv is not installed; ignoring .env file")
+            return {}
+        return dotenv_values(self.path)
+
+
+class StreamlitSecretsProvider:
+    """Reads st.secrets, but only inside a process that already imported Streamlit"""
+
+    name = "streamlit"
+
+    def get(self, key):
+        # Importing Streamlit just to look for secrets costs the Tk app most of its startup
+        st = sys.modules.get("streamlit")
+        if st is None:
+            return None
+        try:
+            return st.secrets[key] if key in st.secrets else None
+        except Exception:
+            # No secrets.toml, or not running under `streamlit run`
+            return None
+
+
+PROVIDER_TYPES = {
+    'env': EnvProvider,
+    'dotenv': DotenvProvider,
+    'streamlit': StreamlitSecretsProvider,
+}
+
+
+def build_providers(spec=CREDENTIAL_PROVIDERS):
+    """Instantiate providers from a comma-separated list of names, in lookup order"""
+    providers = []
+    for name in spec.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in PROVIDER_TYPES:
+            raise ValueError(f"Unknown credential provider: {name}")
+        providers.append(PROVIDER_TYPES[name]())
+    return providers
+
+
+_providers = None
+_providers_lock = threading.Lock()
+
+
+def get_providers():
+    """Return the process-wide provider chain"""
+    global _providers
+    if _providers is None:
+        with _providers_lock:
+            if _providers is None:
+                _providers = build_providers()
+    return _providers
+
+
+def get_credential(key, providers=None):
+    """Return the first non-empty value for key across the provider chain, or None"""
+    for provider in providers if providers is not None else get_providers():
+        value = provider.get(key)
+        if value:
+            return value
+    return None
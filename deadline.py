@@ -0,0 +1,163 @@
+import os
+import queue
+import threading
+import time
+
+from metrics import get_metrics
+from sections import SECTIONS
+from trip_history import is_error_response
+
+# End-to-end latency budget in seconds for the apps (override with environment variables; 0 = no budget)
+DEADLINE_SECONDS = float(os.getenv("TRAVEL_DEADLINE", "0"))
+
+# Appended to answers cut short by the deadline; trip_history treats it as "not a full itinerary"
+PARTIAL_MARKER = "\n\n⏱️"
+PARTIAL_NOTICE = (f"{PARTIAL_MARKER} Time budget reached, so this is what was ready. "
+                  "The full recommendations are still being prepared; ask again in a moment.")
+TIMEOUT_MESSAGE = ("❌ Recommendations were not ready in time. They are still being prepared; "
+                   "please try again in a moment.")
+
+
+class Deadline:
+    """A point in time by which an answer is due"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.at = time.monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left, never negative"""
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.at
+
+
+def as_deadline(deadline):
+    """Accept a Deadline or a budget in seconds"""
+    return deadline if isinstance(deadline, Deadline) else Deadline(float(deadline))
+
+
+class DeadlineResult(str):
+    """Response text that records whether the deadline cut it short
+
+    source is 'complete', 'streamed' (text received before the deadline),
+    'cached' (a cached fallback) or 'none' (nothing was ready).
+    """
+
+    def __new__(cls, text, partial=False, source="complete"):
+        result = super().__new__(cls, text)
+        result.partial = partial
+        result.source = source
+        return result
+
+
+class BoundedStream:
+    """Iterate items pumped from source on a background thread, stopping at the deadline
+
+    The source keeps running after the deadline, so work in flight completes
+    and lands in the cache for the next request. expired says whether
+    iteration ended because time ran out.
+    """
+
+    _DONE = object()
+
+    def __init__(self, source, deadline):
+        self.deadline = as_deadline(deadline)
+        self.expired = False
+        self._items = queue.Queue()
+        self._error = None
+        threading.Thread(target=self._pump, args=(source,), name="travel-deadline", daemon=True).start()
+
+    def _pump(self, source):
+        try:
+            for item in source:
+                self._items.put(item)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._items.put(self._DONE)
+
+    def __iter__(self):
+        while True:
+            remaining = self.deadline.remaining()
+            try:
+                # Past the deadline, whatever is already queued is still taken
+                item = self._items.get(timeout=remaining) if remaining > 0 else self._items.get_nowait()
+            except queue.Empty:
+                self.expired = True
+                return
+            if item is self._DONE:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+
+def stream_within(stream, deadline, fallback=None):
+    """Yield text chunks from stream until the deadline, then a partial notice
+
+    fallback() may return cached text to show when nothing arrived in time.
+    """
+    bounded = BoundedStream(stream, deadline)
+    received = False
+    for chunk in bounded:
+        received = received or bool(chunk)
+        yield chunk
+    if not bounded.expired:
+        return
+
+    get_metrics().increment("travel_deadline_total", outcome="partial" if received else "expired")
+    if received:
+        yield PARTIAL_NOTICE
+        return
+    cached = fallback() if fallback else None
+    if cached:
+        yield cached + PARTIAL_NOTICE
+    else:
+        yield TIMEOUT_MESSAGE
+
+
+def sections_within(sections, deadline):
+    """Yield (key, value) section pairs that land before the deadline, then name the late ones"""
+    bounded = BoundedStream(sections, deadline)
+    landed = set()
+    for key, value in bounded:
+        landed.add(key)
+        yield key, value
+    if not bounded.expired:
+        return
+
+    get_metrics().increment("travel_deadline_total", outcome="partial" if landed else "expired")
+    late = [section['title'] for section in SECTIONS if section['key'] not in landed]
+    # Late sections keep generating and are cached, so asking again fills them in
+    yield 'error', f"⏱️ Not ready in time: {', '.join(late)}. Ask again in a moment to add them."
+
+
+def generate_within(stream, deadline, fallback=None):
+    """Collect stream into a DeadlineResult, returning whatever is ready when the deadline passes
+
+    A failed answer (an error string before the deadline) is also replaced by
+    the cached fallback when there is one.
+    """
+    metrics = get_metrics()
+    bounded = BoundedStream(stream, deadline)
+    text = "".join(bounded)
+    if not bounded.expired and not is_error_response(text):
+        metrics.increment("travel_deadline_total", outcome="complete")
+        return DeadlineResult(text)
+
+    if bounded.expired and text.strip():
+        metrics.increment("travel_deadline_total", outcome="partial")
+        return DeadlineResult(text + PARTIAL_NOTICE, partial=True, source="streamed")
+
+    cached = fallback() if fallback else None
+    if cached:
+        metrics.increment("travel_deadline_total", outcome="fallback")
+        return DeadlineResult(cached + PARTIAL_NOTICE, partial=True, source="cached")
+
+    if bounded.expired:
+        metrics.increment("travel_deadline_total", outcome="expired")
+        return DeadlineResult(TIMEOUT_MESSAGE, partial=True, source="none")
+    return DeadlineResult(text)
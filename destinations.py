@@ -0,0 +1,418 @@
+"""Fuzzy mapping of free-text destinations to canonical destination IDs.
+
+Usage:
+    python destinations.py build [--gazetteer data/destinations.tsv] [--output .cache/destinations.idx]
+    python destinations.py lookup "St Tropez" "pairs, france"
+
+The gazetteer is a TSV of id, name, country, country code and ';'-separated
+aliases. It is compiled into a flat binary index (exact-match hash table plus
+n-gram postings) that is memory-mapped at runtime, so opening it costs the
+same whether it holds a few hundred names or tens of thousands.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+# Destination index configuration (override with environment variables)
+GAZETTEER_PATH = os.getenv(
+    "TRAVEL_GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "destinations.tsv")
+)
+DESTINATION_INDEX_PATH = os.getenv(
+    "TRAVEL_DESTINATION_INDEX",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "destinations.idx")
+)
+DESTINATION_MIN_SCORE = float(os.getenv("TRAVEL_DESTINATION_MIN_SCORE", "0.75"))
+
+INDEX_MAGIC = b"TDIX"
+INDEX_VERSION = 1
+NGRAM_SIZE = 2
+RERANK_CANDIDATES = 10
+# Names this short resolve only when spelled exactly: one edit already makes
+# another place ("Mali" is one letter from "Male", an alias of the Maldives)
+SHORT_QUERY_LENGTH = 4
+
+# Spellings `destinations.py check` resolves, with the expected canonical ID (None = no match)
+CHECK_CASES = (
+    ("Paris", "paris"),
+    ("paris, France", "paris"),
+    ("Pairs", "paris"),
+    ("santorni", "santorini"),
+    ("St Tropez", "saint-tropez"),
+    ("Male", "maldives"),
+    ("Mali", None),
+    ("Rmoe", None),
+)
+
+_HEADER = struct.Struct("<4sIIIIIIIIIII")
+_CANONICAL = struct.Struct("<IHIHI")
+_ALIAS = struct.Struct("<IHIH")
+_EXACT = struct.Struct("<QI")
+_GRAM = struct.Struct("<III")
+_POSTING = struct.Struct("<I")
+
+
+def normalize_place(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in stripped.replace("'", ""))
+    return " ".join(cleaned.split())
+
+
+def _ngrams(text):
+    padded = f" {text} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def _gram_hash(gram):
+    return zlib.crc32(gram.encode("utf-8"))
+
+
+def _text_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _similarity(a, b):
+    """1 - optimal string alignment distance / longer length"""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return 1.0 - previous[-1] / max(len(a), len(b))
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Read gazetteer rows as dicts (id, name, country, country_code, aliases)"""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t") + [""] * 5
+            entries.append({
+                'id': fields[0].strip(),
+                'name': fields[1].strip(),
+                'country': fields[2].strip(),
+                'country_code': fields[3].strip(),
+                'aliases': [alias.strip() for alias in fields[4].split(";") if alias.strip()],
+            })
+    return entries
+
+
+def _alias_texts(entry):
+    """Every normalized spelling that should resolve to entry"""
+    names = [entry['name'], entry['id'].replace("-", " ")] + entry['aliases']
+    suffixes = [""] + [normalize_place(value) for value in (entry['country'], entry['country_code']) if value]
+    texts = []
+    for name in names:
+        base = normalize_place(name)
+        if not base:
+            continue
+        for suffix in suffixes:
+            text = f"{base} {suffix}".strip()
+            if text not in texts:
+                texts.append(text)
+    return texts
+
+
+def build_index(gazetteer_path=GAZETTEER_PATH, index_path=DESTINATION_INDEX_PATH):
+    """Compile the gazetteer into a memory-mappable index file"""
+    entries = load_gazetteer(gazetteer_path)
+    strings = bytearray()
+    string_offsets = {}
+
+    def intern(text):
+        data = text.encode("utf-8")[:0xFFFF]
+        if data not in string_offsets:
+            string_offsets[data] = len(strings)
+            strings.extend(data)
+        return string_offsets[data], len(data)
+
+    canonical_rows = []
+    alias_rows = []
+    gram_counts = bytearray()
+    exact = {}
+    postings = {}
+    for rank, entry in enumerate(entries):
+        canonical = len(canonical_rows)
+        display = f"{entry['name']}, {entry['country']}" if entry['country'] and entry['country'] != entry['name'] \
+            else entry['name']
+        canonical_rows.append(_CANONICAL.pack(*intern(entry['id']), *intern(display), rank))
+        for text in _alias_texts(entry):
+            if text in exact:
+                # Earlier (higher ranked) entries keep ambiguous spellings
+                continue
+            alias = len(alias_rows)
+            grams = _ngrams(text)
+            alias_rows.append(_ALIAS.pack(*intern(text), canonical, len(grams)))
+            gram_counts.append(min(len(grams), 255))
+            exact[text] = alias
+            for gram in grams:
+                postings.setdefault(_gram_hash(gram), []).append(alias)
+
+    exact_table = b"".join(_EXACT.pack(h, alias) for h, alias in sorted((_text_hash(t), a) for t, a in exact.items()))
+    gram_rows = []
+    posting_data = bytearray()
+    for gram in sorted(postings):
+        ids = postings[gram]
+        gram_rows.append(_GRAM.pack(gram, len(posting_data) // _POSTING.size, len(ids)))
+        posting_data.extend(b"".join(_POSTING.pack(alias) for alias in ids))
+
+    sections = [b"".join(canonical_rows), b"".join(alias_rows), exact_table, b"".join(gram_rows),
+                bytes(posting_data), bytes(gram_counts), bytes(strings)]
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(canonical_rows), len(alias_rows), len(gram_rows), *offsets)
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, index_path)
+    return {'destinations': len(canonical_rows), 'aliases': len(alias_rows), 'ngrams': len(gram_rows),
+            'bytes': position}
+
+
+class DestinationMatch:
+    """A resolved destination"""
+
+    def __init__(self, id, name, score, matched):
+        self.id = id
+        self.name = name
+        self.score = score
+        self.matched = matched
+
+    def __repr__(self):
+        return f"DestinationMatch(id={self.id!r}, name={self.name!r}, score={self.score:.3f})"
+
+
+class DestinationIndex:
+    """Read-only view over a memory-mapped destination index"""
+
+    def __init__(self, path=DESTINATION_INDEX_PATH, min_score=DESTINATION_MIN_SCORE):
+        self.path = path
+        self.min_score = min_score
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.destinations, self.aliases, self.ngrams, self._canonical_at, self._alias_at,
+         self._exact_at, self._gram_at, self._posting_at, self._counts_at,
+         self._strings_at) = _HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported destination index format in {path}")
+        # Zero-copy views so postings can be counted without unpacking in Python
+        # (index files are little-endian, like every platform the app runs on)
+        self._view = memoryview(self._map)
+        self._postings_view = self._view[self._posting_at:self._counts_at].cast("I")
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    def close(self):
+        self._postings_view.release()
+        self._view.release()
+        self._map.close()
+
+    def _string(self, offset, length):
+        start = self._strings_at + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _canonical(self, canonical):
+        id_offset, id_length, name_offset, name_length, rank = _CANONICAL.unpack_from(
+            self._map, self._canonical_at + canonical * _CANONICAL.size)
+        return self._string(id_offset, id_length), self._string(name_offset, name_length), rank
+
+    def _alias(self, alias):
+        text_offset, text_length, canonical, gram_count = _ALIAS.unpack_from(
+            self._map, self._alias_at + alias * _ALIAS.size)
+        return self._string(text_offset, text_length), canonical, gram_count
+
+    def _bisect(self, base, count, record, target):
+        """Binary search a sorted table on its first field"""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if record.unpack_from(self._map, base + middle * record.size)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _exact(self, text):
+        target = _text_hash(text)
+        position = self._bisect(self._exact_at, self.aliases, _EXACT, target)
+        while position < self.aliases:
+            found, alias = _EXACT.unpack_from(self._map, self._exact_at + position * _EXACT.size)
+            if found != target:
+                break
+            if self._alias(alias)[0] == text:
+                return alias
+            position += 1
+        return None
+
+    def _postings(self, gram):
+        target = _gram_hash(gram)
+        position = self._bisect(self._gram_at, self.ngrams, _GRAM, target)
+        if position >= self.ngrams:
+            return ()
+        found, start, count = _GRAM.unpack_from(self._map, self._gram_at + position * _GRAM.size)
+        if found != target:
+            return ()
+        return self._postings_view[start:start + count]
+
+    def _match(self, alias, score):
+        text, canonical, _ = self._alias(alias)
+        id, name, _ = self._canonical(canonical)
+        return DestinationMatch(id, name, score, text)
+
+    def _resolve(self, text):
+        query = normalize_place(text)
+        if not query:
+            return None
+
+        alias = self._exact(query)
+        if alias is not None:
+            return self._match(alias, 1.0)
+        if len(query) <= SHORT_QUERY_LENGTH:
+            return None
+
+        grams = _ngrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings(gram))
+
+        # Dice coefficient narrows the field, edit distance picks the winner
+        counts_at = self._counts_at
+        dice = ((2.0 * count / (len(grams) + self._map[counts_at + alias]), alias)
+                for alias, count in shared.items())
+        best = None
+        for _, alias in sorted(dice, reverse=True)[:RERANK_CANDIDATES]:
+            alias_text, canonical, _ = self._alias(alias)
+            bound = min(len(query), len(alias_text)) / max(len(query), len(alias_text))
+            if bound < self.min_score or (best is not None and bound < best[0]):
+                continue
+            score = _similarity(query, alias_text)
+            rank = self._canonical(canonical)[2]
+            if best is None or (score, -rank) > (best[0], -best[1]):
+                best = (score, rank, alias)
+        if best is None or best[0] < self.min_score:
+            return None
+        return self._match(best[2], best[0])
+
+
+def _index_is_stale(index_path, gazetteer_path):
+    if not os.path.exists(index_path):
+        return True
+    return os.path.exists(gazetteer_path) and os.path.getmtime(gazetteer_path) > os.path.getmtime(index_path)
+
+
+_index = None
+_index_lock = threading.Lock()
+_index_failed = False
+
+
+def get_destination_index():
+    """Return the process-wide destination index, building it if missing or stale"""
+    global _index, _index_failed
+    if _index is None and not _index_failed:
+        with _index_lock:
+            if _index is None and not _index_failed:
+                try:
+                    if _index_is_stale(DESTINATION_INDEX_PATH, GAZETTEER_PATH):
+                        build_index(GAZETTEER_PATH, DESTINATION_INDEX_PATH)
+                    _index = DestinationIndex(DESTINATION_INDEX_PATH)
+                except (OSError, ValueError, struct.error) as e:
+                    # Fall back to plain text normalization
+                    print(f"Destination index unavailable: {e}")
+                    _index_failed = True
+    return _index
+
+
+def resolve_destination(text):
+    """Return the DestinationMatch for free-text input, or None when unknown"""
+    index = get_destination_index()
+    return index.resolve(str(text)) if index is not None else None
+
+
+def canonical_destination(text):
+    """Canonical destination ID, falling back to the normalized input text"""
+    match = resolve_destination(text)
+    return match.id if match is not None else normalize_place(text)
+
+
+def prompt_destination(text):
+    """Destination as named in prompts: the canonical name when the input resolves
+
+    Spellings that share a cache key then share the prompt that filled it,
+    so "Niece" is answered about Nice rather than cached under it.
+    """
+    match = resolve_destination(text)
+    return match.name if match is not None else str(text).strip()
+
+
+def destination_label(text):
+    """Bounded-cardinality metrics label: the canonical ID, or "other" when unknown"""
+    match = resolve_destination(text)
+    return match.id if match is not None else "other"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the destination index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Compile a gazetteer TSV into an index file")
+    build.add_argument("--gazetteer", default=GAZETTEER_PATH)
+    build.add_argument("--output", default=DESTINATION_INDEX_PATH)
+    lookup = subparsers.add_parser("lookup", help="Resolve destinations against an index file")
+    lookup.add_argument("text", nargs="+")
+    lookup.add_argument("--index", default=DESTINATION_INDEX_PATH)
+    check = subparsers.add_parser("check", help="Resolve known spellings and fail on any unexpected match")
+    check.add_argument("--index", default=DESTINATION_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        summary = build_index(args.gazetteer, args.output)
+        print(f"🗺️ Indexed {summary['destinations']} destinations ({summary['aliases']} spellings, "
+              f"{summary['bytes'] / 1024:.1f} KiB) into {args.output}")
+        return 0
+
+    index = DestinationIndex(args.index)
+    if args.command == "check":
+        failures = 0
+        for text, expected in CHECK_CASES:
+            match = index.resolve(text)
+            found = match.id if match else None
+            if found != expected:
+                failures += 1
+            print(f"{'✅' if found == expected else '❌'} {text!r}: {found or 'no match'} (expected {expected or 'no match'})")
+        return 1 if failures else 0
+
+    for text in args.text:
+        match = index.resolve(text)
+        print(f"{text!r}: {match!r}" if match else f"{text!r}: no match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from metrics import get_metrics
+from renderer import RULE, SUBRULE, text_footer
+
+# Multi-destination itinerary configuration (override with environment variables)
+ITINERARY_MAX_LEGS = int(os.getenv("TRAVEL_ITINERARY_MAX_LEGS", "8"))
+
+PENDING_TEXT = "⏳ Curating this leg..."
+
+
+def _parse_date(value):
+    if hasattr(value, 'strftime'):
+        return value.strftime("%Y-%m-%d")
+    return datetime.strptime(str(value).strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+def normalize_legs(legs):
+    """Return legs as (destination, start_date, end_date) tuples with ISO date strings"""
+    return [(str(destination or "").strip(), _parse_date(start_date), _parse_date(end_date))
+            for destination, start_date, end_date in legs]
+
+
+def validate_legs(legs):
+    """Return an error message for an unusable itinerary, or None"""
+    if not legs:
+        return "Please add at least one leg."
+    if len(legs) > ITINERARY_MAX_LEGS:
+        return f"An itinerary can have at most {ITINERARY_MAX_LEGS} legs."
+    for i, (destination, start_date, end_date) in enumerate(legs, 1):
+        if not destination:
+            return f"Leg {i} needs a destination."
+        if start_date >= end_date:
+            return f"Leg {i} ({destination}): end date must be after start date."
+        if i > 1 and start_date < legs[i - 2][2]:
+            return f"Leg {i} ({destination}) starts before leg {i - 1} ends."
+    return None
+
+
+def itinerary_title(legs):
+    """Route summary, e.g. "Paris → Rome → Kyoto" """
+    return " → ".join(destination for destination, _, _ in legs)
+
+
+def generate_legs(generate, legs, max_workers=ITINERARY_MAX_LEGS):
+    """Generate every leg concurrently and yield (index, content) as each finishes
+
+    generate(destination, start_date, end_date) must return the leg's text;
+    it is called once per leg, so each leg is cached under its own key and an
+    edit to one leg only regenerates that leg. Closing the generator early
+    cancels legs that have not started yet.
+    """
+    metrics = get_metrics()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(legs), max_workers)), thread_name_prefix="travel-leg")
+    try:
+        futures = {pool.submit(generate, *leg): index for index, leg in enumerate(legs)}
+        for future in as_completed(futures):
+            try:
+                content = future.result()
+            except Exception as e:
+                content = f"❌ Error generating recommendations: {str(e)}"
+            metrics.increment("travel_itinerary_legs_total")
+            yield futures[future], content
+    finally:
+        # Legs already running finish in the background and still land in the cache
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_itinerary_text(legs, results):
+    """Yield the plain-text itinerary one leg at a time, in leg order; unfinished legs show a placeholder"""
+    yield (f"🗺️ MULTI-CITY LUXURY ITINERARY\n"
+           f"📍 Route: {itinerary_title(legs)}\n"
+           f"📅 Travel Dates: {legs[0][1]} to {legs[-1][2]}\n"
+           f"{RULE}\n\n")
+    for index, (destination, start_date, end_date) in enumerate(legs):
+        yield (f"✈️ LEG {index + 1} OF {len(legs)}: {destination.upper()}\n"
+               f"📅 {start_date} to {end_date}\n"
+               f"{SUBRULE}\n"
+               f"{results.get(index, PENDING_TEXT)}\n\n")
+    yield text_footer()
+
+
+def render_itinerary_text(legs, results):
+    """Plain-text itinerary as one string"""
+    return "".join(iter_itinerary_text(legs, results))
+
+
+def leg_markdown_heading(index, leg):
+    destination, start_date, end_date = leg
+    return f"### ✈️ Leg {index + 1}: {destination}\n**📅 {start_date} → {end_date}**\n\n"
+
+
+def render_itinerary_markdown(legs, results):
+    """Markdown itinerary with one heading per leg, in leg order"""
+    return "\n\n".join(leg_markdown_heading(index, leg) + results.get(index, PENDING_TEXT)
+                        for index, leg in enumerate(legs))
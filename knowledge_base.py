@@ -0,0 +1,302 @@
+"""Offline destination knowledge base: curated sections per destination, memory-mapped.
+
+Usage:
+    python knowledge_base.py build [--output .cache/knowledge.kb] [--curated data/curated.json]
+    python knowledge_base.py show "St Tropez"
+
+The builder collects destination-level sections from the response cache and
+the trip history (model output already paid for), overlays an optional
+curated JSON file ({"Paris": {"luxury_hotels": [...], ...}}) and keeps any
+destination already in the file. Each destination is one zlib-compressed JSON
+record, found through a sorted hash table at the end of the file, so opening
+the file reads only its header and a lookup touches one record.
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+from destinations import GAZETTEER_PATH, canonical_destination, load_gazetteer
+from metrics import get_metrics
+from sections import SECTIONS, section_cache_key
+
+# Knowledge base configuration (override with environment variables)
+KNOWLEDGE_BASE_PATH = os.getenv(
+    "TRAVEL_KNOWLEDGE_BASE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "knowledge.kb")
+)
+# off, fallback (only when the model fails or is late), blend (destination sections from the
+# knowledge base, the rest from the model) or instant (everything the knowledge base has)
+KNOWLEDGE_MODE = os.getenv("TRAVEL_KNOWLEDGE_MODE", "fallback")
+KNOWLEDGE_RELOAD_INTERVAL = float(os.getenv("TRAVEL_KNOWLEDGE_RELOAD_INTERVAL", "60"))
+
+KB_MAGIC = b"TKB1"
+KB_VERSION = 1
+
+_HEADER = struct.Struct("<4sIIQd")
+_ENTRY = struct.Struct("<QQI")
+
+# Weather depends on the exact dates, so it is never served from the knowledge base
+KNOWLEDGE_SECTIONS = [section for section in SECTIONS if section['depends_on'] != 'dates']
+
+# Where each assistant caches its sections
+CACHE_NAMESPACES = ("simple_travel_assistant_sections", "travel_assistant_sections")
+
+KNOWLEDGE_NOTICE = "📚 Curated picks from the offline destination guide.\n\n"
+FALLBACK_NOTICE = ("⚠️ Live recommendations are unavailable right now, "
+                   "so these are curated picks from the offline destination guide.\n\n")
+
+
+def _id_hash(destination_id):
+    return int.from_bytes(hashlib.blake2b(destination_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def write_knowledge_base(entries, path=KNOWLEDGE_BASE_PATH):
+    """Write {destination_id: {'name', 'sections', 'updated_at'}} as a knowledge base file, atomically"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    table = []
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        for destination_id, entry in entries.items():
+            record = zlib.compress(json.dumps({'id': destination_id, **entry}, ensure_ascii=False,
+                                              sort_keys=True).encode("utf-8"), 9)
+            table.append((_id_hash(destination_id), f.tell(), len(record)))
+            f.write(record)
+        table_at = f.tell()
+        f.write(b"".join(_ENTRY.pack(*row) for row in sorted(table)))
+        size = f.tell()
+        f.seek(0)
+        f.write(_HEADER.pack(KB_MAGIC, KB_VERSION, len(table), table_at, time.time()))
+    os.replace(tmp_path, path)
+    return {'destinations': len(table), 'bytes': size}
+
+
+class KnowledgeBase:
+    """Read-only view over a memory-mapped knowledge base file"""
+
+    def __init__(self, path=KNOWLEDGE_BASE_PATH):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._table_at, self.built_at = _HEADER.unpack_from(self._map, 0)
+        if magic != KB_MAGIC or version != KB_VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported knowledge base format in {path}")
+        self.get = lru_cache(maxsize=256)(self._get)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+
+    def _hash_at(self, position):
+        return _ENTRY.unpack_from(self._map, self._table_at + position * _ENTRY.size)[0]
+
+    def _record(self, position):
+        _, offset, length = _ENTRY.unpack_from(self._map, self._table_at + position * _ENTRY.size)
+        return json.loads(zlib.decompress(self._map[offset:offset + length]))
+
+    def _get(self, destination_id):
+        target = _id_hash(destination_id)
+        hashes = _HashColumn(self)
+        position = bisect.bisect_left(hashes, target)
+        while position < self.count and self._hash_at(position) == target:
+            record = self._record(position)
+            if record['id'] == destination_id:
+                return record
+            position += 1
+        return None
+
+    def lookup(self, destination):
+        """Knowledge base record for free-text destination input, or None"""
+        return self.get(canonical_destination(destination))
+
+    def entries(self):
+        """Yield every record (for rebuilding the file)"""
+        for position in range(self.count):
+            yield self._record(position)
+
+    def stats(self):
+        return {'destinations': self.count, 'bytes': len(self._map), 'built_at': self.built_at}
+
+
+class _HashColumn:
+    """Sequence view of the table's hash column, so bisect can search the file in place"""
+
+    def __init__(self, knowledge_base):
+        self.knowledge_base = knowledge_base
+
+    def __len__(self):
+        return self.knowledge_base.count
+
+    def __getitem__(self, position):
+        return self.knowledge_base._hash_at(position)
+
+
+_knowledge_base = None
+_knowledge_checked = None
+_knowledge_lock = threading.Lock()
+
+
+def get_knowledge_base():
+    """Return the process-wide knowledge base, reopening it after a rebuild; None when there is no file"""
+    global _knowledge_base, _knowledge_checked
+    now = time.monotonic()
+    if _knowledge_checked is not None and now - _knowledge_checked < KNOWLEDGE_RELOAD_INTERVAL:
+        return _knowledge_base
+    with _knowledge_lock:
+        if _knowledge_checked is not None and now - _knowledge_checked < KNOWLEDGE_RELOAD_INTERVAL:
+            return _knowledge_base
+        _knowledge_checked = now
+        try:
+            mtime = os.path.getmtime(KNOWLEDGE_BASE_PATH)
+        except OSError:
+            return _knowledge_base
+        if _knowledge_base is None or mtime != _knowledge_base.mtime:
+            try:
+                # The old map stays valid for readers that still hold it
+                _knowledge_base = KnowledgeBase(KNOWLEDGE_BASE_PATH)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Knowledge base unavailable: {e}")
+    return _knowledge_base
+
+
+def knowledge_sections(destination, sections=KNOWLEDGE_SECTIONS):
+    """Curated {section key: value} for a destination, empty when it is not in the knowledge base"""
+    knowledge_base = get_knowledge_base()
+    record = knowledge_base.lookup(destination) if knowledge_base is not None else None
+    get_metrics().increment("travel_knowledge_lookups_total", outcome="hit" if record else "miss")
+    if record is None:
+        return {}
+    return {section['key']: record['sections'][section['key']] for section in sections
+            if record['sections'].get(section['key'])}
+
+
+def preferred_knowledge(mode):
+    """Section keys served from the knowledge base before asking the model, for a knowledge mode"""
+    if mode == "instant":
+        return {section['key'] for section in KNOWLEDGE_SECTIONS}
+    if mode == "blend":
+        return {section['key'] for section in KNOWLEDGE_SECTIONS if section['depends_on'] == 'destination'}
+    return set()
+
+
+def _collect_history(entries):
+    """Newest sectioned trip per destination and section, from the trip history"""
+    from trip_history import get_trip_history
+
+    history = get_trip_history()
+    found = {}
+    cursor = None
+    while True:
+        trips, cursor = history.list(cursor=cursor, limit=200)
+        for summary in trips:
+            if summary['kind'] != "sections":
+                continue
+            trip = history.get(summary['id'])
+            found_sections = found.setdefault(trip['destination_id'], {'name': trip['destination'], 'sections': {},
+                                                                      'updated_at': trip['created_at']})
+            for section in KNOWLEDGE_SECTIONS:
+                value = trip['content'].get(section['key'])
+                if value:
+                    found_sections['sections'].setdefault(section['key'], value)
+        if cursor is None:
+            break
+    _merge(entries, found)
+    return len(found)
+
+
+def _collect_cache(entries, gazetteer_path):
+    """Destination-level sections still in the response cache, for every gazetteer destination"""
+    from response_cache import get_response_cache
+
+    cache = get_response_cache()
+    found = {}
+    for place in load_gazetteer(gazetteer_path):
+        for namespace in CACHE_NAMESPACES:
+            for section in KNOWLEDGE_SECTIONS:
+                if section['depends_on'] != 'destination':
+                    continue
+                cached = cache.get(section_cache_key(namespace, section, place['name'], "", ""))
+                if cached is not None:
+                    entry = found.setdefault(place['id'], {'name': place['name'], 'sections': {},
+                                                           'updated_at': time.time()})
+                    entry['sections'].setdefault(section['key'], json.loads(cached))
+    _merge(entries, found)
+    return len(found)
+
+
+def _merge(entries, found):
+    for destination_id, entry in found.items():
+        current = entries.setdefault(destination_id, {'name': entry['name'], 'sections': {}, 'updated_at': 0})
+        current['sections'].update(entry['sections'])
+        current['updated_at'] = max(current['updated_at'], entry['updated_at'])
+
+
+def build_knowledge_base(path=KNOWLEDGE_BASE_PATH, curated=None, use_history=True, use_cache=True,
+                         gazetteer_path=GAZETTEER_PATH):
+    """Refresh the knowledge base file; later sources win: existing file, history, cache, curated"""
+    entries = {}
+    if os.path.exists(path):
+        existing = KnowledgeBase(path)
+        for record in existing.entries():
+            entries[record.pop('id')] = record
+        existing.close()
+    summary = {'existing': len(entries)}
+    summary['history'] = _collect_history(entries) if use_history else 0
+    summary['cache'] = _collect_cache(entries, gazetteer_path) if use_cache else 0
+    if curated:
+        with open(curated, encoding="utf-8") as f:
+            overrides = json.load(f)
+        _merge(entries, {canonical_destination(name): {'name': name, 'sections': sections, 'updated_at': time.time()}
+                         for name, sections in overrides.items()})
+        summary['curated'] = len(overrides)
+    summary.update(write_knowledge_base(entries, path))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the offline destination knowledge base")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Refresh the knowledge base from cached model responses")
+    build.add_argument("--output", default=KNOWLEDGE_BASE_PATH)
+    build.add_argument("--curated", help="JSON file of hand-curated sections per destination")
+    build.add_argument("--no-history", action="store_true", help="Skip sections saved in the trip history")
+    build.add_argument("--no-cache", action="store_true", help="Skip sections in the response cache")
+    build.add_argument("--gazetteer", default=GAZETTEER_PATH)
+    show = subparsers.add_parser("show", help="Print the knowledge base record for destinations")
+    show.add_argument("destination", nargs="+")
+    show.add_argument("--path", default=KNOWLEDGE_BASE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        summary = build_knowledge_base(args.output, args.curated, not args.no_history, not args.no_cache,
+                                       args.gazetteer)
+        print(f"📚 Knowledge base has {summary['destinations']} destinations ({summary['bytes'] / 1024:.1f} KiB): "
+              f"{summary['history']} from history, {summary['cache']} from cache, "
+              f"{summary.get('curated', 0)} curated, {summary['existing']} kept from {args.output}")
+        return 0
+
+    knowledge_base = KnowledgeBase(args.path)
+    for destination in args.destination:
+        record = knowledge_base.lookup(destination)
+        if record is None:
+            print(f"{destination!r}: not in the knowledge base")
+            continue
+        print(f"{destination!r}: {record['name']} ({record['id']}), sections: {', '.join(record['sections'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
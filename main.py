@@ -2,9 +2,39 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from tkcalendar import DateEntry
 from datetime import datetime, timedelta
-import threading
-from config import COLORS, FONTS
+import getpass
+import queue
+import time
+from config import COLORS, FONTS, check_api_key
 from travel_assistant import TravelAssistant
+from sections import assemble_sections
+from metrics import get_metrics
+from renderer import iter_text_chunks, text_footer, text_header
+from destinations import canonical_destination
+from worker_pool import CancelledError, WorkerPool
+from trip_history import HISTORY_PAGE_SIZE, get_trip_history, is_error_response
+from deadline import DEADLINE_SECONDS, PARTIAL_MARKER
+from itinerary import (ITINERARY_MAX_LEGS, itinerary_title, iter_itinerary_text, render_itinerary_text,
+                       validate_legs)
+
+# Minimum seconds between streamed UI updates
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Milliseconds between inserting rendered chunks, so Tk can process events in between
+RENDER_CHUNK_DELAY_MS = 1
+
+# Milliseconds between polls of the worker results queue
+POLL_INTERVAL_MS = 50
+
+class ResultView:
+    """One results tab, tied to a request slot"""
+    
+    def __init__(self, frame, text, destination):
+        self.frame = frame
+        self.text = text
+        self.destination = destination
+        # Bumped on every re-render so superseded chunk insertion stops
+        self.generation = 0
 
 class TravelAssistantGUI:
     def __init__(self, root):
@@ -16,6 +46,17 @@ class TravelAssistantGUI:
         # Initialize travel assistant
         self.travel_assistant = TravelAssistant()
         
+        # With a latency budget, whatever is ready when it runs out is shown and marked partial
+        self.deadline = DEADLINE_SECONDS or None
+        
+        # Requests run on a bounded pool; results come back through a queue polled on the Tk thread
+        self.pool = WorkerPool()
+        self.views = {}
+        
+        # Finished itineraries are kept so they can be reopened without regenerating
+        self.history = get_trip_history()
+        self.user = getpass.getuser()
+        
         # Configure styles
         self.setup_styles()
         
@@ -24,6 +65,9 @@ class TravelAssistantGUI:
         
         # Center the window
         self.center_window()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(POLL_INTERVAL_MS, self._poll_results)
     
     def setup_styles(self):
         """Configure custom styles for ttk widgets"""
@@ -107,17 +151,67 @@ class TravelAssistantGUI:
                                 mindate=datetime.now().date() + timedelta(days=1))
         self.end_date.grid(row=3, column=1, padx=(0, 20), pady=5, sticky='w')
         
+        # Generation mode
+        self.parallel_var = tk.BooleanVar(value=False)
+        parallel_check = tk.Checkbutton(inner_frame, text="Fast mode (generate sections in parallel)",
+                                        variable=self.parallel_var, font=FONTS['body'],
+                                        bg=COLORS['white'], activebackground=COLORS['white'])
+        parallel_check.grid(row=1, column=2, sticky='w')
+        
         # Generate button
         self.generate_btn = tk.Button(inner_frame, text="Generate Recommendations",
                                     command=self.generate_recommendations,
                                     bg=COLORS['secondary'], fg=COLORS['white'],
                                     font=FONTS['button'], relief='flat',
                                     padx=30, pady=12, cursor='hand2')
-        self.generate_btn.grid(row=4, columnspan=2, pady=20, sticky='w')
+        self.generate_btn.grid(row=4, column=0, columnspan=2, pady=20, sticky='w')
+        
+        # Cancel the request shown in the selected tab
+        self.cancel_btn = tk.Button(inner_frame, text="Cancel",
+                                  command=self.cancel_selected,
+                                  bg=COLORS['gray'], fg=COLORS['white'],
+                                  font=FONTS['button'], relief='flat',
+                                  padx=30, pady=12, cursor='hand2')
+        self.cancel_btn.grid(row=4, column=2, pady=20, sticky='w')
+        
+        # Browse and reopen saved trips
+        self.history_btn = tk.Button(inner_frame, text="📚 History",
+                                   command=self.open_history,
+                                   bg=COLORS['primary'], fg=COLORS['white'],
+                                   font=FONTS['button'], relief='flat',
+                                   padx=30, pady=12, cursor='hand2')
+        self.history_btn.grid(row=4, column=3, pady=20, sticky='w')
+        
+        # Multi-city legs, generated together as one itinerary
+        ttk.Label(inner_frame, text="Itinerary Legs:", style='Body.TLabel').grid(row=2, column=2, sticky='w')
+        self.legs = []
+        self.legs_list = tk.Listbox(inner_frame, font=FONTS['body'], height=4, width=40, activestyle='none')
+        self.legs_list.grid(row=2, column=3, rowspan=2, padx=(10, 0), pady=5, sticky='w')
+        
+        legs_frame = tk.Frame(inner_frame, bg=COLORS['white'])
+        legs_frame.grid(row=5, column=0, columnspan=4, sticky='w')
+        self.add_leg_btn = tk.Button(legs_frame, text="➕ Add Leg",
+                                   command=self.add_leg,
+                                   bg=COLORS['gray'], fg=COLORS['white'],
+                                   font=FONTS['button'], relief='flat',
+                                   padx=20, pady=8, cursor='hand2')
+        self.add_leg_btn.pack(side='left', padx=(0, 10))
+        self.clear_legs_btn = tk.Button(legs_frame, text="Clear Legs",
+                                      command=self.clear_legs,
+                                      bg=COLORS['gray'], fg=COLORS['white'],
+                                      font=FONTS['button'], relief='flat',
+                                      padx=20, pady=8, cursor='hand2')
+        self.clear_legs_btn.pack(side='left', padx=(0, 10))
+        self.itinerary_btn = tk.Button(legs_frame, text="🗺️ Generate Itinerary",
+                                     command=self.generate_itinerary,
+                                     bg=COLORS['secondary'], fg=COLORS['white'],
+                                     font=FONTS['button'], relief='flat',
+                                     padx=20, pady=8, cursor='hand2')
+        self.itinerary_btn.pack(side='left')
         
         # Loading label
         self.loading_label = ttk.Label(inner_frame, text="", style='Body.TLabel')
-        self.loading_label.grid(row=5, columnspan=3, pady=5)
+        self.loading_label.grid(row=6, columnspan=4, pady=5)
     
     def create_results_section(self, parent):
         """Create the results section"""
@@ -133,20 +227,42 @@ class TravelAssistantGUI:
                                      style='Heading.TLabel')
         self.results_title.pack(anchor='w', pady=(0, 15))
         
-        # Scrollable text area for results
-        self.results_text = scrolledtext.ScrolledText(inner_frame, 
-                                                    font=FONTS['body'],
-                                                    wrap=tk.WORD,
-                                                    relief='solid',
-                                                    bd=1,
-                                                    padx=15,
-                                                    pady=15)
-        self.results_text.pack(fill='both', expand=True)
+        # One tab per destination, so several trips can be compared side by side
+        self.results_tabs = ttk.Notebook(inner_frame)
+        self.results_tabs.pack(fill='both', expand=True)
+        
+        # Welcome tab
+        self.results_text = self._create_text_tab("Welcome")
         
         # Initial message
         self.results_text.insert('1.0', "Enter your destination and travel dates above, then click 'Generate Recommendations' to receive personalized luxury travel suggestions powered by AI.")
         self.results_text.config(state='disabled')
     
+    def _create_text_tab(self, title):
+        """Add a tab holding a scrollable text area and return the text widget"""
+        text = scrolledtext.ScrolledText(self.results_tabs,
+                                         font=FONTS['body'],
+                                         wrap=tk.WORD,
+                                         relief='solid',
+                                         bd=1,
+                                         padx=15,
+                                         pady=15)
+        self.results_tabs.add(text.frame, text=title)
+        return text
+    
+    def _get_view(self, slot, destination):
+        """Return the results tab for slot, creating it on first use"""
+        view = self.views.get(slot)
+        if view is None:
+            text = self._create_text_tab(destination)
+            view = self.views[slot] = ResultView(text.frame, text, destination)
+        view.destination = destination
+        return view
+    
+    def _set_tab_state(self, view, marker):
+        """Show a status marker in the view's tab title"""
+        self.results_tabs.tab(view.frame, text=f"{marker} {view.destination}".strip())
+    
     def validate_inputs(self):
         """Validate user inputs"""
         if not self.destination_var.get().strip():
@@ -167,173 +283,383 @@ class TravelAssistantGUI:
         return True
     
     def generate_recommendations(self):
-        """Generate travel recommendations"""
+        """Queue a recommendation request for the entered destination"""
+        if not self.validate_inputs():
+            return
+        
+        # Tk variables are only read here, on the main thread
+        destination = self.destination_var.get().strip()
+        start_date = self.start_date.get_date().strftime("%Y-%m-%d")
+        end_date = self.end_date.get_date().strftime("%Y-%m-%d")
+        parallel = self.parallel_var.get()
+        
+        # A newer query for the same destination cancels the older one
+        slot = canonical_destination(destination)
+        try:
+            self.pool.submit(slot, self._generate_recommendations_worker,
+                             destination, start_date, end_date, parallel)
+        except queue.Full:
+            messagebox.showerror("Error", "Too many requests are queued. Please wait or cancel one.")
+            return
+        
+        view = self._get_view(slot, destination)
+        self._set_tab_state(view, "🔄")
+        self.results_tabs.select(view.frame)
+        self._update_status()
+    
+    def add_leg(self):
+        """Append the entered destination and dates to the itinerary, then preset the next leg"""
         if not self.validate_inputs():
             return
         
-        # Disable button and show loading
-        self.generate_btn.config(state='disabled')
-        self.loading_label.config(text="🔄 Generating luxury recommendations... This may take a moment.")
+        start = self.start_date.get_date()
+        end = self.end_date.get_date()
+        if len(self.legs) >= ITINERARY_MAX_LEGS:
+            messagebox.showerror("Error", f"An itinerary can have at most {ITINERARY_MAX_LEGS} legs.")
+            return
+        if self.legs and start.strftime("%Y-%m-%d") < self.legs[-1][2]:
+            messagebox.showerror("Error", "Each leg must start after the previous one ends.")
+            return
+        
+        leg = (self.destination_var.get().strip(), start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+        self.legs.append(leg)
+        self.legs_list.insert(tk.END, f"{len(self.legs)}. {leg[0]}   {leg[1]} → {leg[2]}")
         
-        # Run in separate thread to prevent UI freezing
-        thread = threading.Thread(target=self._generate_recommendations_thread)
-        thread.daemon = True
-        thread.start()
+        # The next leg starts where this one ends and lasts as long by default
+        self.destination_var.set("")
+        self.start_date.set_date(end)
+        self.end_date.set_date(end + (end - start))
+    
+    def clear_legs(self):
+        """Remove every leg from the itinerary"""
+        self.legs = []
+        self.legs_list.delete(0, tk.END)
+    
+    def generate_itinerary(self):
+        """Queue generation of every leg as one multi-city itinerary"""
+        legs = list(self.legs)
+        error = validate_legs(legs)
+        if error:
+            messagebox.showerror("Error", error)
+            return
+        
+        # Re-running the same route cancels the older request
+        slot = "itinerary:" + "|".join(canonical_destination(destination) for destination, _, _ in legs)
+        try:
+            self.pool.submit(slot, self._generate_itinerary_worker, legs)
+        except queue.Full:
+            messagebox.showerror("Error", "Too many requests are queued. Please wait or cancel one.")
+            return
+        
+        view = self._get_view(slot, f"🗺️ {itinerary_title(legs)}")
+        self._set_tab_state(view, "🔄")
+        self.results_tabs.select(view.frame)
+        self._update_status()
+    
+    def cancel_selected(self):
+        """Cancel the request shown in the selected tab"""
+        selected = self.results_tabs.select()
+        for slot, view in self.views.items():
+            if str(view.frame) == str(selected):
+                if self.pool.cancel(slot):
+                    self._set_tab_state(view, "⏹")
+                    self.loading_label.config(text=f"⏹ Cancelled {view.destination}")
+                break
+        self._update_status()
+    
+    def close(self):
+        """Cancel outstanding requests and close the window"""
+        self.pool.shutdown()
+        self.root.destroy()
     
-    def _generate_recommendations_thread(self):
-        """Thread function for generating recommendations"""
+    def _generate_recommendations_worker(self, token, emit, destination, start_date, end_date, parallel=False):
+        """Worker-pool job: generate recommendations and post UI updates through emit"""
         try:
-            destination = self.destination_var.get().strip()
-            start_date = self.start_date.get_date().strftime("%Y-%m-%d")
-            end_date = self.end_date.get_date().strftime("%Y-%m-%d")
+            # After a date change, cached sections are reused and only date-dependent ones regenerated
+            if parallel or self.travel_assistant.cached_sections(destination, start_date, end_date):
+                # Re-render as each section lands; sections keep canonical order
+                results = {}
+                sections = self.travel_assistant.iter_sections(destination, start_date, end_date,
+                                                               deadline=self.deadline)
+                try:
+                    for key, value in sections:
+                        token.raise_if_cancelled()
+                        results[key] = value
+                        emit('sections', (assemble_sections(results), destination, start_date, end_date, False))
+                finally:
+                    sections.close()
+                self._save_trip(destination, start_date, end_date, assemble_sections(results))
+                emit('sections', (assemble_sections(results), destination, start_date, end_date, True))
+                return
             
-            # Generate recommendations
-            recommendations = self.travel_assistant.generate_recommendations(
-                destination, start_date, end_date
-            )
+            emit('begin', (destination, start_date, end_date))
             
-            # Update UI in main thread
-            self.root.after(0, self._update_results, recommendations, destination, start_date, end_date)
+            # Stream recommendations, batching chunks into periodic UI updates
+            parts = []
+            pending = []
+            last_flush = time.monotonic()
+            stream = self.travel_assistant.stream_recommendations(destination, start_date, end_date,
+                                                                  deadline=self.deadline)
+            try:
+                for chunk in stream:
+                    token.raise_if_cancelled()
+                    parts.append(chunk)
+                    pending.append(chunk)
+                    now = time.monotonic()
+                    if now - last_flush >= STREAM_FLUSH_INTERVAL:
+                        emit('append', "".join(pending))
+                        pending = []
+                        last_flush = now
+            finally:
+                stream.close()
             
+            self._save_trip(destination, start_date, end_date, "".join(parts))
+            emit('finish', ("".join(pending), PARTIAL_MARKER in "".join(parts)))
+            
+        except CancelledError:
+            raise
+        except Exception as e:
+            emit('error', f"An error occurred: {str(e)}")
+    
+    def _generate_itinerary_worker(self, token, emit, legs):
+        """Worker-pool job: generate all legs concurrently, re-rendering in leg order as each finishes"""
+        try:
+            results = {}
+            emit('itinerary', (legs, {}, False))
+            finished = self.travel_assistant.iter_itinerary(legs, deadline=self.deadline)
+            try:
+                for index, content in finished:
+                    token.raise_if_cancelled()
+                    results[index] = content
+                    emit('itinerary', (legs, dict(results), False))
+            finally:
+                finished.close()
+            
+            if not any(is_error_response(content) for content in results.values()):
+                self._save_trip(itinerary_title(legs), legs[0][1], legs[-1][2],
+                                render_itinerary_text(legs, results))
+            emit('itinerary', (legs, results, True))
+            
+        except CancelledError:
+            raise
+        except Exception as e:
+            emit('error', f"An error occurred: {str(e)}")
+    
+    def _save_trip(self, destination, start_date, end_date, content):
+        """Record a complete itinerary in the trip history (worker thread)"""
+        if is_error_response(content):
+            return
+        try:
+            self.history.save(self.user, destination, start_date, end_date, content)
         except Exception as e:
-            error_msg = f"An error occurred: {str(e)}"
-            self.root.after(0, self._show_error, error_msg)
+            print(f"Could not save trip: {e}")
+    
+    def open_history(self):
+        """Show a window for searching and reopening saved trips"""
+        window = tk.Toplevel(self.root)
+        window.title("Trip History")
+        window.geometry("560x420")
+        window.configure(bg=COLORS['light'])
+        
+        search_var = tk.StringVar()
+        search_frame = tk.Frame(window, bg=COLORS['light'], padx=10, pady=10)
+        search_frame.pack(fill='x')
+        search_entry = tk.Entry(search_frame, textvariable=search_var, font=FONTS['body'], relief='solid', bd=1)
+        search_entry.pack(side='left', fill='x', expand=True, padx=(0, 10))
+        
+        listbox = tk.Listbox(window, font=FONTS['body'], activestyle='none')
+        listbox.pack(fill='both', expand=True, padx=10)
+        
+        state = {'trips': [], 'cursor': None}
+        
+        def load(more=False):
+            query = search_var.get().strip()
+            if not more:
+                state['trips'], state['cursor'] = [], None
+                listbox.delete(0, tk.END)
+            if query:
+                trips, state['cursor'] = self.history.search(query, offset=len(state['trips'])), None
+            else:
+                trips, state['cursor'] = self.history.list(cursor=state['cursor'])
+            state['trips'].extend(trips)
+            for trip in trips:
+                saved = datetime.fromtimestamp(trip['created_at']).strftime('%Y-%m-%d %H:%M')
+                listbox.insert(tk.END, f"{trip['destination']}   {trip['start_date']} → {trip['end_date']}   "
+                                       f"({trip['user'] or 'unknown'}, {saved})")
+            has_more = state['cursor'] is not None or (query and len(trips) == HISTORY_PAGE_SIZE)
+            more_btn.config(state='normal' if has_more else 'disabled')
+        
+        def open_selected(event=None):
+            for index in listbox.curselection():
+                self._open_trip(state['trips'][index]['id'])
+        
+        tk.Button(search_frame, text="Search", command=load, font=FONTS['body'], relief='flat',
+                  bg=COLORS['secondary'], fg=COLORS['white']).pack(side='left')
+        button_frame = tk.Frame(window, bg=COLORS['light'], padx=10, pady=10)
+        button_frame.pack(fill='x')
+        tk.Button(button_frame, text="Open", command=open_selected, font=FONTS['body'], relief='flat',
+                  bg=COLORS['secondary'], fg=COLORS['white']).pack(side='left')
+        more_btn = tk.Button(button_frame, text="Load more", command=lambda: load(more=True),
+                             font=FONTS['body'], relief='flat')
+        more_btn.pack(side='left', padx=10)
+        
+        search_entry.bind('<Return>', lambda event: load())
+        listbox.bind('<Double-Button-1>', open_selected)
+        load()
     
-    def _update_results(self, recommendations, destination, start_date, end_date):
-        """Update the results display"""
-        self.results_text.config(state='normal')
-        self.results_text.delete('1.0', tk.END)
-        
-        if "error" in recommendations:
-            self.results_text.insert('1.0', f"⚠️ {recommendations['error']}\n\n")
-            # Still show any available recommendations
-            if recommendations.get('destination_overview'):
-                content = self._format_recommendations(recommendations, destination, start_date, end_date)
-                self.results_text.insert(tk.END, content)
+    def _open_trip(self, trip_id):
+        """Show a saved trip in its own tab without calling the API"""
+        trip = self.history.get(trip_id)
+        if trip is None:
+            return
+        view = self._get_view(f"trip:{trip_id}", f"📚 {trip['destination']}")
+        args = (trip['destination'], trip['start_date'], trip['end_date'])
+        if trip['kind'] == "sections":
+            self._update_results(view, trip['content'], *args)
         else:
-            # Format and display recommendations
-            content = self._format_recommendations(recommendations, destination, start_date, end_date)
-            self.results_text.insert('1.0', content)
+            self._begin_stream(view, *args)
+            self._finish_stream(view, trip['content'])
+        self._set_tab_state(view, "")
+        self.results_tabs.select(view.frame)
+        self.loading_label.config(text=f"📚 Reopened {trip['destination']} from history")
+    
+    def _poll_results(self):
+        """Apply queued worker results on the Tk thread, then poll again"""
+        for slot, kind, payload in self.pool.drain():
+            view = self.views.get(slot)
+            if view is None:
+                continue
+            if kind == 'begin':
+                self._begin_stream(view, *payload)
+            elif kind == 'append':
+                self._append_stream(view, payload)
+            elif kind == 'finish':
+                self._finish_stream(view, *payload)
+            elif kind == 'sections':
+                self._update_results(view, *payload)
+            elif kind == 'itinerary':
+                self._update_itinerary(view, *payload)
+            elif kind == 'error':
+                self._show_error(view, payload)
+        self._update_status()
+        self.root.after(POLL_INTERVAL_MS, self._poll_results)
+    
+    def _update_status(self):
+        """Summarize running and queued requests under the buttons"""
+        stats = self.pool.stats()
+        if stats['slots']:
+            queued = stats['slots'] - stats['running']
+            text = f"🔄 Generating luxury recommendations... {stats['running']} running"
+            self.loading_label.config(text=text + (f", {queued} queued" if queued > 0 else ""))
+    
+    def _begin_stream(self, view, destination, start_date, end_date):
+        """Clear the view and write the header for a streamed response"""
+        view.generation += 1
+        view.text.config(state='normal')
+        view.text.delete('1.0', tk.END)
+        view.text.insert('1.0', text_header(destination, start_date, end_date))
+        view.text.config(state='disabled')
+    
+    def _append_stream(self, view, text):
+        """Append a batch of streamed text to the view"""
+        if not text:
+            return
+        with get_metrics().span("render", surface="tk"):
+            view.text.config(state='normal')
+            view.text.insert(tk.END, text)
+            view.text.config(state='disabled')
+    
+    def _finish_stream(self, view, text, partial=False):
+        """Append the final batch and footer, then mark the view done"""
+        self._append_stream(view, text + "\n\n" + text_footer())
         
-        self.results_text.config(state='disabled')
+        if partial:
+            self._set_tab_state(view, "⏱️")
+            self.loading_label.config(text="⏱️ Showing what was ready in time")
+            return
         
-        # Re-enable button and hide loading
-        self.generate_btn.config(state='normal')
+        self._set_tab_state(view, "✅")
         self.loading_label.config(text="✅ Recommendations generated successfully!")
     
-    def _show_error(self, error_msg):
+    def _update_results(self, view, recommendations, destination, start_date, end_date, done=True):
+        """Update the view with structured recommendations"""
+        view.generation += 1
+        with get_metrics().span("render", surface="tk"):
+            view.text.config(state='normal')
+            view.text.delete('1.0', tk.END)
+            
+            chunks = iter(())
+            if "error" in recommendations:
+                view.text.insert('1.0', f"⚠️ {recommendations['error']}\n\n")
+                # Still show any available recommendations
+                if len(recommendations) > 1:
+                    chunks = iter_text_chunks(recommendations, destination, start_date, end_date)
+            else:
+                # Format and display recommendations
+                chunks = iter_text_chunks(recommendations, destination, start_date, end_date)
+            
+            view.text.config(state='disabled')
+        
+        self._insert_chunks(view, view.generation, chunks)
+        
+        if not done:
+            return
+        
+        error = recommendations.get('error')
+        if error is None:
+            self._set_tab_state(view, "✅")
+            self.loading_label.config(text="✅ Recommendations generated successfully!")
+        elif len(recommendations) == 1:
+            self._set_tab_state(view, "❌")
+            self.loading_label.config(text="❌ No recommendations could be generated")
+        elif error.startswith("⏱️"):
+            # Sections still running at the deadline
+            self._set_tab_state(view, "⏱️")
+            self.loading_label.config(text="⏱️ Showing the sections that were ready in time")
+        else:
+            self._set_tab_state(view, "⚠️")
+            self.loading_label.config(text="⚠️ Some sections could not be generated")
+    
+    def _update_itinerary(self, view, legs, results, done=True):
+        """Re-render the merged itinerary; legs stay in order and unfinished ones show a placeholder"""
+        view.generation += 1
+        with get_metrics().span("render", surface="tk"):
+            view.text.config(state='normal')
+            view.text.delete('1.0', tk.END)
+            view.text.config(state='disabled')
+        
+        self._insert_chunks(view, view.generation, iter_itinerary_text(legs, results))
+        
+        if not done:
+            self._set_tab_state(view, f"🔄 {len(results)}/{len(legs)}")
+            return
+        
+        self._set_tab_state(view, "✅")
+        self.loading_label.config(text="✅ Itinerary generated successfully!")
+    
+    def _insert_chunks(self, view, generation, chunks):
+        """Insert one rendered chunk per event-loop turn so large responses never freeze the UI"""
+        if generation != view.generation:
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        with get_metrics().span("render", surface="tk"):
+            view.text.config(state='normal')
+            view.text.insert(tk.END, chunk)
+            view.text.config(state='disabled')
+        self.root.after(RENDER_CHUNK_DELAY_MS, self._insert_chunks, view, generation, chunks)
+    
+    def _show_error(self, view, error_msg):
         """Show error message"""
-        self.generate_btn.config(state='normal')
+        self._set_tab_state(view, "❌")
         self.loading_label.config(text="❌ Error generating recommendations")
-        messagebox.showerror("Error", error_msg)
-    
-    def _format_recommendations(self, recommendations, destination, start_date, end_date):
-        """Format recommendations for display"""
-        content = f"🏖️ LUXURY TRAVEL RECOMMENDATIONS\n"
-        content += f"📍 Destination: {destination}\n"
-        content += f"📅 Travel Dates: {start_date} to {end_date}\n"
-        content += "="*80 + "\n\n"
-        
-        # If there's a raw AI response, show it first
-        if recommendations.get('raw_ai_response'):
-            content += f"🤖 AI RECOMMENDATIONS\n"
-            content += recommendations['raw_ai_response'] + "\n\n"
-            content += "="*80 + "\n\n"
-        
-        # Destination Overview
-        if recommendations.get('destination_overview'):
-            content += f"🌟 DESTINATION OVERVIEW\n"
-            content += f"{recommendations['destination_overview']}\n\n"
-        
-        # Weather
-        if recommendations.get('weather'):
-            content += f"🌤️ WEATHER & PACKING\n"
-            content += f"{recommendations['weather']}\n\n"
-        
-        # Luxury Hotels
-        if recommendations.get('luxury_hotels'):
-            content += "🏨 LUXURY ACCOMMODATIONS\n"
-            content += "-" * 40 + "\n"
-            for i, hotel in enumerate(recommendations['luxury_hotels'], 1):
-                if isinstance(hotel, dict):
-                    content += f"{i}. {hotel.get('name', 'N/A')}\n"
-                    content += f"   💰 Price: {hotel.get('price_range', 'Contact for rates')}\n"
-                    content += f"   📝 {hotel.get('description', '')}\n\n"
-                else:
-                    content += f"{i}. {hotel}\n\n"
-        
-        # Fine Dining
-        if recommendations.get('fine_dining'):
-            content += "🍽️ FINE DINING EXPERIENCES\n"
-            content += "-" * 40 + "\n"
-            for i, restaurant in enumerate(recommendations['fine_dining'], 1):
-                if isinstance(restaurant, dict):
-                    content += f"{i}. {restaurant.get('name', 'N/A')}\n"
-                    content += f"   🍳 Cuisine: {restaurant.get('cuisine_type', 'N/A')}\n"
-                    content += f"   💰 Price: {restaurant.get('price_range', 'Contact for rates')}\n"
-                    content += f"   📝 {restaurant.get('description', '')}\n\n"
-                else:
-                    content += f"{i}. {restaurant}\n\n"
-        
-        # Exclusive Experiences
-        if recommendations.get('exclusive_experiences'):
-            content += "✨ EXCLUSIVE EXPERIENCES\n"
-            content += "-" * 40 + "\n"
-            for i, experience in enumerate(recommendations['exclusive_experiences'], 1):
-                if isinstance(experience, dict):
-                    content += f"{i}. {experience.get('name', 'N/A')}\n"
-                    content += f"   💰 Price: {experience.get('price_range', 'Contact for rates')}\n"
-                    content += f"   📝 {experience.get('description', '')}\n\n"
-                else:
-                    content += f"{i}. {experience}\n\n"
-        
-        # Luxury Shopping
-        if recommendations.get('luxury_shopping'):
-            content += "🛍️ LUXURY SHOPPING\n"
-            content += "-" * 40 + "\n"
-            for i, shopping in enumerate(recommendations['luxury_shopping'], 1):
-                if isinstance(shopping, dict):
-                    content += f"{i}. {shopping.get('name', 'N/A')}\n"
-                    content += f"   🏪 Type: {shopping.get('type', 'N/A')}\n"
-                    content += f"   📝 {shopping.get('description', '')}\n\n"
-                else:
-                    content += f"{i}. {shopping}\n\n"
-        
-        # Transportation
-        if recommendations.get('transportation'):
-            content += "🚗 LUXURY TRANSPORTATION\n"
-            content += "-" * 40 + "\n"
-            for i, transport in enumerate(recommendations['transportation'], 1):
-                if isinstance(transport, dict):
-                    content += f"{i}. {transport.get('type', 'N/A')}\n"
-                    content += f"   📝 {transport.get('description', '')}\n\n"
-                else:
-                    content += f"{i}. {transport}\n\n"
-        
-        # Seasonal Highlights
-        if recommendations.get('seasonal_highlights'):
-            content += "🎭 SEASONAL HIGHLIGHTS\n"
-            content += "-" * 40 + "\n"
-            for i, highlight in enumerate(recommendations['seasonal_highlights'], 1):
-                content += f"{i}. {highlight}\n"
-            content += "\n"
-        
-        # Insider Tips
-        if recommendations.get('insider_tips'):
-            content += "💡 INSIDER TIPS\n"
-            content += "-" * 40 + "\n"
-            for i, tip in enumerate(recommendations['insider_tips'], 1):
-                content += f"{i}. {tip}\n"
-            content += "\n"
-        
-        content += "="*80 + "\n"
-        content += "Generated by AI-Powered Luxury Travel Assistant"
-        
-        return content
+        messagebox.showerror("Error", f"{view.destination}: {error_msg}")
 
 def main():
     root = tk.Tk()
     app = TravelAssistantGUI(root)
+    check_api_key()
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from resilience import LatencyHistogram
+
+# Metrics export configuration (override with environment variables)
+METRICS_JSONL_PATH = os.getenv("TRAVEL_METRICS_JSONL")
+METRICS_PORT = int(os.getenv("TRAVEL_METRICS_PORT", "0"))
+
+SUMMARY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{value}"'.replace("\n", " ") for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class JsonlSink:
+    """Appends every metric event to a local JSONL file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def emit(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class Metrics:
+    """Aggregates timing spans, counters and token usage, forwarding events to sinks"""
+
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+        self._lock = threading.Lock()
+        self._summaries = {}
+        self._counters = {}
+        self._collectors = []
+
+    def observe(self, name, value, **labels):
+        """Record one observation (e.g. a duration in seconds)"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = {'histogram': LatencyHistogram(window=1000), 'sum': 0.0, 'count': 0}
+            summary['sum'] += value
+            summary['count'] += 1
+        summary['histogram'].record(value)
+        self._emit('observe', name, value, labels)
+
+    def increment(self, name, amount=1, **labels):
+        """Add amount to a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._emit('counter', name, amount, labels)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time the enclosed block as one stage of the request path"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("travel_stage_seconds", time.perf_counter() - started, stage=stage, **labels)
+
+    def record_usage(self, usage, **labels):
+        """Record token usage from an API response (dict or SDK object)"""
+        if not usage:
+            return
+        for kind in ('prompt_tokens', 'completion_tokens'):
+            value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+            if value:
+                self.increment("travel_tokens_total", value, kind=kind.replace("_tokens", ""), **labels)
+
+    def add_collector(self, collector):
+        """Register a callable returning {gauge_name: value} read at export time"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        """Return current aggregates as a plain dict"""
+        with self._lock:
+            summaries = list(self._summaries.items())
+            counters = dict(self._counters)
+        return {
+            'summaries': [
+                {'name': name, 'labels': dict(labels), 'count': summary['count'], 'sum': summary['sum'],
+                 **{f"p{int(q * 100)}": summary['histogram'].percentile(q * 100) for q in SUMMARY_QUANTILES}}
+                for (name, labels), summary in summaries
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in counters.items()
+            ],
+            'gauges': self._collect(),
+        }
+
+    def render_prometheus(self):
+        """Render aggregates in the Prometheus text exposition format"""
+        with self._lock:
+            summaries = sorted(self._summaries.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), summary in summaries:
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in SUMMARY_QUANTILES:
+                value = summary['histogram'].percentile(q * 100)
+                if value is not None:
+                    lines.append(f"{name}{_format_labels(labels, [('quantile', q)])} {value:.6f}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {summary['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {summary['count']}")
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, value in sorted(self._collect().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _collect(self):
+        gauges = {}
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                gauges.update(collector())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+        return {name: value for name, value in gauges.items() if isinstance(value, (int, float))}
+
+    def _emit(self, kind, name, value, labels):
+        if not self.sinks:
+            return
+        event = {'ts': time.time(), 'type': kind, 'name': name, 'value': value, 'labels': labels}
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                print(f"Metrics sink error: {e}")
+
+
+def start_metrics_server(metrics, port, host="0.0.0.0"):
+    """Serve metrics.render_prometheus() on /metrics from a background thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry, starting configured exporters once"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                sinks = [JsonlSink(METRICS_JSONL_PATH)] if METRICS_JSONL_PATH else []
+                metrics = Metrics(sinks)
+                if METRICS_PORT:
+                    try:
+                        start_metrics_server(metrics, METRICS_PORT)
+                    except OSError as e:
+                        # Another process (e.g. a second Streamlit worker) owns the port
+                        print(f"Metrics endpoint unavailable on port {METRICS_PORT}: {e}")
+                _metrics = metrics
+    return _metrics
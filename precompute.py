@@ -0,0 +1,180 @@
+"""Nightly precomputation of popular destination × month recommendations.
+
+Usage:
+    python precompute.py --months 12 --assistant both --concurrency 8
+    python precompute.py --destinations top_destinations.txt --refresh-after 3
+
+Destinations default to every entry in the gazetteer; a destinations file has
+one name per line. Each trip is generated through the assistants'
+generate_recommendations for a representative week of the month and written
+into a new warm store version, which the Streamlit and Tk apps pick up without
+a restart. Entries from the previous version younger than --refresh-after days
+are carried over instead of being regenerated.
+
+Schedule it nightly, e.g. with cron:
+    0 3 * * * cd /path/to/app && OPENAI_API_KEY=sk-... python precompute.py
+"""
+import argparse
+import datetime
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from credentials import get_credential
+from destinations import GAZETTEER_PATH, load_gazetteer, resolve_destination
+from response_cache import make_cache_key
+from warm_store import WARM_STORE_DIR, WarmStore, WarmStoreWriter
+
+TRIP_DAYS = 7
+
+# Cache namespaces of the assistants each frontend uses
+ASSISTANT_NAMESPACES = {
+    'simple': "simple_travel_assistant",
+    'sdk': "travel_assistant",
+}
+
+
+def load_destinations(path=None):
+    """Resolve a destinations file (or the whole gazetteer) to canonical matches"""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        names = [entry['name'] for entry in load_gazetteer(GAZETTEER_PATH)]
+
+    matches = {}
+    for name in names:
+        match = resolve_destination(name)
+        if match is None:
+            print(f"⚠️  Skipping unknown destination: {name}", file=sys.stderr)
+            continue
+        matches.setdefault(match.id, match)
+    return list(matches.values())
+
+
+def upcoming_months(count, today=None):
+    """The next count months as (month, start_date, end_date) with a representative week"""
+    today = today or datetime.date.today()
+    months = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        start = max(datetime.date(year, month, 1), today)
+        months.append((f"{year:04d}-{month:02d}", start.isoformat(),
+                       (start + datetime.timedelta(days=TRIP_DAYS - 1)).isoformat()))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def build_assistants(names, api_key, base_url=None):
+    """Instantiate the requested assistants keyed by name, routed as batch traffic unless base_url pins them"""
+    assistants = {}
+    if 'simple' in names:
+        from simple_assistant import SimpleTravelAssistant
+        assistants['simple'] = SimpleTravelAssistant(api_key=api_key, base_url=base_url, purpose="batch",
+                                                     tenant="precompute")
+    if 'sdk' in names:
+        from travel_assistant import TravelAssistant
+        assistants['sdk'] = TravelAssistant(api_key=api_key, base_url=base_url, purpose="batch",
+                                            tenant="precompute")
+    return assistants
+
+
+def generate_entry(assistant, namespace, match, start_date, end_date):
+    """Generate one trip, returning the content or None on failure"""
+    content = assistant.generate_recommendations(match.name, start_date, end_date, bypass_cache=True)
+    # Both assistants cache successful responses only, and report failures as text
+    cached = assistant.cache.get(make_cache_key(namespace, match.name, start_date, end_date))
+    return content if cached == content else None
+
+
+def run_precompute(destinations, months, assistants, directory=WARM_STORE_DIR, concurrency=4,
+                   refresh_after=24 * 60 * 60):
+    """Build and publish a new warm store version, returning a summary dict"""
+    previous = {(namespace, destination, month): (content, generated_at)
+                for namespace, destination, month, content, generated_at in WarmStore(directory).entries()}
+    writer = WarmStoreWriter(directory)
+    summary = {'generated': 0, 'reused': 0, 'failed': 0, 'kept_stale': 0}
+    now = time.time()
+
+    jobs = []
+    for name, assistant in assistants.items():
+        namespace = ASSISTANT_NAMESPACES[name]
+        for match in destinations:
+            for month, start_date, end_date in months:
+                key = (namespace, match.id, month)
+                old = previous.get(key)
+                if old is not None and now - old[1] < refresh_after:
+                    writer.add(*key, old[0], generated_at=old[1])
+                    summary['reused'] += 1
+                else:
+                    jobs.append((assistant, namespace, match, month, start_date, end_date))
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {
+                pool.submit(generate_entry, assistant, namespace, match, start_date, end_date):
+                    (namespace, match.id, month)
+                for assistant, namespace, match, month, start_date, end_date in jobs
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    print(f"⚠️  {'/'.join(key)} failed: {e}", file=sys.stderr)
+                    content = None
+                if content is not None:
+                    writer.add(*key, content)
+                    summary['generated'] += 1
+                elif key in previous:
+                    # Better an older answer than none; the freshness policy decides if it is served
+                    writer.add(*key, previous[key][0], generated_at=previous[key][1])
+                    summary['kept_stale'] += 1
+                else:
+                    summary['failed'] += 1
+                if done % 50 == 0 or done == len(futures):
+                    print(f"  {done}/{len(futures)} trips generated", file=sys.stderr)
+    except BaseException:
+        writer.discard()
+        raise
+
+    summary['path'] = writer.publish()
+    summary['entries'] = writer.count
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute popular destination × month recommendations")
+    parser.add_argument("--destinations", help="File with one destination per line (default: whole gazetteer)")
+    parser.add_argument("--months", type=int, default=12, help="How many months ahead to cover")
+    parser.add_argument("--assistant", choices=["simple", "sdk", "both"], default="both",
+                        help="simple = Streamlit app, sdk = Tk app")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--refresh-after", type=float, default=1.0,
+                        help="Regenerate entries older than this many days")
+    parser.add_argument("--store", default=WARM_STORE_DIR, help="Warm store directory")
+    parser.add_argument("--base-url", help="Pin every call to this API base URL (ending in /v1) "
+                                           "instead of the cheapest configured backend")
+    args = parser.parse_args(argv)
+
+    api_key = get_credential("OPENAI_API_KEY")
+    if not api_key:
+        print("❌ OPENAI_API_KEY is not set", file=sys.stderr)
+        return 2
+
+    destinations = load_destinations(args.destinations)
+    months = upcoming_months(args.months)
+    names = ["simple", "sdk"] if args.assistant == "both" else [args.assistant]
+    assistants = build_assistants(names, api_key, args.base_url)
+
+    started = time.time()
+    summary = run_precompute(destinations, months, assistants, args.store, args.concurrency,
+                             args.refresh_after * 24 * 60 * 60)
+    print(f"🌙 Published {summary['entries']} entries to {summary['path']} in {time.time() - started:.1f}s "
+          f"({summary['generated']} generated, {summary['reused']} reused, "
+          f"{summary['kept_stale']} kept stale, {summary['failed']} failed)")
+    return 1 if summary['failed'] and not summary['generated'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from destinations import prompt_destination
+
+LUXURY_SYSTEM_PROMPT = "You are the world's leading luxury travel advisor, with exclusive access to the finest hotels, restaurants, and experiences globally. You specialize in ultra-high-end travel for discerning clients with substantial budgets."
+
+
+def build_luxury_messages(destination, start_date, end_date):
+    """Build the chat messages for a luxury recommendation request"""
+    destination = prompt_destination(destination)
+    prompt = f"""
+    You are an elite luxury travel advisor with expertise in ultra-high-end destinations worldwide. 
+
+    Create comprehensive luxury travel recommendations for {destination} from {start_date} to {end_date}.
+
+    Please provide detailed information in these categories:
+
+    🏨 **LUXURY ACCOMMODATIONS** (3-5 options)
+    - Ultra-luxury hotels, resorts, and boutique properties
+    - Approximate nightly rates in USD
+    - Unique features and why they're special
+    - Booking recommendations
+
+    🍽️ **FINE DINING EXPERIENCES** (5-7 restaurants)
+    - Michelin-starred establishments
+    - Celebrity chef restaurants
+    - Unique culinary experiences
+    - Price ranges per person
+    - Reservation tips
+
+    ✨ **EXCLUSIVE EXPERIENCES** (5-8 activities)
+    - VIP tours and private access
+    - Luxury wellness and spa treatments
+    - Private cultural experiences
+    - Adventure activities (luxury level)
+    - Approximate costs
+
+    🛍️ **LUXURY SHOPPING**
+    - High-end boutiques and designer stores
+    - Local luxury markets
+    - Exclusive shopping districts
+    - Personal shopping services
+
+    🚗 **PREMIUM TRANSPORTATION**
+    - Luxury car services
+    - Private transfers
+    - Helicopter/private jet options
+    - Chauffeur services
+
+    🌤️ **WEATHER & PACKING**
+    - Expected weather conditions
+    - What to pack for luxury activities
+    - Seasonal considerations
+
+    💎 **INSIDER SECRETS**
+    - Hidden luxury gems only locals know
+    - Best times to visit popular attractions
+    - VIP access tips
+    - Cultural etiquette for luxury travelers
+
+    Format the response with clear headings, specific venue names, realistic prices, and actionable advice.
+    Make it comprehensive yet easy to read.
+    """
+    
+    return [
+        {"role": "system", "content": LUXURY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
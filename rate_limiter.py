@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from metrics import get_metrics
+from resilience import LatencyHistogram, error_status, retry_after_seconds
+
+# Client-side rate limits per backend (override with environment variables; 0 = unlimited)
+RATE_RPM = float(os.getenv("TRAVEL_RATE_RPM", "0"))
+RATE_TPM = float(os.getenv("TRAVEL_RATE_TPM", "0"))
+RATE_MAX_WAIT = float(os.getenv("TRAVEL_RATE_MAX_WAIT", "60"))
+# Pause applied after a 429 that carries no Retry-After header
+RATE_429_PAUSE = float(os.getenv("TRAVEL_RATE_429_PAUSE", "1"))
+
+# Relative share of capacity per purpose when tenants compete
+PURPOSE_WEIGHTS = {'interactive': 4.0, 'batch': 1.0}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request waited longer than the limiter allows"""
+
+
+def estimate_tokens(messages, max_tokens):
+    """Pre-charge for a request: roughly 4 characters per prompt token plus the completion budget"""
+    prompt_chars = sum(len(message.get('content') or "") for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+def usage_tokens(usage):
+    """Total tokens from a usage dict or SDK usage object, or None"""
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get('total_tokens')
+    return getattr(usage, 'total_tokens', None)
+
+
+class TokenBucket:
+    """Continuously refilling budget; reconciliation may push it into debt"""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount, now):
+        """Seconds until amount can be taken"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount, now):
+        """Give back (positive) or charge (negative) tokens after the fact"""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Ticket:
+    """One admitted request; reconcile its token pre-charge once usage is known"""
+
+    def __init__(self, limiter, tokens):
+        self.limiter = limiter
+        self.tokens = tokens
+        # The backend the router sent the request to
+        self.backend = None
+        self._settled = False
+
+    def reconcile(self, usage):
+        """Replace the pre-charge with the actual token usage"""
+        actual = usage_tokens(usage)
+        if actual is None or self._settled:
+            return
+        self._settled = True
+        self.limiter.adjust_tokens(self.tokens - actual)
+
+    def refund(self):
+        """Return the token pre-charge for a request that produced nothing"""
+        if self._settled:
+            return
+        self._settled = True
+        self.limiter.adjust_tokens(self.tokens)
+
+
+class RateLimiter:
+    """Requests/min and tokens/min budgets with start-time fair queuing across tenants
+
+    Waiting requests are served in order of their fair-queuing start tag, so a
+    tenant that submits many or large requests only delays its own later
+    requests. Interactive tenants are weighted above batch tenants.
+    """
+
+    def __init__(self, name="default", rpm=RATE_RPM, tpm=RATE_TPM, max_wait=RATE_MAX_WAIT):
+        self.name = name
+        self.max_wait = max_wait
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.metrics = get_metrics()
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags = {}
+        self._paused_until = 0.0
+        self._waits = LatencyHistogram(window=1000)
+        self._stats = {'admitted': 0, 'queued': 0, 'timeouts': 0, 'pauses': 0}
+
+    def acquire(self, tenant, tokens, purpose="interactive"):
+        """Block until the request fits the budgets and is next in fair order; returns a Ticket"""
+        now = time.monotonic()
+        with self._cond:
+            if not self._queue and self._delay(tokens, now) <= 0:
+                # Nobody waiting and budget available: no fairness decision to make
+                self._admit(tokens, now)
+                self._waits.record(0.0)
+                return Ticket(self, tokens)
+
+            weight = PURPOSE_WEIGHTS.get(purpose, 1.0)
+            start = max(self._virtual_time, self._finish_tags.get(tenant, 0.0))
+            self._finish_tags[tenant] = start + tokens / weight
+            entry = (start, next(self._sequence))
+            heapq.heappush(self._queue, entry)
+            self._stats['queued'] += 1
+
+            deadline = now + self.max_wait
+            while True:
+                now = time.monotonic()
+                delay = None
+                if self._queue[0] is entry:
+                    delay = self._delay(tokens, now)
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        self._virtual_time = start
+                        self._admit(tokens, now)
+                        self._prune_tags()
+                        self._cond.notify_all()
+                        break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._stats['timeouts'] += 1
+                    self._cond.notify_all()
+                    self.metrics.increment("travel_rate_limit_timeouts_total", limiter=self.name, purpose=purpose)
+                    raise RateLimitExceeded(f"Waited over {self.max_wait:g}s for {self.name} capacity")
+                self._cond.wait(min(delay, remaining) if delay is not None else remaining)
+
+        waited = time.monotonic() - (deadline - self.max_wait)
+        self._waits.record(waited)
+        self.metrics.observe("travel_rate_limit_wait_seconds", waited, limiter=self.name, purpose=purpose)
+        return Ticket(self, tokens)
+
+    def adjust_tokens(self, amount):
+        """Credit (or debit) the token bucket after reconciliation"""
+        if self.tokens is None or not amount:
+            return
+        with self._cond:
+            self.tokens.adjust(amount, time.monotonic())
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Stop admitting requests for a while, e.g. after the server returned 429"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats['pauses'] += 1
+
+    def observe_error(self, error):
+        """Pause admissions when an upstream error is a 429"""
+        if error_status(error) != 429:
+            return
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        retry_after = retry_after_seconds(headers)
+        self.pause(retry_after if retry_after is not None else RATE_429_PAUSE)
+
+    def stats(self):
+        """Queue depth, wait-time percentiles and admission counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['queue_depth'] = len(self._queue)
+            stats['paused'] = int(time.monotonic() < self._paused_until)
+        waits = self._waits.snapshot()
+        stats.update({f"wait_{name}": value for name, value in waits.items() if name != 'count'})
+        return stats
+
+    def _delay(self, tokens, now):
+        delay = max(0.0, self._paused_until - now)
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(tokens, now))
+        return delay
+
+    def _admit(self, tokens, now):
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(tokens, now)
+        self._stats['admitted'] += 1
+
+    def _prune_tags(self):
+        # Tenants whose last finish tag is behind virtual time would start fresh anyway
+        if len(self._finish_tags) > 1000:
+            self._finish_tags = {tenant: tag for tenant, tag in self._finish_tags.items()
+                                 if tag > self._virtual_time}
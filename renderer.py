@@ -0,0 +1,171 @@
+from sections import SECTIONS_BY_KEY
+
+RULE = "=" * 80
+SUBRULE = "-" * 40
+FOOTER = "Generated by AI-Powered Luxury Travel Assistant"
+
+# Items rendered per chunk, so one chunk never holds up a UI event loop for long
+ITEMS_PER_CHUNK = 25
+
+
+class _Fields(dict):
+    """Item fields plus its position, with per-template defaults for missing keys"""
+
+    __slots__ = ('defaults',)
+
+    def __init__(self, item, defaults, i):
+        super().__init__(item)
+        self['i'] = i
+        self.defaults = defaults
+
+    def __missing__(self, key):
+        return self.defaults.get(key, "")
+
+
+class SectionTemplate:
+    """A section's heading and item templates, compiled once at import"""
+
+    def __init__(self, key, heading, item=None, defaults=None, plain_item="{i}. {item}\n\n", trailer=""):
+        self.key = key
+        self.heading = heading
+        self.trailer = trailer
+        self.defaults = defaults or {}
+        self._item = item.format_map if item else None
+        self._plain_item = plain_item.format
+
+    def chunks(self, value, chunk_size=ITEMS_PER_CHUNK):
+        """Yield the rendered section in pieces of at most chunk_size items"""
+        if isinstance(value, str) or self._item is None and not isinstance(value, list):
+            yield f"{self.heading}{value}\n\n"
+            return
+
+        buffer = [self.heading]
+        for i, item in enumerate(value, 1):
+            if isinstance(item, dict) and self._item is not None:
+                buffer.append(self._item(_Fields(item, self.defaults, i)))
+            else:
+                buffer.append(self._plain_item(i=i, item=item))
+            if i % chunk_size == 0:
+                yield "".join(buffer)
+                buffer = []
+        buffer.append(self.trailer)
+        yield "".join(buffer)
+
+
+def _list_heading(title):
+    return f"{title}\n{SUBRULE}\n"
+
+
+# Plain-text layout used by the Tk app, in display order
+TEXT_TEMPLATES = [
+    SectionTemplate('weather', "🌤️ WEATHER & PACKING\n", plain_item="{i}. {item}\n", trailer="\n"),
+    SectionTemplate(
+        'luxury_hotels', _list_heading("🏨 LUXURY ACCOMMODATIONS"),
+        "{i}. {name}\n   💰 Price: {price_range}\n   📝 {description}\n\n",
+        {'name': "N/A", 'price_range': "Contact for rates"}
+    ),
+    SectionTemplate(
+        'fine_dining', _list_heading("🍽️ FINE DINING EXPERIENCES"),
+        "{i}. {name}\n   🍳 Cuisine: {cuisine_type}\n   💰 Price: {price_range}\n   📝 {description}\n\n",
+        {'name': "N/A", 'cuisine_type': "N/A", 'price_range': "Contact for rates"}
+    ),
+    SectionTemplate(
+        'exclusive_experiences', _list_heading("✨ EXCLUSIVE EXPERIENCES"),
+        "{i}. {name}\n   💰 Price: {price_range}\n   📝 {description}\n\n",
+        {'name': "N/A", 'price_range': "Contact for rates"}
+    ),
+    SectionTemplate(
+        'luxury_shopping', _list_heading("🛍️ LUXURY SHOPPING"),
+        "{i}. {name}\n   🏪 Type: {type}\n   📝 {description}\n\n",
+        {'name': "N/A", 'type': "N/A"}
+    ),
+    SectionTemplate(
+        'transportation', _list_heading("🚗 LUXURY TRANSPORTATION"),
+        "{i}. {type}\n   📝 {description}\n\n",
+        {'type': "N/A"}
+    ),
+    SectionTemplate('insider_tips', _list_heading("💡 INSIDER TIPS"),
+                    plain_item="{i}. {item}\n", trailer="\n"),
+]
+
+
+def text_header(destination, start_date, end_date):
+    """Title block shown above every plain-text response"""
+    return (f"🏖️ LUXURY TRAVEL RECOMMENDATIONS\n"
+            f"📍 Destination: {destination}\n"
+            f"📅 Travel Dates: {start_date} to {end_date}\n"
+            f"{RULE}\n\n")
+
+
+def text_footer():
+    return f"{RULE}\n{FOOTER}"
+
+
+def iter_text_chunks(recommendations, destination, start_date, end_date, chunk_size=ITEMS_PER_CHUNK):
+    """Yield the plain-text rendering of a recommendations dict piece by piece"""
+    yield text_header(destination, start_date, end_date)
+
+    # If there's a raw AI response, show it first
+    if recommendations.get('raw_ai_response'):
+        yield f"🤖 AI RECOMMENDATIONS\n{recommendations['raw_ai_response']}\n\n{RULE}\n\n"
+
+    for template in TEXT_TEMPLATES:
+        value = recommendations.get(template.key)
+        if value:
+            yield from template.chunks(value, chunk_size)
+
+    yield text_footer()
+
+
+def render_text(recommendations, destination, start_date, end_date):
+    """Plain-text rendering of a recommendations dict as one string"""
+    return "".join(iter_text_chunks(recommendations, destination, start_date, end_date))
+
+
+class _MarkdownSection:
+    """Markdown rendering for one generated section, with field labels precomputed"""
+
+    def __init__(self, section):
+        self.heading = f"### {section['title']}\n\n"
+        fields = section['fields'] or []
+        self.title_field = 'name' if 'name' in fields else (fields[0] if fields else None)
+        self.details = [(field, f"- {field.replace('_', ' ').capitalize()}: ")
+                        for field in fields if field not in ('name', 'description', self.title_field)]
+
+    def item(self, i, item):
+        if not isinstance(item, dict):
+            return f"{i}. {item}\n"
+        name = item.get('name') or item.get('type') or "N/A"
+        lines = [f"**{i}. {name}**\n"]
+        lines.extend(f"{label}{item[field]}\n" for field, label in self.details
+                     if item.get(field) and not (field == 'type' and item[field] == name))
+        if item.get('description'):
+            lines.append(f"- {item['description']}\n")
+        lines.append("\n")
+        return "".join(lines)
+
+    def chunks(self, value, chunk_size=ITEMS_PER_CHUNK):
+        if isinstance(value, str):
+            yield self.heading + value
+            return
+        buffer = [self.heading]
+        for i, item in enumerate(value, 1):
+            buffer.append(self.item(i, item))
+            if i % chunk_size == 0:
+                yield "".join(buffer)
+                buffer = []
+        if buffer:
+            yield "".join(buffer)
+
+
+MARKDOWN_SECTIONS = {key: _MarkdownSection(section) for key, section in SECTIONS_BY_KEY.items()}
+
+
+def iter_section_markdown(key, value, chunk_size=ITEMS_PER_CHUNK):
+    """Yield one generated section as Markdown, split at item boundaries"""
+    yield from MARKDOWN_SECTIONS[key].chunks(value, chunk_size)
+
+
+def render_section_markdown(key, value):
+    """One generated section as a single Markdown string"""
+    return "".join(iter_section_markdown(key, value))
@@ -0,0 +1,263 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Timeout and retry configuration (override with environment variables)
+CONNECT_TIMEOUT = float(os.getenv("TRAVEL_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("TRAVEL_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("TRAVEL_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY = float(os.getenv("TRAVEL_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("TRAVEL_RETRY_MAX_DELAY", "20"))
+
+# Hedging is off unless a latency percentile is configured, e.g. TRAVEL_HEDGE_PERCENTILE=95
+HEDGE_PERCENTILE = float(os.environ["TRAVEL_HEDGE_PERCENTILE"]) if os.getenv("TRAVEL_HEDGE_PERCENTILE") else None
+HEDGE_MIN_SAMPLES = int(os.getenv("TRAVEL_HEDGE_MIN_SAMPLES", "20"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def error_status(error):
+    """Return the HTTP status code attached to a requests or OpenAI SDK error"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def retry_after_seconds(headers):
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # HTTP-date form is rare; keep email.utils off the startup path
+    import email.utils
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def retry_delay(attempt, retry_after=None, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Seconds to wait before retry number attempt (0-based)"""
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _connection_errors():
+    """Exception types that mean the request never got a usable response"""
+    # A client that was never imported cannot have raised, so don't import it here
+    errors = []
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        errors += [requests.exceptions.ConnectionError, requests.exceptions.Timeout]
+    openai = sys.modules.get("openai")
+    if openai is not None:
+        errors.append(openai.APIConnectionError)
+    return tuple(errors)
+
+
+def is_retryable(error):
+    """Whether an error is worth retrying (429, 5xx or a connection failure)"""
+    if error_status(error) in RETRY_STATUS_CODES:
+        return True
+    return isinstance(error, _connection_errors())
+
+
+class LatencyHistogram:
+    """Rolling window of recent latencies for percentile estimates"""
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Add one latency sample"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self):
+        """Number of samples in the window"""
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, p):
+        """Return the p-th percentile (0-100) of the window, or None if empty"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(p / 100.0 * (len(samples) - 1)))))
+        return samples[index]
+
+    def snapshot(self):
+        """Return the sample count and common percentiles"""
+        return {
+            'count': self.count(),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class ResilientCaller:
+    """Retries with backoff and optional hedged requests around upstream calls"""
+
+    def __init__(self, max_retries=MAX_RETRIES, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 hedge_percentile=HEDGE_PERCENTILE, hedge_min_samples=HEDGE_MIN_SAMPLES):
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        self._stats = {'calls': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'hedge_discards': 0,
+                       'hedge_losers_running': 0, 'failures': 0}
+
+    @property
+    def timeout(self):
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def histogram(self, operation):
+        """Return the latency histogram for an operation"""
+        with self._lock:
+            if operation not in self._histograms:
+                self._histograms[operation] = LatencyHistogram()
+            return self._histograms[operation]
+
+    def hedge_delay(self, operation):
+        """Seconds to wait before firing a hedged duplicate, or None to not hedge"""
+        if self.hedge_percentile is None:
+            return None
+        histogram = self.histogram(operation)
+        if histogram.count() < self.hedge_min_samples:
+            return None
+        return histogram.percentile(self.hedge_percentile)
+
+    def call(self, fn, operation="default", hedge=True, usage=None):
+        """Call fn, retrying 429/5xx/connection errors and hedging slow attempts
+
+        fn returns (response, ticket). usage(response) reads the token usage
+        of a completed response; a discarded hedge's ticket is reconciled
+        with it, and keeps its pre-charge when usage is not given.
+        """
+        self._count('calls')
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._attempt(fn, operation, hedge, usage)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._count('failures')
+                    raise
+                headers = getattr(getattr(e, 'response', None), 'headers', None)
+                self._count('retries')
+                time.sleep(retry_delay(attempt, retry_after_seconds(headers)))
+
+    def stats(self):
+        """Return retry/hedge counters and per-operation latency percentiles"""
+        with self._lock:
+            stats = dict(self._stats)
+            operations = list(self._histograms.items())
+        stats['latency'] = {operation: histogram.snapshot() for operation, histogram in operations}
+        return stats
+
+    def _attempt(self, fn, operation, hedge, usage=None):
+        """Run one attempt, firing a hedged duplicate if it exceeds the hedge delay"""
+        histogram = self.histogram(operation)
+        delay = self.hedge_delay(operation) if hedge else None
+
+        if delay is None:
+            result, elapsed = self._timed(fn)
+            histogram.record(elapsed)
+            return result
+
+        primary = self._executor.submit(self._timed, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            result, elapsed = primary.result()
+            histogram.record(elapsed)
+            return result
+
+        self._count('hedges')
+        backup = self._executor.submit(self._timed, fn)
+        pending = {primary, backup}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                # The loser is cancelled if still queued. A running request cannot be aborted, so it
+                # finishes outside admission control and is released and billed once it completes
+                for other in pending:
+                    if not other.cancel():
+                        self._count('hedge_losers_running')
+                        other.add_done_callback(lambda loser: self._discard(loser, usage))
+                if future is backup:
+                    self._count('hedge_wins')
+                    elapsed += delay
+                histogram.record(elapsed)
+                return result
+        raise first_error
+
+    def _discard(self, future, usage=None):
+        """Release a finished hedge loser: charge its ticket the tokens it used and close its response"""
+        self._count('hedge_losers_running', -1)
+        if future.exception() is not None:
+            return
+        result, _ = future.result()
+        response, ticket = result if isinstance(result, tuple) else (result, None)
+        if ticket is not None and usage is not None:
+            # Upstream billed the loser's completion, so its tokens stay on the budget
+            try:
+                ticket.reconcile(usage(response))
+            except Exception as e:
+                print(f"Hedge usage unavailable, keeping the pre-charge: {e}")
+        # SDK raw responses wrap the httpx response
+        close = getattr(getattr(response, 'http_response', response), 'close', None)
+        if close is not None:
+            close()
+        self._count('hedge_discards')
+
+    def _timed(self, fn):
+        """Run fn and return (result, elapsed seconds)"""
+        started = time.monotonic()
+        result = fn()
+        return result, time.monotonic() - started
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._stats[name] += delta
+
+
+_resilience = None
+_resilience_lock = threading.Lock()
+
+
+def get_resilience():
+    """Return the process-wide resilient caller shared by both assistants"""
+    global _resilience
+    if _resilience is None:
+        with _resilience_lock:
+            if _resilience is None:
+                _resilience = ResilientCaller()
+    return _resilience
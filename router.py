@@ -0,0 +1,335 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from credentials import get_credential
+from metrics import get_metrics
+from rate_limiter import RATE_RPM, RATE_TPM, RateLimiter, RateLimitExceeded
+from resilience import LatencyHistogram, error_status, is_retryable
+from transport import get_transport
+
+# Backend routing configuration (override with environment variables)
+# TRAVEL_BACKENDS is a JSON list of backends, or the path of a file containing one
+BACKENDS_CONFIG = os.getenv("TRAVEL_BACKENDS", "")
+ROUTER_SLO = float(os.getenv("TRAVEL_ROUTER_SLO", "15"))
+ROUTER_EXPLORE = float(os.getenv("TRAVEL_ROUTER_EXPLORE", "0.05"))
+ROUTER_EJECT_AFTER = int(os.getenv("TRAVEL_ROUTER_EJECT_AFTER", "3"))
+ROUTER_EJECT_SECONDS = float(os.getenv("TRAVEL_ROUTER_EJECT_SECONDS", "30"))
+ROUTER_HEALTH_INTERVAL = float(os.getenv("TRAVEL_ROUTER_HEALTH_INTERVAL", "15"))
+
+DEFAULT_BACKENDS = [
+    {'name': "openai", 'base_url': "https://api.openai.com/v1", 'model': "gpt-3.5-turbo"},
+]
+
+PURPOSES = ("interactive", "batch")
+
+# Errors that are the backend's fault rather than the request's, so another backend may succeed
+FAILOVER_STATUS_CODES = {401, 403, 404}
+
+# Weight of the recent error rate when ranking interactive backends by latency
+ERROR_PENALTY = 4.0
+
+
+class Backend:
+    """One OpenAI-compatible endpoint and model, with rolling health statistics"""
+
+    def __init__(self, name, base_url, model, api_key=None, cost=1.0, purposes=PURPOSES, window=200,
+                 rpm=RATE_RPM, tpm=RATE_TPM):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.cost = cost
+        self.purposes = tuple(purposes)
+        self.window = window
+        # Budgets are per account, so every backend gets its own limiter and fair queue
+        self.limiter = RateLimiter(name, rpm=rpm, tpm=tpm)
+
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._outcomes = deque(maxlen=50)
+        self._consecutive_failures = 0
+        self._ejected_until = 0.0
+
+    @property
+    def chat_url(self):
+        """Chat completions endpoint for plain HTTP clients"""
+        return self.base_url + "/chat/completions"
+
+    def latency(self, operation):
+        """Rolling latency histogram for an operation"""
+        with self._lock:
+            if operation not in self._latency:
+                self._latency[operation] = LatencyHistogram(window=self.window)
+            return self._latency[operation]
+
+    def error_rate(self):
+        """Share of recent calls that failed"""
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return 1.0 - sum(self._outcomes) / len(self._outcomes)
+
+    def ejected(self, now=None):
+        """Whether the backend is sitting out after repeated failures"""
+        return (now or time.monotonic()) < self._ejected_until
+
+    def record(self, operation, seconds, ok):
+        """Record one call; repeated failures eject the backend for a cool-down period"""
+        if ok:
+            self.latency(operation).record(seconds)
+        with self._lock:
+            self._outcomes.append(1 if ok else 0)
+            if ok:
+                self._consecutive_failures = 0
+                return False
+            self._consecutive_failures += 1
+            # Once past the threshold, a failure after the cool-down (half-open) ejects again at once
+            if self._consecutive_failures >= ROUTER_EJECT_AFTER:
+                self._ejected_until = time.monotonic() + ROUTER_EJECT_SECONDS
+                return True
+        return False
+
+    def reinstate(self):
+        """Return an ejected backend to service with a clean slate"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._ejected_until = 0.0
+            self._outcomes.clear()
+            self._latency.clear()
+
+    def stats(self):
+        """Return health, error rate and per-operation latency percentiles"""
+        with self._lock:
+            operations = list(self._latency.items())
+        return {
+            'model': self.model,
+            'cost': self.cost,
+            'ejected': self.ejected(),
+            'error_rate': round(self.error_rate(), 3),
+            'rate_limit': self.limiter.stats(),
+            'latency': {operation: histogram.snapshot() for operation, histogram in operations},
+        }
+
+
+def load_backends(config=BACKENDS_CONFIG):
+    """Build backends from a JSON list (inline or in a file), falling back to OpenAI defaults
+
+    Each entry has name, base_url (ending in /v1), model and optionally cost
+    (relative price), purposes (interactive and/or batch), rpm and tpm (client
+    side rate limits), api_key_env (the credential to send) or api_key (a
+    literal, e.g. for a local server).
+    """
+    if not config:
+        entries = DEFAULT_BACKENDS
+    elif config.lstrip().startswith("["):
+        entries = json.loads(config)
+    else:
+        with open(config, encoding="utf-8") as f:
+            entries = json.load(f)
+
+    backends = []
+    for entry in entries:
+        api_key = entry.get('api_key')
+        if api_key is None and entry.get('api_key_env'):
+            api_key = get_credential(entry['api_key_env'])
+        backends.append(Backend(
+            name=entry.get('name') or entry['model'],
+            base_url=entry['base_url'],
+            model=entry['model'],
+            api_key=api_key,
+            cost=float(entry.get('cost', 1.0)),
+            purposes=entry.get('purposes', PURPOSES),
+            rpm=float(entry.get('rpm', RATE_RPM)),
+            tpm=float(entry.get('tpm', RATE_TPM)),
+        ))
+    if not backends:
+        raise ValueError("No backends configured")
+    return backends
+
+
+class Router:
+    """Picks a backend per call by rolling latency, error rate and cost, failing over on errors"""
+
+    def __init__(self, backends, slo=ROUTER_SLO, explore=ROUTER_EXPLORE):
+        self.backends = list(backends)
+        self.slo = slo
+        self.explore = explore
+        self.metrics = get_metrics()
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'failovers': 0, 'ejections': 0, 'exhausted': 0}
+        self._health_thread = None
+
+    def rank(self, purpose="interactive", operation="default"):
+        """Backends in the order they should be tried for one call"""
+        now = time.monotonic()
+        candidates = [backend for backend in self.backends if purpose in backend.purposes] or list(self.backends)
+
+        def interactive_key(backend):
+            # Backends without samples rank as fast so they get tried
+            p95 = backend.latency(operation).percentile(95) or 0.0
+            penalized = p95 * (1.0 + ERROR_PENALTY * backend.error_rate())
+            return (backend.ejected(now), penalized > self.slo, penalized, backend.cost)
+
+        def batch_key(backend):
+            # Throughput jobs only care about price, as long as the backend mostly works
+            p95 = backend.latency(operation).percentile(95) or 0.0
+            return (backend.ejected(now), backend.error_rate() > 0.5, backend.cost, p95)
+
+        ordered = sorted(candidates, key=batch_key if purpose == "batch" else interactive_key)
+
+        # Occasionally lead with a runner-up so a recovered backend earns fresh samples
+        healthy = [backend for backend in ordered[1:] if not backend.ejected(now)]
+        if healthy and purpose != "batch" and random.random() < self.explore:
+            chosen = random.choice(healthy)
+            ordered.remove(chosen)
+            ordered.insert(0, chosen)
+        return ordered
+
+    def choose(self, purpose="interactive", operation="default"):
+        """The backend the next call would go to"""
+        return self.rank(purpose, operation)[0]
+
+    def call(self, fn, purpose="interactive", operation="default", tenant=None, tokens=0):
+        """Call fn(backend) on the best backend, failing over to the next on backend errors
+
+        Each attempt first waits for the backend's rate limiter, pre-charging
+        tokens for tenant. Returns (result, ticket); reconcile the ticket with
+        the response's usage once it is known.
+        """
+        self._count('calls')
+        last_error = None
+        for backend in self.rank(purpose, operation):
+            if last_error is not None:
+                self._count('failovers')
+            try:
+                ticket = backend.limiter.acquire(tenant or purpose, tokens, purpose)
+            except RateLimitExceeded as e:
+                # Throttled locally, not failing; try a backend with spare capacity
+                last_error = e
+                continue
+            started = time.monotonic()
+            try:
+                result = fn(backend)
+            except Exception as e:
+                ticket.refund()
+                backend.limiter.observe_error(e)
+                if not (is_retryable(e) or error_status(e) in FAILOVER_STATUS_CODES):
+                    # The request itself is bad; another backend won't fix it
+                    raise
+                self._record(backend, operation, time.monotonic() - started, False)
+                last_error = e
+                continue
+            self._record(backend, operation, time.monotonic() - started, True)
+            ticket.backend = backend
+            return result, ticket
+        self._count('exhausted')
+        raise last_error
+
+    def check_health(self):
+        """Probe ejected backends and reinstate the ones that answer"""
+        import requests
+
+        session = get_transport().session
+        reinstated = []
+        for backend in self.backends:
+            if not backend.ejected():
+                continue
+            headers = {"Authorization": f"Bearer {backend.api_key}"} if backend.api_key else {}
+            try:
+                response = session.get(backend.base_url + "/models", headers=headers, timeout=5)
+            except requests.exceptions.RequestException:
+                continue
+            if response.status_code < 500 and response.status_code != 429:
+                backend.reinstate()
+                reinstated.append(backend.name)
+        return reinstated
+
+    def start_health_checks(self, interval=ROUTER_HEALTH_INTERVAL):
+        """Probe ejected backends every interval seconds on a daemon thread"""
+        if interval <= 0 or self._health_thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check_health()
+                except Exception as e:
+                    print(f"Backend health check error: {e}")
+
+        self._health_thread = threading.Thread(target=loop, name="travel-router-health", daemon=True)
+        self._health_thread.start()
+
+    def stats(self):
+        """Return routing counters and per-backend health"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['backends'] = {backend.name: backend.stats() for backend in self.backends}
+        return stats
+
+    def gauges(self):
+        """Flat per-backend gauges for the metrics collector"""
+        gauges = {}
+        for backend in self.backends:
+            name = re.sub(r"[^a-zA-Z0-9_]", "_", backend.name)
+            gauges[f"travel_backend_{name}_ejected"] = int(backend.ejected())
+            gauges[f"travel_backend_{name}_error_rate"] = backend.error_rate()
+            for stat, value in backend.limiter.stats().items():
+                if value is not None:
+                    gauges[f"travel_rate_limit_{name}_{stat}"] = value
+        with self._lock:
+            gauges.update({f"travel_router_{name}": value for name, value in self._stats.items()})
+        return gauges
+
+    def _record(self, backend, operation, seconds, ok):
+        self.metrics.observe("travel_backend_seconds", seconds, backend=backend.name, operation=operation)
+        self.metrics.increment("travel_backend_requests_total", backend=backend.name,
+                               outcome="ok" if ok else "error")
+        if backend.record(operation, seconds, ok):
+            self._count('ejections')
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+
+_router = None
+_router_lock = threading.Lock()
+# One pinned router per (endpoint, api key, model), so pinned callers share a budget like get_router()'s
+_pinned_routers = {}
+
+
+def single_backend_router(base_url, api_key=None, model=DEFAULT_BACKENDS[0]['model']):
+    """The process-wide router pinned to one endpoint, for callers that pass an explicit base URL"""
+    base_url = base_url.rstrip("/")
+    if base_url.endswith("/chat/completions"):
+        base_url = base_url[:-len("/chat/completions")]
+    key = (base_url, api_key, model)
+    router = _pinned_routers.get(key)
+    if router is None:
+        with _router_lock:
+            router = _pinned_routers.get(key)
+            if router is None:
+                name = f"pinned_{len(_pinned_routers) + 1}" if _pinned_routers else "pinned"
+                router = _pinned_routers[key] = Router([Backend(name, base_url, model, api_key=api_key)],
+                                                       explore=0.0)
+                get_metrics().add_collector(router.gauges)
+    return router
+
+
+def get_router():
+    """Return the process-wide router shared by both assistants"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = Router(load_backends())
+                if len(_router.backends) > 1:
+                    _router.start_health_checks()
+                get_metrics().add_collector(_router.gauges)
+    return _router
@@ -0,0 +1,225 @@
+import calendar
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metrics import get_metrics
+from prompts import LUXURY_SYSTEM_PROMPT
+from destinations import prompt_destination
+from response_cache import make_cache_key
+
+# Recommendation sections in canonical display order. Keys match the
+# dict structure rendered by renderer.iter_text_chunks. depends_on says which
+# inputs a section's content varies with, and so what its cache key includes:
+# 'destination' only, the 'season' (months travelled) or the exact 'dates'.
+SECTIONS = [
+    {
+        'key': 'luxury_hotels',
+        'title': "🏨 LUXURY ACCOMMODATIONS",
+        'instructions': "3-5 ultra-luxury hotels, resorts or boutique properties with approximate nightly rates in USD and what makes each special",
+        'fields': ['name', 'price_range', 'description'],
+        'max_tokens': 600,
+        'depends_on': 'destination',
+    },
+    {
+        'key': 'fine_dining',
+        'title': "🍽️ FINE DINING EXPERIENCES",
+        'instructions': "5-7 Michelin-starred or celebrity chef restaurants with cuisine, price range per person and reservation tips",
+        'fields': ['name', 'cuisine_type', 'price_range', 'description'],
+        'max_tokens': 700,
+        'depends_on': 'destination',
+    },
+    {
+        'key': 'exclusive_experiences',
+        'title': "✨ EXCLUSIVE EXPERIENCES",
+        'instructions': "5-8 VIP tours, private access, wellness or cultural experiences with approximate costs",
+        'fields': ['name', 'price_range', 'description'],
+        'max_tokens': 700,
+        'depends_on': 'season',
+    },
+    {
+        'key': 'luxury_shopping',
+        'title': "🛍️ LUXURY SHOPPING",
+        'instructions': "high-end boutiques, designer stores, luxury markets and personal shopping services",
+        'fields': ['name', 'type', 'description'],
+        'max_tokens': 400,
+        'depends_on': 'destination',
+    },
+    {
+        'key': 'transportation',
+        'title': "🚗 LUXURY TRANSPORTATION",
+        'instructions': "luxury car services, private transfers, helicopter or private jet options and chauffeurs",
+        'fields': ['type', 'description'],
+        'max_tokens': 350,
+        'depends_on': 'destination',
+    },
+    {
+        'key': 'weather',
+        'title': "🌤️ WEATHER & PACKING",
+        'instructions': "expected weather for the travel dates, what to pack for luxury activities and seasonal considerations",
+        'fields': None,
+        'max_tokens': 300,
+        'depends_on': 'dates',
+    },
+    {
+        'key': 'insider_tips',
+        'title': "💡 INSIDER TIPS",
+        'instructions': "hidden gems only locals know, best times to visit attractions, VIP access tips and cultural etiquette",
+        'fields': [],
+        'max_tokens': 400,
+        'depends_on': 'season',
+    },
+]
+
+SECTIONS_BY_KEY = {section['key']: section for section in SECTIONS}
+
+
+def season_key(start_date, end_date):
+    """Months a trip spans, e.g. "01-02"; seasonal content depends on these, not the exact days"""
+    start_year, start_month = int(str(start_date)[:4]), int(str(start_date)[5:7])
+    end_year, end_month = int(str(end_date)[:4]), int(str(end_date)[5:7])
+    count = max(1, min(12, (end_year - start_year) * 12 + end_month - start_month + 1))
+    return "-".join(f"{(start_month - 1 + i) % 12 + 1:02d}" for i in range(count))
+
+
+def section_cache_key(namespace, section, destination, start_date, end_date):
+    """Cache key built from only the inputs the section depends on"""
+    depends_on = section['depends_on']
+    if depends_on == 'destination':
+        start_date, end_date = "", ""
+    elif depends_on == 'season':
+        start_date, end_date = season_key(start_date, end_date), ""
+    return make_cache_key(f"{namespace}:{section['key']}:{depends_on}", destination, start_date, end_date)
+
+
+def _trip_phrase(section, destination, start_date, end_date):
+    """Describe the trip with no more detail than the section depends on, so cached answers stay valid"""
+    if section['depends_on'] == 'destination':
+        return f"a luxury trip to {destination}"
+    if section['depends_on'] == 'season':
+        months = [calendar.month_name[int(month)] for month in season_key(start_date, end_date).split("-")]
+        when = months[0] if len(months) == 1 else ", ".join(months[:-1]) + f" and {months[-1]}"
+        return f"a luxury trip to {destination} in {when}"
+    return f"a luxury trip to {destination} from {start_date} to {end_date}"
+
+
+def build_section_messages(section, destination, start_date, end_date):
+    """Build the chat messages for a single recommendation section"""
+    destination = prompt_destination(destination)
+    if section['fields'] is None:
+        shape = '{"text": "..."}'
+    elif section['fields']:
+        item = ", ".join(f'"{field}": "..."' for field in section['fields'])
+        shape = f'{{"items": [{{{item}}}]}}'
+    else:
+        shape = '{"items": ["..."]}'
+
+    prompt = f"""
+    For {_trip_phrase(section, destination, start_date, end_date)}, recommend {section['instructions']}.
+    Use specific venue names and realistic prices.
+    Respond with JSON only, in exactly this shape: {shape}
+    """
+
+    return [
+        {"role": "system", "content": LUXURY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_section(section, content):
+    """Parse a section response, falling back to the raw text"""
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        payload = None
+
+    if section['fields'] is None:
+        if isinstance(payload, dict) and isinstance(payload.get('text'), str):
+            return payload['text']
+        return content.strip()
+
+    if isinstance(payload, dict) and isinstance(payload.get('items'), list):
+        return payload['items']
+    return [content.strip()]
+
+
+def generate_sections(fetch, destination, start_date, end_date, sections=SECTIONS):
+    """Request every section concurrently and yield (key, value, error) as each lands
+
+    fetch(messages, max_tokens) must return the completion text for one section.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(sections))) as pool:
+        futures = {
+            pool.submit(fetch, build_section_messages(section, destination, start_date, end_date),
+                        section['max_tokens']): section
+            for section in sections
+        }
+        for future in as_completed(futures):
+            section = futures[future]
+            try:
+                yield section['key'], parse_section(section, future.result()), None
+            except Exception as e:
+                yield section['key'], None, str(e)
+
+
+def generate_cached_sections(fetch, cache, namespace, destination, start_date, end_date, bypass_cache=False,
+                             sections=SECTIONS, knowledge=None, prefer_knowledge=()):
+    """Yield (key, value, error) for every section, serving unchanged ones from cache
+
+    Only sections whose dependency key misses (e.g. weather after a date
+    change) are requested, concurrently; the rest are spliced in from cache.
+    knowledge is {key: value} from the offline knowledge base: sections named
+    in prefer_knowledge are served from it without a request, and any section
+    it has replaces a failed request.
+    """
+    metrics = get_metrics()
+    knowledge = knowledge or {}
+    missing = {}
+    for section in sections:
+        cache_key = section_cache_key(namespace, section, destination, start_date, end_date)
+        cached = None if bypass_cache else cache.get(cache_key)
+        if cached is None:
+            if section['key'] in prefer_knowledge and section['key'] in knowledge:
+                metrics.increment("travel_section_cache_total", section=section['key'], outcome="knowledge")
+                yield section['key'], knowledge[section['key']], None
+                continue
+            missing[section['key']] = (section, cache_key)
+            continue
+        metrics.increment("travel_section_cache_total", section=section['key'], outcome="hit")
+        yield section['key'], json.loads(cached), None
+
+    if not missing:
+        return
+    for key, (section, _) in missing.items():
+        metrics.increment("travel_section_cache_total", section=key, outcome="miss")
+    to_generate = [section for section, _ in missing.values()]
+    for key, value, error in generate_sections(fetch, destination, start_date, end_date, to_generate):
+        if error is None:
+            cache.set(missing[key][1], json.dumps(value))
+        elif key in knowledge:
+            # Curated content beats a missing section
+            metrics.increment("travel_section_cache_total", section=key, outcome="knowledge_fallback")
+            value, error = knowledge[key], None
+        yield key, value, error
+
+
+def cached_section_values(cache, namespace, destination, start_date, end_date, sections=SECTIONS):
+    """Sections that could be served from cache for this trip, as {key: value}"""
+    values = {}
+    for section in sections:
+        cached = cache.get(section_cache_key(namespace, section, destination, start_date, end_date))
+        if cached is not None:
+            values[section['key']] = json.loads(cached)
+    return values
+
+
+def cached_section_keys(cache, namespace, destination, start_date, end_date, sections=SECTIONS):
+    """Keys of the sections that could be served from cache for this trip"""
+    return list(cached_section_values(cache, namespace, destination, start_date, end_date, sections))
+
+
+def assemble_sections(results):
+    """Return section results in canonical order, keeping any error message last"""
+    ordered = {section['key']: results[section['key']] for section in SECTIONS if section['key'] in results}
+    if results.get('error'):
+        ordered['error'] = results['error']
+    return ordered
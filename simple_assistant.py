@@ -0,0 +1,183 @@
+import time
+
+import requests
+
+from assistant_base import AssistantBase
+from streaming import iter_completion_deltas
+from transport import get_transport
+from rate_limiter import RateLimitExceeded, estimate_tokens
+from prompts import build_luxury_messages
+from renderer import render_section_markdown
+from sections import assemble_sections
+from knowledge_base import KNOWLEDGE_MODE
+from trace_recorder import NULL_TRACE
+
+class SimpleTravelAssistant(AssistantBase):
+    cache_namespace = "simple_travel_assistant"
+    assistant_label = "simple"
+    
+    def __init__(self, api_key=None, base_url=None, purpose="interactive", tenant=None,
+                 knowledge_mode=KNOWLEDGE_MODE):
+        super().__init__(api_key, base_url, purpose, tenant, knowledge_mode)
+        self.transport = get_transport()
+    
+    def _render_sections(self, values, destination, start_date, end_date):
+        """Render a sections dict assembled from cache or the knowledge base"""
+        return "\n\n".join(render_section_markdown(key, value) for key, value in assemble_sections(values).items())
+    
+    def _fetch_recommendations(self, destination, start_date, end_date, cache_key, trace=NULL_TRACE):
+        """Call the API, caching successful responses"""
+        trace.upstream()
+        with self.metrics.span("prompt", assistant="simple"):
+            data = self._build_request(destination, start_date, end_date)
+        
+        try:
+            # Retries 429/5xx with backoff and hedges slow attempts; each attempt is routed
+            with self.metrics.span("upstream", assistant="simple", mode="full"):
+                response, ticket = self.resilience.call(lambda: self._route(data, "full"), operation="full",
+                                                        usage=self._usage)
+            with self.metrics.span("parse", assistant="simple"):
+                result = response.json()
+                content = result['choices'][0]['message']['content']
+            self.metrics.record_usage(result.get('usage'), assistant="simple")
+            ticket.reconcile(result.get('usage'))
+            trace.served(ticket, result.get('usage'))
+            
+        except RateLimitExceeded:
+            return "❌ The assistant is busy right now. Please try again in a minute."
+        except requests.exceptions.Timeout:
+            return "❌ Request timed out. Please try again."
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 429:
+                return "❌ OpenAI is rate limiting requests. Please try again in a minute."
+            return f"❌ Error connecting to OpenAI API: {str(e)}"
+        except requests.exceptions.RequestException as e:
+            return f"❌ Error connecting to OpenAI API: {str(e)}"
+        except KeyError:
+            return "❌ Unexpected response format from OpenAI API."
+        except Exception as e:
+            return f"❌ Error generating recommendations: {str(e)}"
+        
+        self.cache.set(cache_key, content)
+        return content
+    
+    def _stream_fetch(self, destination, start_date, end_date, cache_key, trace=NULL_TRACE):
+        """Stream from the API, caching the response once it completes"""
+        trace.upstream()
+        with self.metrics.span("prompt", assistant="simple"):
+            data = self._build_request(destination, start_date, end_date)
+        data["stream"] = True
+        data["stream_options"] = {"include_usage": True}
+        
+        def record_usage(usage):
+            self.metrics.record_usage(usage, assistant="simple")
+            # Usage arrives in the last chunk, after the ticket below was issued
+            ticket.reconcile(usage)
+            trace.served(ticket, usage)
+        
+        parts = []
+        started = time.perf_counter()
+        try:
+            # Only opening the stream is retried; nothing has been yielded yet
+            response, ticket = self.resilience.call(lambda: self._route(data, "stream", stream=True),
+                                                    operation="stream", hedge=False)
+            trace.served(ticket)
+            with response:
+                self.metrics.observe("travel_stage_seconds", time.perf_counter() - started,
+                                     stage="upstream_headers", assistant="simple")
+                for delta in iter_completion_deltas(response.iter_content(chunk_size=None), record_usage):
+                    if not parts:
+                        self.metrics.observe("travel_stage_seconds", time.perf_counter() - started,
+                                             stage="first_token", assistant="simple")
+                    parts.append(delta)
+                    yield delta
+            self.metrics.observe("travel_stage_seconds", time.perf_counter() - started,
+                                 stage="upstream", assistant="simple", mode="stream")
+            
+        except RateLimitExceeded:
+            yield "\n\n❌ The assistant is busy right now. Please try again in a minute."
+            return
+        except requests.exceptions.Timeout:
+            yield "\n\n❌ Request timed out. Please try again."
+            return
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 429:
+                yield "\n\n❌ OpenAI is rate limiting requests. Please try again in a minute."
+            else:
+                yield f"\n\n❌ Error connecting to OpenAI API: {str(e)}"
+            return
+        except requests.exceptions.RequestException as e:
+            yield f"\n\n❌ Error connecting to OpenAI API: {str(e)}"
+            return
+        except (KeyError, ValueError):
+            yield "\n\n❌ Unexpected response format from OpenAI API."
+            return
+        except Exception as e:
+            yield f"\n\n❌ Error generating recommendations: {str(e)}"
+            return
+        
+        # Only complete streams are cached
+        self.cache.set(cache_key, "".join(parts))
+    
+    def _fetch_section(self, messages, max_tokens, trace=NULL_TRACE):
+        """Request a single section as JSON and return the completion text"""
+        trace.upstream()
+        data = {
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            "response_format": {"type": "json_object"}
+        }
+        
+        # A shed section fails like any other and falls back to the knowledge base
+        with self.admission.slot(self.purpose):
+            with self.metrics.span("upstream", assistant="simple", mode="section"):
+                response, ticket = self.resilience.call(lambda: self._route(data, "section"), operation="section",
+                                                        usage=self._usage)
+        with self.metrics.span("parse", assistant="simple"):
+            result = response.json()
+            content = result['choices'][0]['message']['content']
+        self.metrics.record_usage(result.get('usage'), assistant="simple")
+        ticket.reconcile(result.get('usage'))
+        trace.served(ticket, result.get('usage'))
+        return content
+    
+    def _usage(self, response):
+        """Token usage of a completed, non-streamed response (read when a hedged duplicate is discarded)"""
+        return response.json().get('usage')
+    
+    def _route(self, data, operation, stream=False):
+        """POST data to the backend the router picks once its rate limiter admits it; returns (response, ticket)"""
+        def request(backend):
+            response = self.transport.post(backend.chat_url, headers=self._build_headers(backend),
+                                           json={**data, "model": backend.model},
+                                           timeout=self.resilience.timeout, stream=stream)
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError:
+                response.close()
+                raise
+            return response
+        
+        return self.router.call(request, purpose=self.purpose, operation=operation, tenant=self.tenant,
+                                tokens=estimate_tokens(data['messages'], data['max_tokens']))
+    
+    def _build_headers(self, backend=None):
+        """Build the authorization headers for the API"""
+        api_key = (backend.api_key if backend else None) or self.api_key
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    def _build_request(self, destination, start_date, end_date):
+        """Build the JSON payload for a recommendation request; the router fills in the model"""
+        return {
+            "messages": self._build_messages(destination, start_date, end_date),
+            "max_tokens": 3000,
+            "temperature": 0.7
+        }
+    
+    def _build_messages(self, destination, start_date, end_date):
+        """Build the chat messages for a recommendation request"""
+        return build_luxury_messages(destination, start_date, end_date)
@@ -0,0 +1,159 @@
+import threading
+
+from metrics import get_metrics
+
+
+class _Call:
+    """A single in-flight call whose result is shared by every waiter"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _SharedStream:
+    """Buffers a chunk iterator so several consumers can replay it concurrently"""
+
+    def __init__(self, source):
+        self.source = source
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self.pumping = False
+        # Consumers still reading; guarded by the owning SingleFlight's lock
+        self.subscribers = 0
+        self.condition = threading.Condition()
+
+    def subscribe(self):
+        """Yield every chunk from the start, pulling from the source when needed"""
+        index = 0
+        while True:
+            with self.condition:
+                while index >= len(self.chunks) and not self.finished and self.pumping:
+                    self.condition.wait()
+                if index < len(self.chunks):
+                    chunk = self.chunks[index]
+                    index += 1
+                elif self.finished:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    # Nobody is reading the source right now, so this consumer does
+                    self.pumping = True
+                    chunk = None
+
+            if chunk is not None:
+                yield chunk
+                continue
+
+            try:
+                item = next(self.source)
+            except StopIteration:
+                item, finished, error = None, True, None
+            except Exception as e:
+                item, finished, error = None, True, e
+            else:
+                finished, error = False, None
+
+            with self.condition:
+                if finished:
+                    self.finished = True
+                    self.error = error
+                else:
+                    self.chunks.append(item)
+                self.pumping = False
+                self.condition.notify_all()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one upstream call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self._stats = {'calls': 0, 'coalesced': 0, 'abandoned': 0}
+
+    def do(self, key, fn):
+        """Run fn once for concurrent callers of key and share its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key, fn):
+        """Yield chunks from fn() once for concurrent callers of key"""
+        with self._lock:
+            shared = self._streams.get(key)
+            if shared is None:
+                shared = self._streams[key] = _SharedStream(iter(fn()))
+                self._stats['calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+            shared.subscribers += 1
+
+        try:
+            for chunk in shared.subscribe():
+                yield chunk
+        finally:
+            with self._lock:
+                shared.subscribers -= 1
+                abandoned = not shared.subscribers and not shared.finished
+                if (shared.finished or abandoned) and self._streams.get(key) is shared:
+                    del self._streams[key]
+                if abandoned:
+                    self._stats['abandoned'] += 1
+            if abandoned:
+                # Every consumer left early: close the source so its response (and any slot it holds) is released
+                close = getattr(shared.source, "close", None)
+                if close is not None:
+                    close()
+
+    def stats(self):
+        """Return upstream call, coalesced request and abandoned stream counts"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls) + len(self._streams)
+        return stats
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the process-wide single-flight group shared by all sessions"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+                get_metrics().add_collector(
+                    lambda: {f"travel_single_flight_{name}": value for name, value in _single_flight.stats().items()}
+                )
+    return _single_flight
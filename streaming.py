@@ -0,0 +1,82 @@
+import codecs
+import json
+
+
+class SSEParser:
+    """Incremental parser for text/event-stream payloads"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._event = None
+        self._data = []
+
+    def feed(self, chunk):
+        """Feed raw bytes (or text) and return the events completed so far"""
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        self._buffer += chunk
+
+        events = []
+        while True:
+            newline = self._buffer.find("\n")
+            if newline == -1:
+                break
+            line = self._buffer[:newline].rstrip("\r")
+            self._buffer = self._buffer[newline + 1:]
+
+            if not line:
+                # Blank line dispatches the pending event
+                if self._data:
+                    events.append({'event': self._event or "message", 'data': "\n".join(self._data)})
+                self._event = None
+                self._data = []
+            elif line.startswith(":"):
+                continue
+            else:
+                field, _, value = line.partition(":")
+                if value.startswith(" "):
+                    value = value[1:]
+                if field == "data":
+                    self._data.append(value)
+                elif field == "event":
+                    self._event = value
+        return events
+
+    def close(self):
+        """Flush a trailing event that was not terminated by a blank line"""
+        tail = self._decoder.decode(b"", final=True)
+        events = self.feed(tail + "\n") if self._buffer or tail else []
+        if self._data:
+            events.append({'event': self._event or "message", 'data': "\n".join(self._data)})
+            self._data = []
+        return events
+
+
+def iter_sse_events(byte_chunks):
+    """Yield SSE events from an iterable of raw byte chunks"""
+    parser = SSEParser()
+    for chunk in byte_chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.close():
+        yield event
+
+
+def iter_completion_deltas(byte_chunks, on_usage=None):
+    """Yield content deltas from a streamed chat completions response
+
+    on_usage, if given, is called with the usage dict when the stream reports one.
+    """
+    for event in iter_sse_events(byte_chunks):
+        if event['data'] == "[DONE]":
+            return
+        payload = json.loads(event['data'])
+        if 'error' in payload:
+            raise ValueError(payload['error'].get('message', "Streaming error"))
+        if on_usage is not None and payload.get('usage'):
+            on_usage(payload['usage'])
+        for choice in payload.get('choices', []):
+            content = choice.get('delta', {}).get('content')
+            if content:
+                yield content
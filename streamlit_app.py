@@ -1,118 +1,208 @@
+import copy
 import streamlit as st
-import requests
-import json
+import time
 from datetime import datetime, timedelta
+from simple_assistant import SimpleTravelAssistant
+from api_client import API_URL, RemoteTravelAssistant
+from metrics import get_metrics
+from sections import SECTIONS, assemble_sections
+from renderer import iter_section_markdown
+from trip_history import get_trip_history, is_error_response
+from deadline import DEADLINE_SECONDS
+from itinerary import (PENDING_TEXT, itinerary_title, leg_markdown_heading, normalize_legs,
+                       render_itinerary_markdown, validate_legs)
 
-class SimpleTravelAssistant:
-    def __init__(self):
-        self.api_key = None
-        self.base_url = "https://api.openai.com/v1/chat/completions"
-        
-        # Get API key from Streamlit secrets
-        try:
-            if 'OPENAI_API_KEY' in st.secrets:
-                self.api_key = st.secrets["OPENAI_API_KEY"]
-            else:
-                st.error("❌ API key not found in secrets")
-        except Exception as e:
-            st.error(f"❌ Error accessing secrets: {e}")
+SINGLE_TRIP = "🏖️ Single destination"
+MULTI_CITY = "🗺️ Multi-city"
+
+def render_stream(placeholder, chunks, interval=0.1):
+    """Render streamed text into a placeholder, batching updates"""
+    metrics = get_metrics()
+    parts = []
+    last_render = 0.0
+    render_time = 0.0
+    for chunk in chunks:
+        parts.append(chunk)
+        now = time.monotonic()
+        if now - last_render >= interval:
+            placeholder.markdown("".join(parts) + "▌")
+            last_render = time.monotonic()
+            render_time += last_render - now
+    started = time.monotonic()
+    text = "".join(parts)
+    placeholder.markdown(text)
+    render_time += time.monotonic() - started
+    metrics.observe("travel_stage_seconds", render_time, stage="render", surface="streamlit")
+    return text
+
+def render_sections(sections):
+    """Render (key, value) section pairs into placeholders laid out in canonical order"""
+    metrics = get_metrics()
+    placeholders = {section['key']: st.empty() for section in SECTIONS}
+    results = {}
+    for key, value in sections:
+        if key == 'error':
+            st.warning(value)
+        else:
+            # Large sections go out in item-aligned chunks instead of one re-rendered blob
+            with metrics.span("render", surface="streamlit"), placeholders[key].container():
+                for chunk in iter_section_markdown(key, value):
+                    st.markdown(chunk)
+        results[key] = value
+    return assemble_sections(results)
+
+def render_trip(trip):
+    """Show a generated or saved itinerary without calling the API"""
+    start = datetime.strptime(trip['start_date'], "%Y-%m-%d")
+    end = datetime.strptime(trip['end_date'], "%Y-%m-%d")
+    st.markdown("---")
+    st.markdown(f"## 🏖️ {trip['destination']}")
+    st.markdown(f"**📅 {start.strftime('%B %d, %Y')} - {end.strftime('%B %d, %Y')}**")
+    st.markdown(f"**⏰ {(end - start).days} days of luxury**")
+    if trip.get('created_at'):
+        st.caption(f"📚 Saved {datetime.fromtimestamp(trip['created_at']).strftime('%B %d, %Y %H:%M')}")
+    st.markdown("---")
+    if trip['kind'] == "sections":
+        render_sections(trip['content'].items())
+    else:
+        st.markdown(trip['content'])
+
+def render_itinerary(assistant, legs):
+    """Generate every leg concurrently, filling per-leg placeholders in leg order as each finishes"""
+    placeholders = []
+    for index, leg in enumerate(legs):
+        st.markdown(leg_markdown_heading(index, leg))
+        placeholders.append(st.empty())
+        placeholders[-1].info(PENDING_TEXT)
+    results = {}
+    for index, content in assistant.iter_itinerary(legs, deadline=DEADLINE_SECONDS or None):
+        placeholders[index].markdown(content)
+        results[index] = content
+    return results
+
+def render_itinerary_planner(assistant, history, user, today):
+    """Multi-city form: one row per leg, all legs generated at once"""
+    with st.form("itinerary_form"):
+        st.markdown("### 🗺️ Plan a Multi-City Journey")
+        rows = st.data_editor(
+            [{'Destination': "", 'Start': today + timedelta(days=1), 'End': today + timedelta(days=4)}],
+            num_rows="dynamic",
+            use_container_width=True,
+            key="itinerary_legs",
+            column_config={
+                'Destination': st.column_config.TextColumn("🏖️ Destination", required=True),
+                'Start': st.column_config.DateColumn("Start Date", min_value=today, required=True),
+                'End': st.column_config.DateColumn("End Date", min_value=today, required=True),
+            }
+        )
+        submitted = st.form_submit_button("🎯 Generate Itinerary", type="primary")
     
-    def generate_recommendations(self, destination, start_date, end_date):
-        if not self.api_key:
-            return "❌ OpenAI API key not configured. Please check your Streamlit secrets."
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        prompt = f"""
-        You are an elite luxury travel advisor with expertise in ultra-high-end destinations worldwide. 
-        
-        Create comprehensive luxury travel recommendations for {destination} from {start_date} to {end_date}.
-        
-        Please provide detailed information in these categories:
-        
-        🏨 **LUXURY ACCOMMODATIONS** (3-5 options)
-        - Ultra-luxury hotels, resorts, and boutique properties
-        - Approximate nightly rates in USD
-        - Unique features and why they're special
-        - Booking recommendations
-        
-        🍽️ **FINE DINING EXPERIENCES** (5-7 restaurants)
-        - Michelin-starred establishments
-        - Celebrity chef restaurants
-        - Unique culinary experiences
-        - Price ranges per person
-        - Reservation tips
-        
-        ✨ **EXCLUSIVE EXPERIENCES** (5-8 activities)
-        - VIP tours and private access
-        - Luxury wellness and spa treatments
-        - Private cultural experiences
-        - Adventure activities (luxury level)
-        - Approximate costs
-        
-        🛍️ **LUXURY SHOPPING**
-        - High-end boutiques and designer stores
-        - Local luxury markets
-        - Exclusive shopping districts
-        - Personal shopping services
-        
-        🚗 **PREMIUM TRANSPORTATION**
-        - Luxury car services
-        - Private transfers
-        - Helicopter/private jet options
-        - Chauffeur services
-        
-        🌤️ **WEATHER & PACKING**
-        - Expected weather conditions
-        - What to pack for luxury activities
-        - Seasonal considerations
-        
-        💎 **INSIDER SECRETS**
-        - Hidden luxury gems only locals know
-        - Best times to visit popular attractions
-        - VIP access tips
-        - Cultural etiquette for luxury travelers
+    if not submitted:
+        # The last itinerary stays on screen across reruns without regenerating
+        if st.session_state.get('itinerary_result') is not None:
+            render_trip(st.session_state['itinerary_result'])
+        return
+    
+    try:
+        legs = normalize_legs((row.get('Destination'), row.get('Start'), row.get('End'))
+                              for row in rows if any(row.values()))
+    except (TypeError, ValueError):
+        st.error("Please fill in a destination and both dates for every leg!")
+        return
+    error = validate_legs(legs)
+    if error:
+        st.error(error)
+        return
+    
+    st.markdown("---")
+    st.markdown(f"## 🗺️ {itinerary_title(legs)}")
+    st.markdown(f"**📅 {legs[0][1]} - {legs[-1][2]} · {len(legs)} legs**")
+    st.markdown("---")
+    
+    with st.spinner(f"🔄 Curating all {len(legs)} legs of your journey at once..."):
+        results = render_itinerary(assistant, legs)
+    
+    complete = not any(is_error_response(content) for content in results.values())
+    keep_result('itinerary_result', history, user, (itinerary_title(legs), legs[0][1], legs[-1][2]),
+                render_itinerary_markdown(legs, results), save=complete)
+    if complete:
+        st.success("✅ Your multi-city itinerary is ready!")
+    else:
+        st.warning("⚠️ Some legs could not be generated. Submit again to retry them; finished legs are reused.")
+
+def keep_result(key, history, user, trip, content, save):
+    """Hold a generated trip in the session so reruns show it again; complete ones also go to the history"""
+    destination, start_date, end_date = trip
+    result = {'destination': destination, 'start_date': start_date, 'end_date': end_date,
+              'kind': "sections" if isinstance(content, dict) else "text", 'content': content}
+    if save:
+        result['id'] = history.save(user, destination, start_date, end_date, content)
+        result['created_at'] = time.time()
+    st.session_state[key] = result
+    return result
+
+def open_trip(trip_id):
+    """Button callback: show a saved trip on the next run"""
+    st.session_state['result'] = get_trip_history().get(trip_id)
+    st.session_state['trip_type'] = SINGLE_TRIP
+
+def close_trip():
+    """Button callback: go back to an empty form"""
+    st.session_state.pop('result', None)
+
+def render_history_sidebar(history):
+    """Sidebar listing of saved trips with search and keyset pagination"""
+    with st.sidebar:
+        st.markdown("### 📚 Trip History")
+        user = st.text_input("👤 Concierge", key="history_user", help="Trips are saved under this name").strip()
+        query = st.text_input("🔎 Search trips", key="history_query", placeholder="e.g. Ritz, Kyoto, spa")
+        mine = st.checkbox("Only my trips", value=bool(user), key="history_mine")
+        owner = user if mine else None
         
-        Format the response with clear headings, specific venue names, realistic prices, and actionable advice.
-        Make it comprehensive yet easy to read.
-        """
+        # Cursors of the pages viewed so far, so "Newer" can step back
+        cursors = st.session_state.setdefault('history_cursors', [None])
+        if query.strip():
+            trips, next_cursor = history.search(query, user=owner), None
+        else:
+            trips, next_cursor = history.list(user=owner, cursor=cursors[-1])
         
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are the world's leading luxury travel advisor, with exclusive access to the finest hotels, restaurants, and experiences globally. You specialize in ultra-high-end travel for discerning clients with substantial budgets."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "max_tokens": 3000,
-            "temperature": 0.7
-        }
+        if not trips:
+            st.caption("No saved trips yet." if not query.strip() else "No trips match your search.")
+        for trip in trips:
+            label = f"{trip['destination']} · {trip['start_date']} → {trip['end_date']}"
+            st.button(label, key=f"trip_{trip['id']}", on_click=open_trip, args=(trip['id'],),
+                      use_container_width=True)
         
-        try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            return content
-            
-        except requests.exceptions.Timeout:
-            return "❌ Request timed out. Please try again."
-        except requests.exceptions.RequestException as e:
-            return f"❌ Error connecting to OpenAI API: {str(e)}"
-        except KeyError:
-            return "❌ Unexpected response format from OpenAI API."
-        except Exception as e:
-            return f"❌ Error generating recommendations: {str(e)}"
+        col1, col2 = st.columns(2)
+        with col1:
+            if len(cursors) > 1 and st.button("← Newer", key="history_newer"):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if next_cursor is not None and st.button("Older →", key="history_older"):
+                cursors.append(next_cursor)
+                st.rerun()
+
+def session_tenant():
+    """Identify the current browser session, or None outside `streamlit run`"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+@st.cache_resource(show_spinner=False)
+def shared_assistant():
+    """The client, its API key, HTTP pools and caches: built once per server process, not on every rerun"""
+    # With TRAVEL_API_URL set, generation happens in the API service and this app is a thin client
+    return RemoteTravelAssistant() if API_URL else SimpleTravelAssistant()
+
+def session_assistant():
+    """This browser session's assistant, made once per session from the shared one"""
+    if 'assistant' not in st.session_state:
+        # A shallow copy shares the client and caches; only the rate-limit tenant is per session
+        assistant = copy.copy(shared_assistant())
+        assistant.tenant = session_tenant()
+        st.session_state['assistant'] = assistant
+    return st.session_state['assistant']
 
 def main():
     # Page config
@@ -154,11 +244,14 @@ def main():
     st.markdown('<h1 class="main-title">✈️ Luxury Travel Assistant</h1>', unsafe_allow_html=True)
     st.markdown('<p class="subtitle">AI-Powered Ultra-Luxury Travel Recommendations</p>', unsafe_allow_html=True)
     
-    # Initialize assistant
-    assistant = SimpleTravelAssistant()
+    # Reruns reuse the session's assistant; each browser session is its own tenant for fair rate limiting
+    assistant = session_assistant()
     
     # Only proceed if API key is configured
-    if not assistant.api_key:
+    if API_URL and not assistant.api_key:
+        st.error(f"🔌 The travel API at {API_URL} is not ready yet. Please try again in a moment.")
+        return
+    elif not assistant.api_key:
         st.error("🔑 Please configure your OpenAI API key in Streamlit Cloud:")
         st.markdown("""
         1. Go to your app dashboard on Streamlit Cloud
@@ -170,9 +263,19 @@ def main():
     else:
         st.success("✅ API key configured")
     
+    # Saved trips survive reruns and can be reopened without paying for a regeneration
+    history = get_trip_history()
+    user = st.session_state.get('history_user', "").strip()
+    
     # Get current date
     today = datetime.now().date()
     
+    # Multi-city trips get their own planner; each leg is generated and cached separately
+    if st.radio("Trip type", [SINGLE_TRIP, MULTI_CITY], horizontal=True, key="trip_type") == MULTI_CITY:
+        render_itinerary_planner(assistant, history, user, today)
+        render_history_sidebar(history)
+        return
+    
     # Input form
     with st.form("travel_form"):
         st.markdown("### 📍 Plan Your Luxury Journey")
@@ -223,6 +326,12 @@ def main():
         elif start_date and end_date and end_date <= start_date:
             st.warning("⚠️ Please select an end date after your start date")
         
+        # Generation mode
+        parallel_sections = st.checkbox(
+            "⚡ Fast mode (generate sections in parallel)",
+            help="Requests each category separately and shows it as soon as it is ready"
+        )
+        
         # Submit button
         submitted = st.form_submit_button("🎯 Generate Luxury Recommendations", type="primary")
     
@@ -237,32 +346,43 @@ def main():
         else:
             duration = (end_date - start_date).days
             
+            # Display results
+            st.markdown("---")
+            
+            # Header
+            st.markdown(f"## 🏖️ {destination}")
+            st.markdown(f"**📅 {start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}**")
+            st.markdown(f"**⏰ {duration} days of luxury**")
+            
+            st.markdown("---")
+            
             with st.spinner(f"🔄 Curating exclusive luxury recommendations for your {duration}-day journey to {destination}..."):
-                recommendations = assistant.generate_recommendations(
-                    destination.strip(), 
-                    start_date.strftime("%Y-%m-%d"), 
-                    end_date.strftime("%Y-%m-%d")
-                )
-                
-                # Display results
-                st.markdown("---")
-                
-                # Header
-                st.markdown(f"## 🏖️ {destination}")
-                st.markdown(f"**📅 {start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}**")
-                st.markdown(f"**⏰ {duration} days of luxury**")
-                
-                st.markdown("---")
+                trip = (destination.strip(), start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+                # After a date change, cached sections are spliced in and only the changed ones regenerated
+                if parallel_sections or assistant.cached_sections(*trip):
+                    # Fill per-section placeholders in canonical order as each lands
+                    recommendations = render_sections(
+                        assistant.iter_sections(*trip, deadline=DEADLINE_SECONDS or None))
+                else:
+                    # Stream recommendations into a placeholder as they arrive
+                    placeholder = st.empty()
+                    recommendations = render_stream(
+                        placeholder, assistant.stream_recommendations(*trip, deadline=DEADLINE_SECONDS or None))
                 
-                # Show recommendations
-                st.markdown(recommendations)
-                
-                # Success message
-                st.success("✅ Your luxury recommendations are ready!")
+                # Reruns show it again for free and a colleague can reopen it; partial answers are not saved
+                complete = not is_error_response(recommendations)
+                keep_result('result', history, user, trip, recommendations, save=complete)
+                if complete:
+                    # Success message
+                    st.success("✅ Your luxury recommendations are ready!")
                 
                 # Option to generate new recommendations
-                if st.button("🌟 Plan Another Luxury Trip"):
-                    st.rerun()
+                st.button("🌟 Plan Another Luxury Trip", on_click=close_trip)
+    
+    # The last generated or reopened trip, until another one is planned
+    elif st.session_state.get('result') is not None:
+        render_trip(st.session_state['result'])
+        st.button("🌟 Plan Another Luxury Trip", on_click=close_trip)
     
     # Info section when no form submitted
     else:
@@ -297,6 +417,9 @@ def main():
             - Luxury transportation & transfers
             - Insider experiences & hidden gems
             """)
+    
+    # Listed last so a trip saved during this run already shows up
+    render_history_sidebar(history)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Modules read their configuration at import time, so point every on-disk store at a scratch directory first
+_scratch = tempfile.mkdtemp(prefix="travel-tests-")
+os.environ.setdefault("TRAVEL_CACHE_PATH", os.path.join(_scratch, "cache.db"))
+os.environ.setdefault("TRAVEL_HISTORY_PATH", os.path.join(_scratch, "history.db"))
+os.environ.setdefault("TRAVEL_WARM_STORE_DIR", os.path.join(_scratch, "warm"))
+os.environ.setdefault("TRAVEL_KNOWLEDGE_BASE", os.path.join(_scratch, "knowledge.kb"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+def hold(controller, purpose="interactive"):
+    """Take a slot and return the function that releases it"""
+    slot = controller.slot(purpose)
+    slot.__enter__()
+    return lambda: slot.__exit__(None, None, None)
+
+
+def queue(controller, purpose, outcomes):
+    """Wait for a slot on a thread, recording 'admitted' or the shed reason; returns once it is queued"""
+    def run():
+        try:
+            with controller.slot(purpose):
+                outcomes.append((purpose, 'admitted'))
+        except Overloaded as e:
+            outcomes.append((purpose, e.reason))
+
+    queued = controller.stats()['queued']
+    thread = threading.Thread(target=run)
+    thread.start()
+    give_up_at = time.monotonic() + 5
+    while controller.stats()['queued'] <= queued and time.monotonic() < give_up_at:
+        time.sleep(0.001)
+    return thread
+
+
+def test_free_slot_admits_at_once():
+    controller = AdmissionController(limit=1, queue_size=0)
+    with controller.slot():
+        assert controller.stats()['active'] == 1
+    assert controller.stats()['active'] == 0
+    assert controller.stats()['admitted'] == 1
+
+
+def test_no_queue_sheds_as_full_when_every_slot_is_taken():
+    controller = AdmissionController(limit=1, queue_size=0)
+    release = hold(controller)
+    with pytest.raises(Overloaded) as shed:
+        with controller.slot():
+            pass
+    release()
+    assert shed.value.reason == 'full'
+    assert controller.stats()['shed_full'] == 1
+    assert controller.stats()['active'] == 0
+
+
+def test_full_queue_sheds_a_request_with_no_lower_priority_waiter():
+    controller = AdmissionController(limit=1, queue_size=1)
+    release = hold(controller)
+    outcomes = []
+    waiter = queue(controller, "interactive", outcomes)
+    with pytest.raises(Overloaded) as shed:
+        with controller.slot("interactive"):
+            pass
+    release()
+    waiter.join(5)
+    assert shed.value.reason == 'full'
+    assert outcomes == [("interactive", 'admitted')]
+
+
+def test_full_queue_evicts_the_newest_batch_waiter_for_an_interactive_request():
+    controller = AdmissionController(limit=1, queue_size=2)
+    release = hold(controller)
+    outcomes = []
+    first = queue(controller, "batch", outcomes)
+    second = queue(controller, "batch", outcomes)
+    interactive = queue(controller, "interactive", outcomes)
+    release()
+    for thread in (first, second, interactive):
+        thread.join(5)
+    assert ("batch", 'evicted') in outcomes
+    assert [outcome for outcome in outcomes if outcome[1] == 'admitted'] == [("interactive", 'admitted'),
+                                                                           ("batch", 'admitted')]
+    assert controller.stats()['shed_evicted'] == 1
+
+
+def test_waiter_is_shed_once_its_budget_runs_out():
+    controller = AdmissionController(limit=1, queue_size=1, max_wait={'interactive': 0.05})
+    release = hold(controller)
+    with pytest.raises(Overloaded) as shed:
+        with controller.slot("interactive"):
+            pass
+    release()
+    assert shed.value.reason == 'timeout'
+    assert controller.stats()['queue_depth'] == 0
+
+
+def test_request_is_shed_when_its_predicted_wait_exceeds_the_budget():
+    controller = AdmissionController(limit=1, queue_size=4, max_wait={'interactive': 1})
+    # One request that held its slot for 10s sets the service-time estimate
+    controller._acquire("interactive")
+    controller._release(10.0)
+    release = hold(controller)
+    with pytest.raises(Overloaded) as shed:
+        with controller.slot("interactive"):
+            pass
+    release()
+    assert shed.value.reason == 'predicted'
+    assert controller.stats()['queued'] == 0
+
+
+def test_zero_limit_disables_admission_control():
+    controller = AdmissionController(limit=0, queue_size=0)
+    with controller.slot():
+        with controller.slot():
+            pass
+    assert controller.stats()['admitted'] == 0
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from deadline import PARTIAL_NOTICE, TIMEOUT_MESSAGE, generate_within, sections_within
+
+
+@pytest.fixture
+def release():
+    """Event that stalled sources wait on; set after the test so their threads finish"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def stalled(chunks, release):
+    """Yield chunks, then stall until released"""
+    yield from chunks
+    release.wait(5)
+
+
+def test_complete_answer_is_returned_as_is():
+    result = generate_within(iter(["Paris ", "in June"]), 5)
+    assert result == "Paris in June"
+    assert not result.partial
+    assert result.source == "complete"
+
+
+def test_text_received_before_the_deadline_is_returned_as_partial(release):
+    result = generate_within(stalled(["🏨 Hotels"], release), 0.05, lambda: "cached")
+    assert result == "🏨 Hotels" + PARTIAL_NOTICE
+    assert result.partial
+    assert result.source == "streamed"
+
+
+def test_cached_fallback_is_used_when_nothing_arrived(release):
+    result = generate_within(stalled([], release), 0.05, lambda: "🍽️ Dining")
+    assert result == "🍽️ Dining" + PARTIAL_NOTICE
+    assert result.source == "cached"
+
+
+def test_timeout_message_when_nothing_is_ready(release):
+    result = generate_within(stalled([], release), 0.05, lambda: None)
+    assert result == TIMEOUT_MESSAGE
+    assert result.partial
+    assert result.source == "none"
+
+
+def test_failed_answer_is_replaced_by_the_cached_fallback():
+    result = generate_within(iter(["❌ Error: upstream unavailable"]), 5, lambda: "🍽️ Dining")
+    assert result == "🍽️ Dining" + PARTIAL_NOTICE
+    assert result.source == "cached"
+
+
+def test_late_sections_are_named(release):
+    sections = dict(sections_within(stalled([('luxury_hotels', "hotels")], release), 0.05))
+    assert sections['luxury_hotels'] == "hotels"
+    assert sections['error'].startswith("⏱️")
+    assert "LUXURY ACCOMMODATIONS" not in sections['error']
+    assert "FINE DINING" in sections['error']
@@ -0,0 +1,83 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from rate_limiter import RateLimiter, Ticket
+
+
+class Limiter:
+    """Records token adjustments made by tickets"""
+
+    def __init__(self):
+        self.adjustments = []
+
+    def adjust_tokens(self, amount):
+        self.adjustments.append(amount)
+
+
+def test_reconcile_replaces_the_pre_charge_with_actual_usage():
+    limiter = Limiter()
+    Ticket(limiter, 1000).reconcile({'total_tokens': 400})
+    Ticket(limiter, 1000).reconcile(SimpleNamespace(total_tokens=1300))
+    assert limiter.adjustments == [600, -300]
+
+
+def test_ticket_settles_once():
+    limiter = Limiter()
+    ticket = Ticket(limiter, 1000)
+    ticket.reconcile({'total_tokens': 400})
+    ticket.reconcile({'total_tokens': 100})
+    ticket.refund()
+    assert limiter.adjustments == [600]
+
+
+def test_refund_returns_the_pre_charge_when_usage_is_unknown():
+    limiter = Limiter()
+    ticket = Ticket(limiter, 1000)
+    ticket.reconcile(None)
+    ticket.reconcile({})
+    ticket.refund()
+    ticket.refund()
+    assert limiter.adjustments == [1000]
+
+
+class RecordingLimiter(RateLimiter):
+    """Records the token count of each admitted request, in admission order"""
+
+    def __init__(self):
+        super().__init__("test", max_wait=5)
+        self.admitted = []
+
+    def _admit(self, tokens, now):
+        super()._admit(tokens, now)
+        self.admitted.append(tokens)
+
+
+def test_waiting_requests_are_admitted_in_fair_order():
+    limiter = RecordingLimiter()
+    limiter.pause(0.3)
+    # A batch tenant floods the queue before an interactive tenant arrives
+    requests = [("batch", 100, "batch"), ("batch", 101, "batch"), ("batch", 102, "batch"),
+                ("session", 50, "interactive"), ("session", 51, "interactive")]
+    threads = []
+    for depth, (tenant, tokens, purpose) in enumerate(requests, 1):
+        thread = threading.Thread(target=limiter.acquire, args=(tenant, tokens, purpose))
+        thread.start()
+        threads.append(thread)
+        # Queue each request before the next arrives, so arrival order is fixed
+        give_up_at = time.monotonic() + 5
+        while limiter.stats()['queue_depth'] < depth and time.monotonic() < give_up_at:
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+
+    # The session's requests overtake the batch tenant's backlog instead of waiting behind it
+    assert limiter.admitted == [100, 50, 51, 101, 102]
+
+
+def test_token_budget_is_credited_after_reconciliation():
+    limiter = RateLimiter("test", tpm=1000, max_wait=5)
+    ticket = limiter.acquire("session", 800)
+    assert limiter.tokens.level < 300
+    ticket.reconcile({'total_tokens': 200})
+    assert limiter.tokens.level >= 800
@@ -0,0 +1,86 @@
+import threading
+
+from rate_limiter import Ticket
+from resilience import ResilientCaller
+
+
+class Limiter:
+    """Records token adjustments made by tickets"""
+
+    def __init__(self):
+        self.adjustments = []
+
+    def adjust_tokens(self, amount):
+        self.adjustments.append(amount)
+
+
+class Response:
+    def __init__(self, tokens):
+        self.usage = {'total_tokens': tokens}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def hedging_caller():
+    caller = ResilientCaller(max_retries=0, hedge_percentile=50, hedge_min_samples=1)
+    caller.histogram("full").record(0.01)
+    return caller
+
+
+def test_losing_hedge_is_charged_its_usage_and_closed():
+    caller = hedging_caller()
+    limiter = Limiter()
+    release = threading.Event()
+    discarded = threading.Event()
+    slow = Response(tokens=40)
+    fast = Response(tokens=30)
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(5)
+            return slow, Ticket(limiter, 100)
+        return fast, Ticket(limiter, 100)
+
+    original = caller._discard
+    caller._discard = lambda future, usage=None: (original(future, usage), discarded.set())
+
+    response, _ = caller.call(fetch, operation="full", usage=lambda response: response.usage)
+    assert response is fast
+    assert caller.stats()['hedge_losers_running'] == 1
+
+    release.set()
+    assert discarded.wait(5)
+    assert slow.closed
+    # Upstream billed the loser, so only the unused part of its pre-charge comes back
+    assert limiter.adjustments == [60]
+    stats = caller.stats()
+    assert (stats['hedge_wins'], stats['hedge_discards'], stats['hedge_losers_running']) == (1, 1, 0)
+
+
+def test_losing_hedge_keeps_its_pre_charge_without_usage():
+    caller = hedging_caller()
+    limiter = Limiter()
+    release = threading.Event()
+    discarded = threading.Event()
+    slow = Response(tokens=40)
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(5)
+            return slow, Ticket(limiter, 100)
+        return Response(tokens=30), Ticket(limiter, 100)
+
+    original = caller._discard
+    caller._discard = lambda future, usage=None: (original(future, usage), discarded.set())
+
+    caller.call(fetch, operation="full")
+    release.set()
+    assert discarded.wait(5)
+    assert slow.closed
+    assert limiter.adjustments == []
@@ -0,0 +1,40 @@
+from sections import SECTIONS_BY_KEY, season_key, section_cache_key
+
+HOTELS = SECTIONS_BY_KEY['luxury_hotels']
+EXPERIENCES = SECTIONS_BY_KEY['exclusive_experiences']
+WEATHER = SECTIONS_BY_KEY['weather']
+
+
+def key(section, destination="Paris", start_date="2026-06-10", end_date="2026-06-15"):
+    return section_cache_key("test", section, destination, start_date, end_date)
+
+
+def test_season_key_lists_the_months_travelled():
+    assert season_key("2026-06-10", "2026-06-15") == "06"
+    assert season_key("2026-12-28", "2027-01-03") == "12-01"
+    assert season_key("2026-01-01", "2027-06-01") == "01-02-03-04-05-06-07-08-09-10-11-12"
+
+
+def test_destination_sections_ignore_the_dates():
+    assert key(HOTELS) == key(HOTELS, start_date="2026-12-01", end_date="2026-12-09")
+    assert key(HOTELS) != key(HOTELS, destination="Rome")
+
+
+def test_season_sections_change_with_the_months_only():
+    assert key(EXPERIENCES) == key(EXPERIENCES, start_date="2026-06-01", end_date="2026-06-30")
+    assert key(EXPERIENCES) == key(EXPERIENCES, start_date="2027-06-02", end_date="2027-06-04")
+    assert key(EXPERIENCES) != key(EXPERIENCES, start_date="2026-06-28", end_date="2026-07-02")
+
+
+def test_date_sections_change_with_the_exact_dates():
+    assert key(WEATHER) != key(WEATHER, start_date="2026-06-11")
+    assert key(WEATHER) != key(WEATHER, end_date="2026-06-16")
+
+
+def test_sections_never_share_a_key():
+    assert len({key(section) for section in SECTIONS_BY_KEY.values()}) == len(SECTIONS_BY_KEY)
+
+
+def test_spellings_of_one_destination_share_a_key():
+    assert key(HOTELS, destination="paris, France") == key(HOTELS)
+    assert key(WEATHER, destination="Pairs") == key(WEATHER)
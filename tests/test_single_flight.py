@@ -0,0 +1,67 @@
+from single_flight import SingleFlight
+
+
+class Source:
+    """Chunk generator that records whether it was closed"""
+
+    def __init__(self, chunks):
+        self.closed = False
+        self.pulled = 0
+        self._chunks = chunks
+
+    def __iter__(self):
+        try:
+            for chunk in self._chunks:
+                self.pulled += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def test_stream_is_shared_by_concurrent_readers():
+    flights = SingleFlight()
+    source = Source(["a", "b", "c"])
+    first = flights.stream("key", lambda: source)
+    second = flights.stream("key", lambda: Source(["unused"]))
+
+    assert next(first) == "a"
+    assert next(second) == "a"
+    assert list(first) == ["b", "c"]
+    assert list(second) == ["b", "c"]
+    assert source.pulled == 3
+    assert flights.stats()['coalesced'] == 1
+    assert flights.stats()['in_flight'] == 0
+
+
+def test_source_stays_open_while_a_reader_remains():
+    flights = SingleFlight()
+    source = Source(["a", "b", "c"])
+    first = flights.stream("key", lambda: source)
+    second = flights.stream("key", lambda: source)
+    next(first)
+    next(second)
+
+    first.close()
+    assert not source.closed
+    assert list(second) == ["b", "c"]
+    assert flights.stats()['abandoned'] == 0
+
+
+def test_source_closes_when_every_reader_leaves():
+    flights = SingleFlight()
+    source = Source(["a", "b", "c"])
+    first = flights.stream("key", lambda: source)
+    second = flights.stream("key", lambda: source)
+    next(first)
+    next(second)
+
+    first.close()
+    second.close()
+    assert source.closed
+    assert source.pulled == 1
+    assert flights.stats()['abandoned'] == 1
+    assert flights.stats()['in_flight'] == 0
+
+    # The abandoned stream is forgotten, so the next reader starts a fresh call
+    fresh = Source(["x"])
+    assert list(flights.stream("key", lambda: fresh)) == ["x"]
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from admission import BUSY_MESSAGE, BUSY_NOTICE
+from knowledge_base import FALLBACK_NOTICE
+from metrics import JsonlSink, get_metrics
+from trip_history import is_error_response
+
+# Traffic capture configuration (override with environment variables)
+# JSONL file every assistant request is appended to; unset = nothing is recorded
+TRACE_PATH = os.getenv("TRAVEL_TRACE_PATH", "")
+# Fraction of requests recorded
+TRACE_SAMPLE = float(os.getenv("TRAVEL_TRACE_SAMPLE", "1"))
+
+
+def prompt_hash(messages):
+    """Short stable hash of the chat messages a request sends, to spot prompt changes between runs"""
+    encoded = json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def text_status(text):
+    """ok, shed, fallback or error for a finished answer"""
+    if text.startswith((BUSY_MESSAGE, BUSY_NOTICE)):
+        return "shed"
+    if text.startswith(FALLBACK_NOTICE):
+        return "fallback"
+    return "error" if is_error_response(text) else "ok"
+
+
+def _tokens(usage, kind):
+    value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+    return value or 0
+
+
+class Trace:
+    """One recorded request; the assistant fills it in as the request runs
+
+    The record keeps the trip fields of batch.py's input (request_id,
+    destination, start_date, end_date) so a trace can be fed back to it.
+    """
+
+    def __init__(self, recorder, record):
+        self.recorder = recorder
+        self.record = record
+        self.upstream_calls = 0
+        self.missed = False
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._parts = []
+        self._finished = False
+
+    def miss(self):
+        """The cache had no answer; the request joins or starts an upstream call"""
+        self.missed = True
+
+    def upstream(self):
+        """Count one upstream request made on behalf of this one"""
+        with self._lock:
+            self.upstream_calls += 1
+
+    def served(self, ticket, usage=None):
+        """Note the model that served an upstream request and add its token usage, once known"""
+        with self._lock:
+            if ticket.backend is not None:
+                self.record['model'] = ticket.backend.model
+            if usage:
+                for kind in ('prompt_tokens', 'completion_tokens'):
+                    self.record[kind] += _tokens(usage, kind)
+
+    def stream(self, items):
+        """Pass a chunk or (key, value) stream through, timing the first item; recorded when it ends"""
+        status = "abandoned"
+        try:
+            for item in items:
+                if self.record['first_item_ms'] is None:
+                    self.record['first_item_ms'] = self._elapsed_ms()
+                if isinstance(item, tuple):
+                    if item[0] == 'error':
+                        self._parts.append(item[1])
+                else:
+                    self._parts.append(item)
+                yield item
+            status = None
+        finally:
+            self.finish(status=status)
+
+    def finish(self, result=None, status=None):
+        """Record the request once; returns result so callers can `return trace.finish(result)`"""
+        if self._finished:
+            return result
+        self._finished = True
+        if status is None:
+            if isinstance(result, str):
+                status = text_status(result)
+            elif self.record['operation'] == "sections":
+                status = "error" if self._parts else "ok"
+            else:
+                status = text_status("".join(self._parts))
+        if self.upstream_calls or status == "shed":
+            cache = "miss"
+        elif self.missed:
+            # Shared another request's upstream call
+            cache = "coalesced"
+        else:
+            cache = "hit"
+        self.record.update({
+            'latency_ms': self._elapsed_ms(),
+            'status': status,
+            'cache': cache,
+            'upstream_calls': self.upstream_calls,
+        })
+        self.recorder.emit(self.record)
+        return result
+
+    def _elapsed_ms(self):
+        return round((time.perf_counter() - self._started) * 1000, 3)
+
+
+class NullTrace:
+    """Stands in for a Trace when the request is not recorded"""
+
+    def miss(self):
+        pass
+
+    def upstream(self):
+        pass
+
+    def served(self, ticket, usage=None):
+        pass
+
+    def stream(self, items):
+        return items
+
+    def finish(self, result=None, status=None):
+        return result
+
+
+NULL_TRACE = NullTrace()
+
+
+class TraceRecorder:
+    """Appends one JSONL record per assistant request, for replay with benchmarks/replay_trace.py"""
+
+    def __init__(self, path=TRACE_PATH, sample=TRACE_SAMPLE):
+        self.path = path
+        self.sample = sample
+        self.sink = JsonlSink(path)
+        self.metrics = get_metrics()
+
+    def start(self, assistant, operation, destination, start_date, end_date, messages, purpose="interactive",
+              tenant=None, bypass_cache=False):
+        """Begin recording a request; a no-op trace when it falls outside the sample"""
+        if self.sample < 1 and random.random() >= self.sample:
+            return NULL_TRACE
+        record = {
+            'request_id': uuid.uuid4().hex[:16],
+            'destination': destination,
+            'start_date': str(start_date),
+            'end_date': str(end_date),
+            'ts': round(time.time(), 6),
+            'assistant': assistant,
+            'operation': operation,
+            'purpose': purpose,
+            # Tenants are often client addresses; a hash keeps their fairness shape without them
+            'tenant': hashlib.sha256(str(tenant).encode("utf-8")).hexdigest()[:12] if tenant else None,
+            'bypass_cache': bypass_cache,
+            'prompt_hash': prompt_hash(messages),
+            'model': None,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'first_item_ms': None,
+        }
+        return Trace(self, record)
+
+    def emit(self, record):
+        try:
+            self.sink.emit(record)
+        except OSError as e:
+            # A full disk must not fail the request being recorded
+            self.metrics.increment("travel_trace_errors_total")
+            print(f"Trace record dropped: {e}")
+            return
+        self.metrics.increment("travel_trace_records_total", operation=record['operation'],
+                               status=record['status'], cache=record['cache'])
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_trace_recorder():
+    """Return the process-wide trace recorder, or None when TRAVEL_TRACE_PATH is unset"""
+    global _recorder
+    if not TRACE_PATH:
+        return None
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = TraceRecorder()
+    return _recorder
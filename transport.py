@@ -0,0 +1,97 @@
+import os
+import threading
+
+from resilience import CONNECT_TIMEOUT, READ_TIMEOUT
+
+# Connection pool configuration (override with environment variables)
+HTTP_POOL_SIZE = int(os.getenv("TRAVEL_HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("TRAVEL_HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = os.getenv("TRAVEL_HTTP2", "0").lower() in ("1", "true", "yes")
+
+
+class Transport:
+    """Long-lived HTTP connection pools shared by every assistant instance"""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY, http2=HTTP2_ENABLED):
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+
+        # Both clients are built on first use so importing this module stays cheap
+        self._session = None
+        self._httpx_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """requests session used by SimpleTravelAssistant (HTTP/1.1 keep-alive)"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    def post(self, url, **kwargs):
+        """POST through the pooled session"""
+        return self.session.post(url, **kwargs)
+
+    def httpx_client(self):
+        """Return the pooled httpx client used by the OpenAI SDK"""
+        if self._httpx_client is None:
+            with self._lock:
+                if self._httpx_client is None:
+                    self._httpx_client = self._build_httpx_client()
+        return self._httpx_client
+
+    def _build_httpx_client(self):
+        """Build an httpx client, enabling HTTP/2 only when h2 is installed"""
+        import httpx
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        return httpx.Client(http2=http2, limits=limits, timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT))
+
+    def close(self):
+        """Close every pooled connection"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+            self._httpx_client = None
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Return the process-wide transport shared by all sessions"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport()
+    return _transport
@@ -1,57 +1,198 @@
-import os
-import streamlit as st
+import threading
+import time
+from assistant_base import AssistantBase
+from transport import get_transport
+from resilience import CONNECT_TIMEOUT, READ_TIMEOUT
+from rate_limiter import estimate_tokens
+from sections import assemble_sections
+from knowledge_base import KNOWLEDGE_MODE
+from trace_recorder import NULL_TRACE
+from renderer import render_text
+from destinations import prompt_destination
 
-class TravelAssistant:
-    def __init__(self):
-        self.client = None
+class TravelAssistant(AssistantBase):
+    cache_namespace = "travel_assistant"
+    assistant_label = "openai_sdk"
+    not_ready_message = "API client not initialized. Please check your OpenAI API key."
+    sections_failed_message = "Some sections could not be generated: {}"
+    
+    def __init__(self, api_key=None, base_url=None, purpose="interactive", tenant=None,
+                 knowledge_mode=KNOWLEDGE_MODE):
+        super().__init__(api_key, base_url, purpose, tenant, knowledge_mode)
+        # The OpenAI SDK is imported on first use, not at startup; one client per backend
+        self._clients = {}
+        self._failed_clients = set()
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """OpenAI client for the primary backend, built on first access (None without a usable API key)"""
+        return self.client_for(self.router.backends[0])
+    
+    def client_for(self, backend):
+        """OpenAI client for a routed backend, built on first use"""
+        client = self._clients.get(backend.name)
+        api_key = backend.api_key or self.api_key
+        if client is None and api_key and backend.name not in self._failed_clients:
+            with self._client_lock:
+                client = self._clients.get(backend.name)
+                if client is None and backend.name not in self._failed_clients:
+                    try:
+                        import httpx
+                        from openai import OpenAI
+                        # Retries are handled by the resilience layer, not the SDK
+                        client = self._clients[backend.name] = OpenAI(
+                            api_key=api_key,
+                            base_url=backend.base_url,
+                            http_client=get_transport().httpx_client(),
+                            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                            max_retries=0
+                        )
+                    except Exception as e:
+                        print(f"OpenAI initialization error: {e}")
+                        self._failed_clients.add(backend.name)
+        return client
+    
+    def _ready(self):
+        return self.client is not None
+    
+    def _render_sections(self, values, destination, start_date, end_date):
+        """Render a sections dict assembled from cache or the knowledge base"""
+        return render_text(assemble_sections(values), destination, start_date, end_date)
+    
+    def _fetch_recommendations(self, destination, start_date, end_date, cache_key, trace=NULL_TRACE):
+        """Call the API, caching successful responses"""
+        trace.upstream()
+        with self.metrics.span("prompt", assistant="openai_sdk"):
+            messages = self._build_messages(destination, start_date, end_date)
         
-        # Get API key from Streamlit secrets
         try:
-            if 'OPENAI_API_KEY' in st.secrets:
-                self.api_key = st.secrets["OPENAI_API_KEY"]
-            else:
-                self.api_key = os.getenv("OPENAI_API_KEY")
-        except:
-            self.api_key = None
-        
-        if self.api_key:
-            try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
-            except Exception as e:
-                print(f"OpenAI initialization error: {e}")
-    
-    def generate_recommendations(self, destination, start_date, end_date):
-        if not self.client:
-            return "API client not initialized. Please check your OpenAI API key."
+            # Retries 429/5xx with backoff and hedges slow attempts; each attempt is routed
+            with self.metrics.span("upstream", assistant="openai_sdk", mode="full"):
+                raw, ticket = self.resilience.call(lambda: self._route(
+                    lambda client, model: client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=2500,
+                        temperature=0.7
+                    ), "full", messages, 2500), operation="full", usage=self._usage)
+            with self.metrics.span("parse", assistant="openai_sdk"):
+                response = raw.parse()
+                content = response.choices[0].message.content
+            self.metrics.record_usage(response.usage, assistant="openai_sdk")
+            ticket.reconcile(response.usage)
+            trace.served(ticket, response.usage)
+            
+        except Exception as e:
+            return f"Error generating recommendations: {str(e)}"
+        
+        self.cache.set(cache_key, content)
+        return content
+    
+    def _stream_fetch(self, destination, start_date, end_date, cache_key, trace=NULL_TRACE):
+        """Stream from the API, caching the response once it completes"""
+        trace.upstream()
+        with self.metrics.span("prompt", assistant="openai_sdk"):
+            messages = self._build_messages(destination, start_date, end_date)
         
+        parts = []
+        started = time.perf_counter()
         try:
-            prompt = f"""
-            As a luxury travel advisor, provide comprehensive recommendations for {destination} 
-            from {start_date} to {end_date}. Include:
-            
-            🏨 LUXURY HOTELS (3-5 options with prices)
-            🍽️ FINE DINING (Michelin-starred restaurants)
-            ✨ EXCLUSIVE EXPERIENCES (VIP tours, private access)
-            🛍️ LUXURY SHOPPING (high-end boutiques, markets)
-            🚗 PREMIUM TRANSPORTATION (luxury car services, private transfers)
-            🌤️ WEATHER & PACKING ADVICE
-            💡 INSIDER TIPS (local secrets, best times to visit attractions)
-            
-            Make it detailed and specific with actual names and approximate prices.
-            """
+            # Only opening the stream is retried; nothing has been yielded yet
+            stream, ticket = self.resilience.call(lambda: self._route(
+                lambda client, model: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=2500,
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                ), "stream", messages, 2500), operation="stream", hedge=False)
+            trace.served(ticket)
+            self.metrics.observe("travel_stage_seconds", time.perf_counter() - started,
+                                 stage="upstream_headers", assistant="openai_sdk")
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert luxury travel advisor with extensive knowledge of high-end destinations worldwide."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2500,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
+            for chunk in stream:
+                if chunk.usage:
+                    self.metrics.record_usage(chunk.usage, assistant="openai_sdk")
+                    ticket.reconcile(chunk.usage)
+                    trace.served(ticket, chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not parts:
+                        self.metrics.observe("travel_stage_seconds", time.perf_counter() - started,
+                                             stage="first_token", assistant="openai_sdk")
+                    parts.append(delta)
+                    yield delta
+            self.metrics.observe("travel_stage_seconds", time.perf_counter() - started,
+                                 stage="upstream", assistant="openai_sdk", mode="stream")
             
         except Exception as e:
-            return f"Error generating recommendations: {str(e)}"
\ No newline at end of file
+            yield f"\n\nError generating recommendations: {str(e)}"
+            return
+        
+        # Only complete streams are cached
+        self.cache.set(cache_key, "".join(parts))
+    
+    def _fetch_section(self, messages, max_tokens, trace=NULL_TRACE):
+        """Request a single section as JSON and return the completion text"""
+        trace.upstream()
+        # A shed section fails like any other and falls back to the knowledge base
+        with self.admission.slot(self.purpose), self.metrics.span("upstream", assistant="openai_sdk", mode="section"):
+            raw, ticket = self.resilience.call(lambda: self._route(
+                lambda client, model: client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    response_format={"type": "json_object"}
+                ), "section", messages, max_tokens), operation="section", usage=self._usage)
+        with self.metrics.span("parse", assistant="openai_sdk"):
+            response = raw.parse()
+        self.metrics.record_usage(response.usage, assistant="openai_sdk")
+        ticket.reconcile(response.usage)
+        trace.served(ticket, response.usage)
+        return response.choices[0].message.content
+    
+    def _usage(self, raw):
+        """Token usage of a completed raw SDK response (read when a hedged duplicate is discarded)"""
+        return raw.parse().usage
+    
+    def _route(self, request, operation, messages, max_tokens):
+        """Run request(client, model) on the backend the router picks once its rate limiter admits it
+
+        Returns (response, ticket).
+        """
+        def call(backend):
+            client = self.client_for(backend)
+            if client is None:
+                raise RuntimeError(f"No API client for backend {backend.name}")
+            return request(client, backend.model)
+        
+        return self.router.call(call, purpose=self.purpose, operation=operation, tenant=self.tenant,
+                                tokens=estimate_tokens(messages, max_tokens))
+    
+    def _build_messages(self, destination, start_date, end_date):
+        """Build the chat messages for a recommendation request"""
+        destination = prompt_destination(destination)
+        prompt = f"""
+        As a luxury travel advisor, provide comprehensive recommendations for {destination} 
+        from {start_date} to {end_date}. Include:
+        
+        🏨 LUXURY HOTELS (3-5 options with prices)
+        🍽️ FINE DINING (Michelin-starred restaurants)
+        ✨ EXCLUSIVE EXPERIENCES (VIP tours, private access)
+        🛍️ LUXURY SHOPPING (high-end boutiques, markets)
+        🚗 PREMIUM TRANSPORTATION (luxury car services, private transfers)
+        🌤️ WEATHER & PACKING ADVICE
+        💡 INSIDER TIPS (local secrets, best times to visit attractions)
+        
+        Make it detailed and specific with actual names and approximate prices.
+        """
+        
+        return [
+            {"role": "system", "content": "You are an expert luxury travel advisor with extensive knowledge of high-end destinations worldwide."},
+            {"role": "user", "content": prompt}
+        ]
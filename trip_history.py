@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from destinations import canonical_destination
+from metrics import get_metrics
+
+# Trip history configuration (override with environment variables)
+HISTORY_PATH = os.getenv(
+    "TRAVEL_HISTORY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "history.sqlite3")
+)
+HISTORY_PAGE_SIZE = int(os.getenv("TRAVEL_HISTORY_PAGE_SIZE", "20"))
+
+COMPRESSION_LEVEL = 6
+
+# Plain-text responses are stored as a single pseudo-section
+TEXT_SECTION = "text"
+
+# How the assistants report failures inside otherwise normal responses
+ERROR_PREFIXES = ("❌", "⚠️", "Error generating recommendations", "API client not initialized")
+# Answers cut short by a deadline (see deadline.PARTIAL_MARKER) are not full itineraries either
+ERROR_MARKERS = ("\n\n❌", "\n\nError generating recommendations", "\n\n⏱️")
+
+
+def is_error_response(content):
+    """Whether a response (text or sections dict) carries an error instead of a full itinerary"""
+    if isinstance(content, dict):
+        return not content or 'error' in content
+    text = (content or "").strip()
+    return not text or text.startswith(ERROR_PREFIXES) or any(marker in content for marker in ERROR_MARKERS)
+
+
+def _section_text(key, value):
+    """Searchable text for one section value"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "\n".join(
+            " ".join(str(field) for field in item.values()) if isinstance(item, dict) else str(item)
+            for item in value
+        )
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _fts_query(query):
+    """Quote each term so user input can't break FTS syntax; the last term matches as a prefix"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class TripHistory:
+    """Persistent, searchable record of generated itineraries
+
+    Sections are stored once per distinct content (keyed by hash, zlib
+    compressed), so re-saved trips and sections shared between trips cost
+    nothing extra. Trips are indexed by user, destination and date for keyset
+    pagination, and by an FTS5 index for full-text search.
+    """
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS trips (
+                id INTEGER PRIMARY KEY,
+                user TEXT NOT NULL,
+                destination TEXT NOT NULL,
+                destination_id TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS trip_sections (
+                trip_id INTEGER NOT NULL REFERENCES trips (id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                hash TEXT NOT NULL REFERENCES blobs (hash),
+                PRIMARY KEY (trip_id, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_trips_created ON trips (created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_trips_user ON trips (user, created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_trips_destination ON trips (destination_id, created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_trips_dates ON trips (start_date, end_date);
+            CREATE INDEX IF NOT EXISTS idx_trip_sections_hash ON trip_sections (hash);
+        """)
+        self.fts = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self):
+        """Create the contentless full-text index, or return False when FTS5 is unavailable"""
+        try:
+            # Contentless: the text already lives (compressed) in blobs
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS trips_fts USING fts5 (
+                    destination, content, content='', tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Trip history full-text search unavailable: {e}")
+            return False
+        return True
+
+    def save(self, user, destination, start_date, end_date, content):
+        """Record a generated itinerary (text or a sections dict) and return its trip id"""
+        if isinstance(content, dict):
+            kind = "sections"
+            sections = [(key, json.dumps(value, ensure_ascii=False, sort_keys=True), _section_text(key, value))
+                        for key, value in content.items()]
+        else:
+            kind = "text"
+            sections = [(TEXT_SECTION, content, content)]
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO trips (user, destination, destination_id, start_date, end_date, kind, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user or "", destination, canonical_destination(destination), str(start_date), str(end_date),
+                 kind, time.time())
+            )
+            trip_id = cursor.lastrowid
+            for position, (key, stored, _) in enumerate(sections):
+                data = stored.encode("utf-8")
+                digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+                # Identical sections (e.g. a re-saved trip) are stored once
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, content, size) VALUES (?, ?, ?)",
+                    (digest, zlib.compress(data, COMPRESSION_LEVEL), len(data))
+                )
+                self._conn.execute(
+                    "INSERT INTO trip_sections (trip_id, position, key, hash) VALUES (?, ?, ?, ?)",
+                    (trip_id, position, key, digest)
+                )
+            if self.fts:
+                self._conn.execute(
+                    "INSERT INTO trips_fts (rowid, destination, content) VALUES (?, ?, ?)",
+                    (trip_id, destination, "\n".join(text for _, _, text in sections))
+                )
+        return trip_id
+
+    def get(self, trip_id):
+        """Return a trip with its content (text or sections dict), or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM trips WHERE id = ?", (trip_id,)).fetchone()
+            if row is None:
+                return None
+            sections = self._conn.execute(
+                "SELECT s.key, b.content FROM trip_sections s JOIN blobs b ON b.hash = s.hash "
+                "WHERE s.trip_id = ? ORDER BY s.position",
+                (trip_id,)
+            ).fetchall()
+
+        trip = dict(row)
+        decoded = [(key, zlib.decompress(blob).decode("utf-8")) for key, blob in sections]
+        if trip['kind'] == "text":
+            trip['content'] = decoded[0][1] if decoded else ""
+        else:
+            trip['content'] = {key: json.loads(value) for key, value in decoded}
+        return trip
+
+    def list(self, user=None, destination=None, start_from=None, start_to=None, cursor=None,
+             limit=HISTORY_PAGE_SIZE):
+        """Newest-first trip summaries; returns (trips, next_cursor) for keyset pagination"""
+        where = []
+        params = []
+        if user is not None:
+            where.append("user = ?")
+            params.append(user)
+        if destination:
+            where.append("destination_id = ?")
+            params.append(canonical_destination(destination))
+        if start_from:
+            where.append("start_date >= ?")
+            params.append(str(start_from))
+        if start_to:
+            where.append("start_date <= ?")
+            params.append(str(start_to))
+        if cursor:
+            # Seek past the last row of the previous page instead of using OFFSET
+            where.append("(created_at, id) < (?, ?)")
+            params.extend(cursor)
+
+        sql = ("SELECT id, user, destination, destination_id, start_date, end_date, kind, created_at FROM trips"
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY created_at DESC, id DESC LIMIT ?")
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(sql, params + [limit + 1])]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1]['created_at'], rows[-1]['id'])
+        return rows, next_cursor
+
+    def search(self, query, user=None, limit=HISTORY_PAGE_SIZE, offset=0):
+        """Trip summaries matching a full-text query, best matches first"""
+        match = _fts_query(query)
+        if match is None:
+            return []
+        if not self.fts:
+            # No FTS5 in this SQLite build: fall back to destination names
+            sql = ("SELECT id, user, destination, destination_id, start_date, end_date, kind, created_at "
+                   "FROM trips WHERE destination LIKE ?" + (" AND user = ?" if user is not None else "")
+                   + " ORDER BY created_at DESC LIMIT ? OFFSET ?")
+            params = [f"%{query.strip()}%"] + ([user] if user is not None else []) + [limit, offset]
+        else:
+            sql = ("SELECT t.id, t.user, t.destination, t.destination_id, t.start_date, t.end_date, t.kind, "
+                   "t.created_at FROM trips_fts f JOIN trips t ON t.id = f.rowid WHERE trips_fts MATCH ?"
+                   + (" AND t.user = ?" if user is not None else "")
+                   + " ORDER BY bm25(trips_fts, 4.0, 1.0) LIMIT ? OFFSET ?")
+            params = [match] + ([user] if user is not None else []) + [limit, offset]
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def delete(self, trip_id):
+        """Remove a trip, its index entry and any sections no other trip uses"""
+        trip = self.get(trip_id)
+        if trip is None:
+            return False
+        with self._lock, self._conn:
+            if self.fts:
+                # Contentless FTS rows are deleted by replaying the indexed values
+                content = trip['content']
+                text = content if isinstance(content, str) else "\n".join(
+                    _section_text(key, value) for key, value in content.items())
+                self._conn.execute(
+                    "INSERT INTO trips_fts (trips_fts, rowid, destination, content) VALUES ('delete', ?, ?, ?)",
+                    (trip_id, trip['destination'], text)
+                )
+            self._conn.execute("DELETE FROM trips WHERE id = ?", (trip_id,))
+            self._conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM trip_sections)")
+        return True
+
+    def stats(self):
+        """Trip and blob counts, and the bytes saved by compression and dedup"""
+        with self._lock:
+            trips = self._conn.execute("SELECT COUNT(*) FROM trips").fetchone()[0]
+            blobs, stored, unique = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            referenced = self._conn.execute(
+                "SELECT COALESCE(SUM(b.size), 0) FROM trip_sections s JOIN blobs b ON b.hash = s.hash"
+            ).fetchone()[0]
+        return {
+            'trips': trips,
+            'blobs': blobs,
+            'raw_bytes': referenced,
+            'unique_bytes': unique,
+            'stored_bytes': stored,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_trip_history():
+    """Return the process-wide trip history"""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = TripHistory()
+                get_metrics().add_collector(
+                    lambda: {f"travel_history_{name}": value for name, value in _history.stats().items()}
+                )
+    return _history
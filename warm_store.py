@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from destinations import resolve_destination
+from metrics import get_metrics
+
+# Warm store configuration (override with environment variables)
+WARM_STORE_DIR = os.getenv(
+    "TRAVEL_WARM_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "warm")
+)
+WARM_MAX_AGE = float(os.getenv("TRAVEL_WARM_MAX_AGE", str(7 * 24 * 60 * 60)))
+WARM_STALE_AGE = float(os.getenv("TRAVEL_WARM_STALE_AGE", str(30 * 24 * 60 * 60)))
+WARM_RELOAD_INTERVAL = float(os.getenv("TRAVEL_WARM_RELOAD_INTERVAL", "60"))
+WARM_REFRESH_WORKERS = int(os.getenv("TRAVEL_WARM_REFRESH_WORKERS", "2"))
+
+STORE_FORMAT = 1
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+
+
+def trip_month(start_date):
+    """Month bucket ("YYYY-MM") for a trip starting on start_date"""
+    return str(start_date)[:7]
+
+
+class WarmStoreWriter:
+    """Builds one immutable store version and publishes it atomically"""
+
+    def __init__(self, directory=WARM_STORE_DIR, version=None):
+        self.directory = directory
+        self.version = version or time.strftime("%Y%m%dT%H%M%S") + f"{int(time.time() * 1000) % 1000:03d}"
+        self.filename = f"warm-{self.version}.sqlite3"
+        self._path = os.path.join(directory, self.filename)
+        self._tmp_path = self._path + ".tmp"
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._conn = sqlite3.connect(self._tmp_path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+        self._conn.execute("""
+            CREATE TABLE entries (
+                namespace TEXT NOT NULL,
+                destination TEXT NOT NULL,
+                month TEXT NOT NULL,
+                content BLOB NOT NULL,
+                generated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, destination, month)
+            ) WITHOUT ROWID
+        """)
+        self.count = 0
+
+    def add(self, namespace, destination_id, month, content, generated_at=None):
+        """Add one precomputed response"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, destination_id, month, zlib.compress(content.encode("utf-8"), 9),
+                 generated_at or time.time())
+            )
+            self.count += 1
+
+    def publish(self):
+        """Seal the store, point CURRENT at it and prune old versions"""
+        with self._lock:
+            self._conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ('format', str(STORE_FORMAT)),
+                ('version', self.version),
+                ('created_at', str(time.time())),
+                ('entries', str(self.count)),
+            ])
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+            self._conn.close()
+        os.replace(self._tmp_path, self._path)
+
+        pointer = os.path.join(self.directory, CURRENT_FILE)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.filename)
+        os.replace(pointer + ".tmp", pointer)
+
+        # Readers holding an older version keep their open file on POSIX
+        versions = sorted(name for name in os.listdir(self.directory)
+                          if name.startswith("warm-") and name.endswith(".sqlite3"))
+        for name in versions[:-KEEP_VERSIONS]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        return self._path
+
+    def discard(self):
+        """Abandon this version without publishing it"""
+        with self._lock:
+            self._conn.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class WarmStore:
+    """Read-only view of the latest published precompute, with a freshness policy"""
+
+    def __init__(self, directory=WARM_STORE_DIR, max_age=WARM_MAX_AGE, stale_age=WARM_STALE_AGE,
+                 reload_interval=WARM_RELOAD_INTERVAL, refresh_workers=WARM_REFRESH_WORKERS):
+        self.directory = directory
+        self.max_age = max_age
+        self.stale_age = stale_age
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._filename = None
+        self._checked_at = 0.0
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="warm-refresh")
+        self._stats = {
+            'fresh_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+        }
+
+    @property
+    def version(self):
+        return self._filename
+
+    def _reload(self):
+        """Switch to a newly published version, checking at most every reload_interval"""
+        now = time.monotonic()
+        if self._checked_at and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE), encoding="utf-8") as f:
+                filename = f.read().strip()
+        except OSError:
+            return
+        if filename == self._filename:
+            return
+        try:
+            path = os.path.abspath(os.path.join(self.directory, filename))
+            conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            conn.execute("SELECT 1 FROM entries LIMIT 1")
+        except sqlite3.Error as e:
+            print(f"Warm store version {filename} unavailable: {e}")
+            return
+        if self._conn is not None:
+            self._conn.close()
+        self._conn, self._filename = conn, filename
+
+    def get(self, namespace, destination_id, month):
+        """Return (content, generated_at) for an exact key, or None"""
+        with self._lock:
+            self._reload()
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT content, generated_at FROM entries WHERE namespace = ? AND destination = ? AND month = ?",
+                (namespace, destination_id, month)
+            ).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8"), row[1]
+
+    def lookup(self, namespace, destination, start_date):
+        """Return (content, fresh) for a trip, or (None, False) when nothing servable is stored"""
+        match = resolve_destination(destination)
+        entry = self.get(namespace, match.id, trip_month(start_date)) if match is not None else None
+        age = time.time() - entry[1] if entry is not None else None
+        if entry is None or age > self.stale_age:
+            self._count('misses')
+            return None, False
+        fresh = age <= self.max_age
+        self._count('fresh_hits' if fresh else 'stale_hits')
+        return entry[0], fresh
+
+    def entries(self):
+        """Iterate (namespace, destination_id, month, content, generated_at) in the current version"""
+        with self._lock:
+            self._reload()
+            if self._conn is None:
+                return []
+            rows = self._conn.execute(
+                "SELECT namespace, destination, month, content, generated_at FROM entries"
+            ).fetchall()
+        return [(namespace, destination, month, zlib.decompress(content).decode("utf-8"), generated_at)
+                for namespace, destination, month, content, generated_at in rows]
+
+    def refresh(self, key, fn):
+        """Run fn in the background unless a refresh for key is already pending"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._stats['refreshes'] += 1
+
+        def run():
+            try:
+                fn()
+            except Exception as e:
+                print(f"Warm store refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+        return True
+
+    def stats(self):
+        """Return hit counters and the loaded version"""
+        with self._lock:
+            self._reload()
+            stats = dict(self._stats)
+            stats['refreshing'] = len(self._refreshing)
+            stats['entries'] = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] if self._conn else 0
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_warm_store():
+    """Return the process-wide warm store consulted by both UIs"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = WarmStore()
+                get_metrics().add_collector(
+                    lambda: {f"travel_warm_{name}": value for name, value in _store.stats().items()}
+                )
+    return _store
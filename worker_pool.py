@@ -0,0 +1,156 @@
+import os
+import queue
+import threading
+
+# Worker pool configuration (override with environment variables)
+POOL_WORKERS = int(os.getenv("TRAVEL_POOL_WORKERS", "4"))
+POOL_QUEUE_SIZE = int(os.getenv("TRAVEL_POOL_QUEUE_SIZE", "16"))
+
+
+class CancelledError(Exception):
+    """Raised inside a job whose token has been cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation flag checked by a running job"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError(self.reason)
+
+
+class WorkerPool:
+    """Bounded pool of worker threads with one live request per slot
+
+    Submitting to a slot that already has a queued or running request cancels
+    the older one. Jobs are called as fn(token, emit, *args); emit(kind, payload)
+    posts to a thread-safe results queue that the owner drains on its own thread,
+    and messages from cancelled requests are dropped.
+    """
+
+    def __init__(self, max_workers=POOL_WORKERS, max_queue=POOL_QUEUE_SIZE):
+        self.max_workers = max(1, max_workers)
+        self.requests = queue.Queue(maxsize=max(1, max_queue))
+        self.results = queue.Queue()
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._running = set()
+        self._threads = []
+        self._idle = 0
+        self._closed = False
+
+    def submit(self, slot, fn, *args):
+        """Queue fn for slot, superseding the slot's previous request; raises queue.Full when saturated"""
+        token = CancelToken()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            self.requests.put_nowait((slot, token, fn, args))
+            previous = self._slots.get(slot)
+            self._slots[slot] = token
+            self._start_worker()
+        if previous is not None:
+            previous.cancel("superseded")
+        return token
+
+    def cancel(self, slot):
+        """Cancel the live request for slot, returning whether there was one"""
+        with self._lock:
+            token = self._slots.pop(slot, None)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def cancel_all(self):
+        """Cancel every queued and running request"""
+        with self._lock:
+            tokens = list(self._slots.values())
+            self._slots.clear()
+        for token in tokens:
+            token.cancel()
+        return len(tokens)
+
+    def drain(self, max_items=100):
+        """Yield up to max_items (slot, kind, payload) messages from live requests without blocking"""
+        for _ in range(max_items):
+            try:
+                slot, token, kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if not token.cancelled:
+                yield slot, kind, payload
+
+    def stats(self):
+        """Return running, queued and live slot counts"""
+        with self._lock:
+            return {
+                'workers': len(self._threads),
+                'running': len(self._running),
+                'queued': self.requests.qsize(),
+                'slots': len(self._slots),
+            }
+
+    def shutdown(self, wait=False, timeout=None):
+        """Cancel everything and stop the workers once they finish their current job"""
+        with self._lock:
+            self._closed = True
+            threads = list(self._threads)
+        self.cancel_all()
+        for _ in threads:
+            self.requests.put((None, None, None, None))
+        if wait:
+            for thread in threads:
+                thread.join(timeout)
+
+    def _start_worker(self):
+        # Called with the lock held; threads are only started while every existing one is busy
+        if self._idle >= self.requests.qsize() or len(self._threads) >= self.max_workers:
+            return
+        thread = threading.Thread(target=self._work, name=f"travel-worker-{len(self._threads)}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            slot, token, fn, args = self.requests.get()
+            with self._lock:
+                self._idle -= 1
+                if token is not None and not token.cancelled:
+                    self._running.add(token)
+            if token is None:
+                return
+            if token.cancelled:
+                continue
+
+            def emit(kind, payload=None, slot=slot, token=token):
+                token.raise_if_cancelled()
+                self.results.put((slot, token, kind, payload))
+
+            try:
+                fn(token, emit, *args)
+            except CancelledError:
+                pass
+            except Exception as e:
+                self.results.put((slot, token, 'error', str(e)))
+            finally:
+                with self._lock:
+                    self._running.discard(token)
+                    if self._slots.get(slot) is token:
+                        del self._slots[slot]
+                self.results.put((slot, token, 'done', None))